@@ -1,11 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException, Header
-from firebase_admin import firestore, auth as admin_auth
 from typing import Optional
+from auth_cache import auth_cache
+from clients import get_db, registry
+from llm_cache import cache as llm_cache
+from llm_limiter import limiter
+from llm_router import router as llm_router
+from question_bank import bank
+from answer_index import answer_index
+from firestore_writer import writer as firestore_writer
+from user_stats import user_stats
+from resume_store import store as resume_store
+from jobs import queue as jobs
+from interview_ws import stats as interview_stats
+from llm_parsing import stats as parse_stats
+from resume_condenser import stats as condenser_stats
+from settings import settings
 import requests
-import os
 
 router = APIRouter()
 
+# 🔐 firebase_admin.auth, imported on first use with the Firebase app initialized
+def admin_auth():
+    registry.firebase_app()
+    from firebase_admin import auth
+
+    return auth
+
 # ✅ Verify Firebase token from Authorization header
 def verify_firebase_token(authorization: Optional[str] = Header(None)):
     if not authorization or not authorization.startswith("Bearer "):
@@ -13,37 +33,39 @@ def verify_firebase_token(authorization: Optional[str] = Header(None)):
 
     id_token = authorization.split("Bearer ")[1]
     try:
-        decoded_token = admin_auth.verify_id_token(id_token)
+        # ♻️ Verified tokens are cached until they expire
+        decoded_token = auth_cache.verify_token(id_token, admin_auth().verify_id_token)
         return decoded_token
     except Exception as e:
         raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
 
+def lookup_is_admin(email):
+    db = get_db()
+    doc = db.collection("users").document(email).get()
+    return doc.exists and doc.to_dict().get("isAdmin", False)
+
+# ✅ Admin-only dependency (role cached for ADMIN_ROLE_TTL seconds)
+def require_admin(user=Depends(verify_firebase_token)):
+    if not auth_cache.is_admin(user["email"], lookup_is_admin):
+        raise HTTPException(status_code=403, detail="Admin rights required.")
+    return user
+
 # 🔍 Check if user is admin
 @router.get("/admin/check")
 def check_if_admin(user=Depends(verify_firebase_token)):
-    db = firestore.client()
-    doc = db.collection("users").document(user["email"]).get()
-    return {"is_admin": doc.exists and doc.to_dict().get("isAdmin", False)}
+    return {"is_admin": auth_cache.is_admin(user["email"], lookup_is_admin)}
 
 # 📋 List all users (admin-only)
 @router.get("/admin/users")
-def list_users(user=Depends(verify_firebase_token)):
-    db = firestore.client()
-    requester_doc = db.collection("users").document(user["email"]).get()
-    if not requester_doc.exists or not requester_doc.to_dict().get("isAdmin"):
-        raise HTTPException(status_code=403, detail="Not authorized")
-
+def list_users(user=Depends(require_admin)):
+    db = get_db()
     users_ref = db.collection("users").stream()
     return [{"email": u.id, "isAdmin": u.to_dict().get("isAdmin", False)} for u in users_ref]
 
 # 🔄 Toggle admin status
 @router.post("/admin/toggle-admin")
-def toggle_admin(payload: dict, user=Depends(verify_firebase_token)):
-    db = firestore.client()
-    requester_doc = db.collection("users").document(user["email"]).get()
-    if not requester_doc.exists or not requester_doc.to_dict().get("isAdmin"):
-        raise HTTPException(status_code=403, detail="Admin rights required.")
-
+def toggle_admin(payload: dict, user=Depends(require_admin)):
+    db = get_db()
     email = payload.get("email")
     is_admin = payload.get("isAdmin", False)
 
@@ -51,21 +73,21 @@ def toggle_admin(payload: dict, user=Depends(verify_firebase_token)):
         raise HTTPException(status_code=400, detail="Missing email.")
 
     db.collection("users").document(email).set({"isAdmin": is_admin}, merge=True)
+    auth_cache.invalidate_user(email)
     return {"message": f"Admin status for {email} updated to {is_admin}."}
 
 # 🆕 Create new user + send password reset
 @router.post("/admin/create-user")
-def create_user(payload: dict, user=Depends(verify_firebase_token)):
-    db = firestore.client()
-    FIREBASE_API_KEY = os.getenv("FIREBASE_API_KEY")
+def create_user(payload: dict, user=Depends(require_admin)):
+    from firebase_admin import firestore
+
+    db = get_db()
+    auth = admin_auth()
+    FIREBASE_API_KEY = settings.firebase_api_key
 
     if not FIREBASE_API_KEY:
         raise HTTPException(status_code=500, detail="Missing FIREBASE_API_KEY in environment.")
 
-    requester_doc = db.collection("users").document(user["email"]).get()
-    if not requester_doc.exists or not requester_doc.to_dict().get("isAdmin"):
-        raise HTTPException(status_code=403, detail="Admin rights required.")
-
     email = payload.get("email")
     password = payload.get("password")
     is_admin = payload.get("isAdmin", False)
@@ -74,12 +96,12 @@ def create_user(payload: dict, user=Depends(verify_firebase_token)):
         raise HTTPException(status_code=400, detail="Email and password are required.")
 
     try:
-        admin_auth.get_user_by_email(email)
+        auth.get_user_by_email(email)
         raise HTTPException(status_code=400, detail="User already exists.")
-    except admin_auth.UserNotFoundError:
+    except auth.UserNotFoundError:
         pass
 
-    new_user = admin_auth.create_user(
+    new_user = auth.create_user(
         email=email,
         password=password,
         email_verified=True
@@ -90,6 +112,7 @@ def create_user(payload: dict, user=Depends(verify_firebase_token)):
         "emailVerified": True,
         "createdAt": firestore.SERVER_TIMESTAMP,
     })
+    auth_cache.invalidate_user(email)
 
     reset_url = f"https://identitytoolkit.googleapis.com/v1/accounts:sendOobCode?key={FIREBASE_API_KEY}"
     reset_payload = {
@@ -105,27 +128,58 @@ def create_user(payload: dict, user=Depends(verify_firebase_token)):
 
 # ❌ Delete user (Firebase Auth + Firestore)
 @router.delete("/admin/delete-user")
-def delete_user(payload: dict, user=Depends(verify_firebase_token)):
-    db = firestore.client()
+def delete_user(payload: dict, user=Depends(require_admin)):
+    db = get_db()
+    auth = admin_auth()
     email_to_delete = payload.get("email")
 
-    requester_doc = db.collection("users").document(user["email"]).get()
-    if not requester_doc.exists or not requester_doc.to_dict().get("isAdmin"):
-        raise HTTPException(status_code=403, detail="Admin rights required.")
-
     if not email_to_delete:
         raise HTTPException(status_code=400, detail="Missing email.")
 
     try:
         # Delete from Firebase Auth
-        user_record = admin_auth.get_user_by_email(email_to_delete)
-        admin_auth.delete_user(user_record.uid)
+        user_record = auth.get_user_by_email(email_to_delete)
+        auth.delete_user(user_record.uid)
 
         # Delete from Firestore
         db.collection("users").document(email_to_delete).delete()
+        auth_cache.invalidate_user(email_to_delete)
 
         return {"message": f"✅ User {email_to_delete} deleted successfully."}
-    except admin_auth.UserNotFoundError:
+    except auth.UserNotFoundError:
+        auth_cache.invalidate_user(email_to_delete)
         return {"message": "⚠️ User not found in Firebase Auth."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"❌ Failed to delete user: {str(e)}")
+
+# 📈 Auth cache counters (admin-only)
+@router.get("/admin/auth-cache-stats")
+def auth_cache_stats(user=Depends(require_admin)):
+    return auth_cache.stats()
+
+# 🧾 Background job queue counters (admin-only)
+@router.get("/admin/job-stats")
+def job_stats(user=Depends(require_admin)):
+    return jobs.stats()
+
+# 🔌 WebSocket interview counters (admin-only)
+@router.get("/admin/ws-stats")
+def ws_stats(user=Depends(require_admin)):
+    return dict(interview_stats)
+
+# 🚦 Upstream admission control + completion cache counters, and the write-behind
+# queues (queue depth, drops) and resume cache around them (admin-only)
+@router.get("/admin/llm-stats")
+def llm_stats(user=Depends(require_admin)):
+    return {
+        "limiter": limiter.stats(),
+        "router": llm_router.stats(),
+        "cache": llm_cache.stats(),
+        "question_bank": bank.stats(),
+        "answer_index": answer_index.stats(),
+        "parsing": dict(parse_stats),
+        "resume_condenser": dict(condenser_stats),
+        "firestore_writer": firestore_writer.stats(),
+        "user_stats": user_stats.stats(),
+        "resume_store": resume_store.stats(),
+    }
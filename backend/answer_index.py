@@ -0,0 +1,230 @@
+# answer_index.py
+# Reuses the evaluation of a near-identical earlier answer to the same question.
+#
+# Stock questions ("What is CI/CD?") get many nearly identical answers.
+# Each answer is embedded as a feature-hashed vector of its word 1- and
+# 2-shingles (ANSWER_INDEX_DIMS signed float32 buckets, L2-normalized)
+# and grouped by normalized question text, so a lookup is one NumPy
+# matrix-vector product over that question's earlier answers. When the
+# best cosine similarity reaches ANSWER_REUSE_THRESHOLD the stored
+# evaluation is returned instead of calling the LLM. Shingles can't tell
+# "X" from "not X", so only answers with the same number of negations
+# ("not", "never", "n't", ...) are compared at all.
+#
+# The index lives in process memory: seeded in the background on the
+# first lookup (not at startup, so booting never touches Firestore) from
+# the latest interview_sessions / resume_sessions documents, and extended
+# with every new LLM evaluation. Question groups are evicted least recently used
+# once ANSWER_INDEX_MAX_ENTRIES answers are held.
+
+import asyncio
+import logging
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from clients import get_db
+from llm_parsing import clean_question, parse_evaluation
+from metrics import log_event, span
+from settings import settings
+
+COLLECTIONS = ("interview_sessions", "resume_sessions")
+DESCENDING = "DESCENDING"  # == firestore.Query.DESCENDING
+DUPLICATE = 0.999  # an answer this close to a stored one adds nothing
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+NEGATIONS = {"not", "no", "never", "nor", "cannot", "none", "neither", "nothing", "without"}
+
+
+def question_key(question: str) -> str:
+    # "1. What is CI/CD?" and "what is ci cd" are the same question
+    return " ".join(_TOKEN_RE.findall(clean_question(question or "").lower()))
+
+
+def embed(text: str, dims: int) -> Tuple[Optional[np.ndarray], int, int]:
+    """(unit vector, word count, negation count); the vector is None for empty text."""
+    words = _TOKEN_RE.findall((text or "").lower().replace("n't", " not"))
+    if not words:
+        return None, 0, 0
+    negations = sum(w in NEGATIONS for w in words)
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    hashes = np.fromiter((zlib.crc32(f.encode()) for f in features), dtype=np.uint32, count=len(features))
+    # Low bits pick the bucket, the top bit the sign (collisions cancel out on average)
+    signs = np.where(hashes >> 31, -1.0, 1.0)
+    vector = np.bincount((hashes % dims).astype(np.intp), weights=signs, minlength=dims).astype(np.float32)
+    norm = float(np.linalg.norm(vector))
+    return (vector / norm if norm else None), len(words), negations
+
+
+def stored_evaluation(data: dict) -> Optional[str]:
+    """The 3-line evaluation text of a stored session document, if usable."""
+    from evaluator import FALLBACK_EVALUATION
+
+    feedback = data.get("feedback") or ""
+    if data.get("correct_answer"):
+        # resume_sessions keep the correct answer in its own field
+        feedback = f"{feedback}\nCorrect Answer: {data['correct_answer']}"
+    if not feedback or feedback == FALLBACK_EVALUATION or ("score" in data and data["score"] is None):
+        return None
+    return feedback if parse_evaluation(feedback).score is not None else None
+
+
+@dataclass
+class Match:
+    evaluation: str
+    similarity: float
+
+
+class _Group:
+    def __init__(self, dims: int):
+        self.vectors = np.empty((0, dims), dtype=np.float32)
+        self.negations = np.empty(0, dtype=np.int32)
+        self.evaluations: List[str] = []
+
+    def similarities(self, vector: np.ndarray, negations: int) -> np.ndarray:
+        # Different polarity never matches
+        return np.where(self.negations == negations, self.vectors @ vector, -1.0)
+
+
+class AnswerIndex:
+    def __init__(
+        self,
+        client_factory: Callable = get_db,
+        dims: int = settings.answer_index_dims,
+        max_entries: int = settings.answer_index_max_entries,
+        per_question: int = settings.answer_index_per_question,
+    ):
+        self.client_factory = client_factory
+        self.dims = dims
+        self.max_entries = max_entries
+        self.per_question = per_question
+        self._groups: "OrderedDict[str, _Group]" = OrderedDict()
+        self._lock = threading.Lock()  # the startup load runs in a worker thread
+        self._task: Optional[asyncio.Task] = None
+        self._seeded = client_factory is None  # nothing to seed from
+        self._llm_seconds: Optional[float] = None  # moving average of a graded answer
+        self.entries = 0
+        self.lookups = 0
+        self.hits = 0
+        self.loaded = 0
+        self.seconds_saved = 0.0
+
+    def lookup(self, question: str, answer: str) -> Optional[Match]:
+        if not settings.answer_reuse_enabled:
+            return None
+        if not self._seeded:
+            self.start()
+        self.lookups += 1
+        with span("answer_lookup"):
+            vector, words, negations = embed(answer, self.dims)
+            if vector is None or words < settings.answer_reuse_min_words:
+                return None
+            key = question_key(question)
+            with self._lock:
+                group = self._groups.get(key)
+                if group is None:
+                    return None
+                self._groups.move_to_end(key)
+                similarities = group.similarities(vector, negations)
+                best = int(np.argmax(similarities))
+                match = Match(group.evaluations[best], float(similarities[best]))
+        if match.similarity < settings.answer_reuse_threshold:
+            return None
+        self.hits += 1
+        self.seconds_saved += self._llm_seconds or 0.0
+        log_event("answer_reused", similarity=round(match.similarity, 3))
+        return match
+
+    def add(self, question: str, answer: str, evaluation: str, llm_seconds: Optional[float] = None) -> bool:
+        """Indexes a graded answer; evaluations without a score are ignored."""
+        if not settings.answer_reuse_enabled:
+            return False
+        if llm_seconds is not None:
+            self._llm_seconds = llm_seconds if self._llm_seconds is None else 0.9 * self._llm_seconds + 0.1 * llm_seconds
+        vector, words, negations = embed(answer, self.dims)
+        if vector is None or words < settings.answer_reuse_min_words:
+            return False
+        if parse_evaluation(evaluation).score is None:
+            return False
+        key = question_key(question)
+        with self._lock:
+            group = self._groups.get(key)
+            if group is None:
+                group = self._groups[key] = _Group(self.dims)
+            self._groups.move_to_end(key)
+            if len(group.evaluations) and float(np.max(group.similarities(vector, negations))) >= DUPLICATE:
+                return False
+            group.vectors = np.vstack([group.vectors, vector[None, :]])
+            group.negations = np.append(group.negations, negations)
+            group.evaluations.append(evaluation)
+            self.entries += 1
+            if len(group.evaluations) > self.per_question:
+                group.vectors = group.vectors[-self.per_question:]
+                group.negations = group.negations[-self.per_question:]
+                group.evaluations = group.evaluations[-self.per_question:]
+                self.entries -= 1
+            while self.entries > self.max_entries and len(self._groups) > 1:
+                _, evicted = self._groups.popitem(last=False)
+                self.entries -= len(evicted.evaluations)
+        return True
+
+    def load(self) -> int:
+        """Seeds the index from the latest stored sessions (blocking)."""
+        db = self.client_factory()
+        loaded = 0
+        for collection in COLLECTIONS:
+            query = db.collection(collection).order_by("timestamp", direction=DESCENDING)
+            docs = list(query.limit(settings.answer_index_load_limit).stream())
+            for doc in reversed(docs):  # oldest first, so the newest survive the caps
+                data = doc.to_dict() or {}
+                evaluation = stored_evaluation(data)
+                if evaluation and self.add(data.get("question") or "", data.get("answer") or "", evaluation):
+                    loaded += 1
+        self.loaded += loaded
+        return loaded
+
+    async def _load(self):
+        try:
+            loaded = await asyncio.to_thread(self.load)
+            log_event("answer_index_loaded", entries=loaded, questions=len(self._groups))
+        except Exception as e:
+            log_event("answer_index_load_failed", logging.WARNING, error=str(e))
+
+    def start(self):
+        """Seeds the index once, in the background; called by the first lookup."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no loop (sync caller); the next lookup on the loop seeds
+        self._seeded = True
+        self._task = loop.create_task(self._load())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.answer_reuse_enabled,
+            "threshold": settings.answer_reuse_threshold,
+            "questions": len(self._groups),
+            "entries": self.entries,
+            "loaded": self.loaded,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "reuse_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "seconds_saved": round(self.seconds_saved, 1),
+        }
+
+
+answer_index = AnswerIndex()
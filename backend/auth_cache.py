@@ -0,0 +1,71 @@
+# auth_cache.py
+# Memoized Firebase ID-token verification and admin-role lookups.
+#
+# Verified tokens are cached until their own `exp` (minus a small skew), so
+# repeat admin clicks skip verify_id_token. `users/{email}.isAdmin` is cached
+# for ADMIN_ROLE_TTL seconds and invalidated explicitly when an admin
+# changes or deletes a user.
+
+import hashlib
+import threading
+import time
+
+from cachetools import TLRUCache, TTLCache
+
+from settings import settings
+
+
+def _token_expiry(key, decoded, now):
+    return decoded.get("exp", now) - settings.token_expiry_skew
+
+
+class AuthCache:
+    def __init__(self):
+        self._tokens = TLRUCache(maxsize=settings.token_cache_size, ttu=_token_expiry, timer=time.time)
+        self._roles = TTLCache(maxsize=settings.admin_role_cache_size, ttl=settings.admin_role_ttl)
+        self._lock = threading.Lock()
+        self.counters = {"token_hits": 0, "token_misses": 0, "role_hits": 0, "role_misses": 0, "invalidations": 0}
+
+    @staticmethod
+    def _token_key(id_token: str) -> str:
+        return hashlib.sha256(id_token.encode()).hexdigest()
+
+    def verify_token(self, id_token: str, verify) -> dict:
+        key = self._token_key(id_token)
+        with self._lock:
+            decoded = self._tokens.get(key)
+            self.counters["token_hits" if decoded is not None else "token_misses"] += 1
+        if decoded is not None:
+            return decoded
+
+        decoded = verify(id_token)
+        with self._lock:
+            self._tokens[key] = decoded
+        return decoded
+
+    def is_admin(self, email: str, lookup) -> bool:
+        with self._lock:
+            cached = self._roles.get(email)
+            self.counters["role_hits" if cached is not None else "role_misses"] += 1
+        if cached is not None:
+            return cached
+
+        is_admin = bool(lookup(email))
+        with self._lock:
+            self._roles[email] = is_admin
+        return is_admin
+
+    def invalidate_user(self, email: str):
+        with self._lock:
+            self._roles.pop(email, None)
+            # Drop any verified tokens of that user too (rare admin operation)
+            for key in [k for k, v in self._tokens.items() if v.get("email") == email]:
+                self._tokens.pop(key, None)
+            self.counters["invalidations"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counters, tokens=len(self._tokens), roles=len(self._roles))
+
+
+auth_cache = AuthCache()
@@ -0,0 +1,158 @@
+# benchmarks/bench_answer_reuse.py
+# Near-duplicate answer reuse (answer_index) on a labelled corpus of
+# stock questions. Every answer is a variant of one of several distinct
+# reference answers per question: reworded, re-cased, filler added, a
+# word dropped or misspelled. Reusing an evaluation across references
+# (or for a negated answer) is counted as a false reuse.
+#
+#   1. threshold sweep: reuse rate / false reuses / lookup cost
+#   2. /evaluate-answer end to end on benchmarks/harness.py, index off vs
+#      on: LLM calls, p50 latency and the latency saved
+#
+#   cd backend && python benchmarks/bench_answer_reuse.py --answers 400
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import Harness  # noqa: E402  (must come before settings)
+from answer_index import AnswerIndex  # noqa: E402
+from settings import settings  # noqa: E402
+
+EVALUATION = "Score: {score}\nConstructive feedback: Reference answer {ref}.\nCorrect Answer: See the docs."
+
+REFERENCES = {
+    "What is CI/CD?": [
+        "CI/CD automates building, testing and deploying code so every change is integrated and released quickly and safely.",
+        "Continuous integration means merging code often and running tests, continuous delivery keeps the main branch deployable.",
+        "It is a tool like Jenkins that we use to run scripts on a server.",
+    ],
+    "What is Docker?": [
+        "Docker packages an application with its dependencies into a container image that runs the same on any host.",
+        "Docker is a virtual machine that includes a full guest operating system for every application.",
+        "A platform to build, ship and run containers, which share the host kernel and start much faster than VMs.",
+    ],
+    "What is a Kubernetes pod?": [
+        "A pod is the smallest deployable unit in Kubernetes, one or more containers sharing network and storage.",
+        "A pod is a node in the cluster where the control plane runs.",
+        "Pods group tightly coupled containers that are scheduled together on the same node and share an IP address.",
+    ],
+    "Explain the difference between a process and a thread.": [
+        "A process has its own memory space while threads of a process share memory and are cheaper to create and switch.",
+        "Threads run on different computers and processes run on the same computer.",
+        "Processes are isolated by the operating system; threads share the heap of their process but have their own stack.",
+    ],
+    "What does a load balancer do?": [
+        "A load balancer spreads incoming requests across several servers and removes unhealthy ones from rotation.",
+        "It makes the database faster by caching queries.",
+        "It sits in front of a service, distributes traffic by round robin or least connections and terminates TLS.",
+    ],
+}
+FILLERS = ["basically", "I think", "so", "in short", "well"]
+TYPOS = {"application": "aplication", "containers": "containres", "requests": "requsets", "memory": "memmory"}
+
+
+def variant(text, rng):
+    kind = rng.choice(["verbatim", "case", "filler", "drop", "typo", "reorder", "negate"])
+    words = text.split()
+    if kind == "case":
+        text = text.lower().rstrip(".")
+    elif kind == "filler":
+        text = f"{rng.choice(FILLERS).capitalize()}, {text[0].lower()}{text[1:]}"
+    elif kind == "drop":
+        del words[rng.randrange(1, len(words))]
+        text = " ".join(words)
+    elif kind == "typo":
+        text = " ".join(TYPOS.get(w, w) for w in words) if any(w in TYPOS for w in words) else text + " Thanks."
+    elif kind == "reorder":
+        half = len(words) // 2
+        text = " ".join(words[half:] + words[:half])
+    elif kind == "negate":
+        # Same words, opposite claim: must not inherit the reference's evaluation
+        text = text.replace(" is ", " is not ", 1) if " is " in text else "Not true: " + text
+    return text, kind
+
+
+def corpus(count, seed=7):
+    rng = random.Random(seed)
+    items = []
+    for _ in range(count):
+        question = rng.choice(list(REFERENCES))
+        ref = rng.randrange(len(REFERENCES[question]))
+        answer, kind = variant(REFERENCES[question][ref], rng)
+        items.append((question, answer, (question, ref, kind == "negate"), kind))
+    return items
+
+
+def sweep(items, thresholds):
+    kinds = sorted({kind for *_, kind in items})
+    print(f"{'threshold':>9} {'reused':>7} {'false':>6} {'lookup µs':>9}   " + " ".join(f"{k:>9}" for k in kinds))
+    for threshold in thresholds:
+        settings.answer_reuse_threshold = threshold
+        index, owners = AnswerIndex(client_factory=None), {}
+        reused = false = 0
+        lookup_s = 0.0
+        by_kind = {k: [0, 0] for k in kinds}  # reused, seen
+        for question, answer, label, kind in items:
+            by_kind[kind][1] += 1
+            start = time.perf_counter()
+            match = index.lookup(question, answer)
+            lookup_s += time.perf_counter() - start
+            if match is not None:
+                reused += 1
+                by_kind[kind][0] += 1
+                false += owners[match.evaluation] != label
+                continue
+            evaluation = EVALUATION.format(score=3 + label[1] % 3, ref=f"{label} #{len(owners)}")
+            if index.add(question, answer, evaluation):
+                owners[evaluation] = label
+        print(
+            f"{threshold:9.2f} {reused / len(items):7.1%} {false:6d} {lookup_s / len(items) * 1e6:9.1f}   "
+            + " ".join(f"{r:>4d}/{n:<4d}" for r, n in by_kind.values())
+        )
+
+
+async def end_to_end(items, reuse, latency):
+    settings.answer_reuse_enabled = reuse
+    async with Harness(latency=latency) as h:
+        from answer_index import answer_index
+
+        latencies = []
+        for n, (question, answer, *_) in enumerate(items):
+            start = time.perf_counter()
+            res = await h.client.post(
+                "/evaluate-answer", json={"question": question, "answer": answer, "user": f"u{n % 20}@bench.dev"}
+            )
+            res.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+        stats = answer_index.stats()
+        print(
+            f"{'index on' if reuse else 'index off':<10} LLM calls {h.upstream_calls:4d}   p50 {statistics.median(latencies) * 1000:7.1f} ms"
+            f"   mean {statistics.mean(latencies) * 1000:7.1f} ms   reuse rate {stats['reuse_rate']:.1%}"
+            f"   est. saved {stats['seconds_saved']:.1f} s"
+        )
+
+
+async def main(args):
+    items = corpus(args.answers)
+    sweep(items, args.thresholds)
+    print()
+    settings.answer_reuse_threshold = args.threshold
+    for reuse in (False, True):
+        await end_to_end(items[: args.e2e], reuse, args.latency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--answers", type=int, default=400)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.8, 0.85, 0.9, 0.95])
+    parser.add_argument("--threshold", type=float, default=settings.answer_reuse_threshold, help="for the end-to-end run")
+    parser.add_argument("--e2e", type=int, default=150, help="answers sent through /evaluate-answer")
+    parser.add_argument("--latency", type=float, default=0.5, help="stub LLM time per evaluation")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,99 @@
+# benchmarks/bench_evaluate_batch.py
+# Grading a 5-question interview: 5 sequential /evaluate-answer calls vs
+# one /evaluate-batch call in single_prompt and fanout mode. The stub LLM
+# charges per generated token, so prompt overhead and output length both
+# show up in the timings. Results go to the fake Firestore; commits are
+# counted after the writer drains.
+#
+#   cd backend && python benchmarks/bench_evaluate_batch.py --runs 5
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_firestore import FakeFirestore  # noqa: E402
+from benchmarks.stub_llm import StubServer, create_stub_app  # noqa: E402
+from clients import registry  # noqa: E402
+from settings import settings  # noqa: E402
+
+ITEMS = [
+    {"question": f"Question {n}: explain how a CI/CD pipeline handles rollbacks?", "answer": "We redeploy the last good build " * 5}
+    for n in range(1, 6)
+]
+SINGLE = "Score: 4\nConstructive feedback: Clear answer, mention rollback strategies.\nCorrect Answer: Keep the previous artifact and redeploy it automatically."
+
+
+def reply(body):
+    prompt = body["messages"][-1]["content"]
+    if "JSON array" not in prompt:
+        return SINGLE
+    count = len(re.findall(r"^Question:", prompt, re.MULTILINE))
+    return json.dumps([
+        {"index": i, "score": 4, "feedback": "Clear answer, mention rollback strategies.",
+         "correct_answer": "Keep the previous artifact and redeploy it automatically."}
+        for i in range(1, count + 1)
+    ])
+
+
+async def sequential(client, base):
+    for item in ITEMS:
+        res = await client.post(f"{base}/evaluate-answer", json=dict(item, user="bench@user.dev"))
+        res.raise_for_status()
+
+
+async def batch(client, base, mode):
+    res = await client.post(f"{base}/evaluate-batch", json={"user": "bench@user.dev", "items": ITEMS, "mode": mode})
+    res.raise_for_status()
+    assert len(res.json()["results"]) == len(ITEMS)
+
+
+async def measure(label, stub, db, make_call, runs):
+    from firestore_writer import writer
+
+    calls, commits = stub.app.state.calls, db.commits
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await make_call()
+        times.append(time.perf_counter() - start)
+    await writer.flush()
+    print(f"{label:<22} p50 {statistics.median(times) * 1000:7.1f} ms   "
+          f"{(stub.app.state.calls - calls) / runs:4.1f} LLM calls   {(db.commits - commits) / runs:4.1f} commits / interview")
+
+
+async def main(args):
+    with StubServer(create_stub_app(args.latency, reply=reply, token_delay=args.token_delay), port=args.port) as stub:
+        settings.together_url = stub.url
+        db = FakeFirestore(latency=0.02)
+        registry.set_firestore(db)
+
+        from evaluator import router
+
+        app = FastAPI()
+        app.include_router(router)
+        # In-process ASGI so the write-behind queue runs on this event loop
+        base = "http://bench"
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), timeout=60) as client:
+            await measure("5x /evaluate-answer", stub, db, lambda: sequential(client, base), args.runs)
+            await measure("batch single_prompt", stub, db, lambda: batch(client, base, "single_prompt"), args.runs)
+            await measure("batch fanout", stub, db, lambda: batch(client, base, "fanout"), args.runs)
+        await registry.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.3, help="time to first token")
+    parser.add_argument("--token-delay", type=float, default=0.005)
+    parser.add_argument("--port", type=int, default=9600)
+    asyncio.run(main(parser.parse_args()))
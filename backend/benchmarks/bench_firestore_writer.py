@@ -0,0 +1,59 @@
+# benchmarks/bench_firestore_writer.py
+# Request-path cost of saving N interview results: one synchronous
+# `collection().add()` each (before) vs. FirestoreWriter.enqueue() with
+# batched background commits (after), against the in-process fake with a
+# per-round-trip latency and optional injected commit failures.
+#
+#   cd backend && python benchmarks/bench_firestore_writer.py --records 2000
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_firestore import FakeFirestore  # noqa: E402
+from firestore_writer import FirestoreWriter  # noqa: E402
+
+
+def record(n):
+    return {"user": f"user{n % 50}", "question": "What is CI/CD?", "answer": "...", "feedback": "Score: 4",
+            "timestamp": datetime.utcnow()}
+
+
+async def main(args):
+    sync_db = FakeFirestore(latency=args.latency)
+    count = min(args.records, 200)  # the synchronous path is slow; sample it
+    start = time.perf_counter()
+    for n in range(count):
+        sync_db.collection("interview_sessions").add(record(n))
+    per_record = (time.perf_counter() - start) / count
+    print(f"sync add():      {per_record * 1000:7.3f} ms on the request path per record")
+
+    db = FakeFirestore(latency=args.latency, fail_rate=args.fail_rate)
+    writer = FirestoreWriter(client_factory=lambda: db)
+    start = time.perf_counter()
+    for n in range(args.records):
+        writer.enqueue("interview_sessions", record(n))
+        if n % 100 == 0:
+            await asyncio.sleep(0)  # let the event loop breathe like real traffic
+    enqueue_time = (time.perf_counter() - start) / args.records
+    depth = writer.queue_depth()
+    await writer.stop()
+    total = time.perf_counter() - start
+
+    stored = len(db.data.get("interview_sessions", {}))
+    print(f"write-behind:    {enqueue_time * 1000:7.3f} ms on the request path per record")
+    print(f"                 queue depth after enqueue {depth}, {writer.commits} commits for {stored} docs, "
+          f"{writer.retries} retries, {writer.dropped} dropped, drained in {total:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--fail-rate", type=float, default=0.1)
+    asyncio.run(main(parser.parse_args()))
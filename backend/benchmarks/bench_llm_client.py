@@ -0,0 +1,56 @@
+# benchmarks/bench_llm_client.py
+# Compares the old per-call blocking `requests.post` against the shared
+# async client when N completions are requested concurrently.
+#
+#   cd backend && python benchmarks/bench_llm_client.py --concurrency 50
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_llm import StubServer, create_stub_app  # noqa: E402
+
+
+async def blocking_call(url):
+    # What every handler did before: sync requests inside `async def`
+    res = requests.post(url, json={"model": "stub", "messages": []})
+    res.raise_for_status()
+    return res.json()["choices"][0]["message"]["content"]
+
+
+async def run(label, make_call, concurrency):
+    start = time.perf_counter()
+    await asyncio.gather(*(make_call() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {concurrency} calls in {elapsed:6.2f}s  ->  {concurrency / elapsed:7.1f} req/s")
+
+
+async def main(args):
+    with StubServer(create_stub_app(args.latency), port=args.port) as stub:
+        import llm_client
+        from clients import registry
+        from settings import settings
+
+        settings.together_url = stub.url
+
+        await run("requests.post (old)", lambda: blocking_call(stub.url), args.concurrency)
+        await run(
+            "shared async client",
+            lambda: llm_client.chat_completion([{"role": "user", "content": "hi"}]),
+            args.concurrency,
+        )
+        await registry.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--port", type=int, default=9100)
+    asyncio.run(main(parser.parse_args()))
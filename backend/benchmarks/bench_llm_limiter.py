@@ -0,0 +1,82 @@
+# benchmarks/bench_llm_limiter.py
+# A burst of completions against a stub provider that answers 429 above
+# --provider-limit concurrent requests. Compares sending everything
+# straight through with the adaptive admission controller: how many calls
+# succeed, how many surface upstream 429s, how many are shed early with
+# a 503, and where the time goes (queue vs upstream).
+#
+#   cd backend && python benchmarks/bench_llm_limiter.py --requests 300
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_llm import StubServer, create_stub_app  # noqa: E402
+from clients import registry  # noqa: E402
+from llm_limiter import AdmissionController, UpstreamBusy  # noqa: E402
+from settings import settings  # noqa: E402
+
+
+async def one(llm_client, results):
+    start = time.perf_counter()
+    try:
+        await llm_client.chat_completion([{"role": "user", "content": "Generate 5 questions on python"}])
+        outcome = "ok"
+    except UpstreamBusy:
+        outcome = "503 shed"
+    except httpx.HTTPStatusError as e:
+        outcome = f"{e.response.status_code} upstream"
+    results.append((outcome, time.perf_counter() - start))
+
+
+async def run(label, stub, limiter, args):
+    import llm_client
+
+    llm_client.limiter = limiter
+    stub.app.state.throttled = 0
+    results = []
+    tasks = []
+    for _ in range(args.requests):
+        tasks.append(asyncio.ensure_future(one(llm_client, results)))
+        await asyncio.sleep(args.spread / args.requests)
+    await asyncio.gather(*tasks)
+
+    counts = {}
+    for outcome, _ in results:
+        counts[outcome] = counts.get(outcome, 0) + 1
+    ok = sorted(t for outcome, t in results if outcome == "ok")
+    p95 = ok[int(0.95 * (len(ok) - 1))] * 1000 if ok else 0
+    print(f"{label:<12} {counts}  provider 429s {stub.app.state.throttled}  "
+          f"ok p50 {statistics.median(ok) * 1000 if ok else 0:6.0f} ms  p95 {p95:6.0f} ms")
+    stats = limiter.stats()
+    print(f"{'':<12} final limit {stats['limit']}  queue {stats['queue_time']}  upstream {stats['upstream_time']}")
+
+
+async def main(args):
+    app = create_stub_app(args.latency, max_concurrency=args.provider_limit)
+    with StubServer(app, port=args.port) as stub:
+        settings.together_url = stub.url
+        unbounded = AdmissionController(concurrency=100_000, max_concurrency=100_000, queue_timeout=args.queue_timeout)
+        adaptive = AdmissionController(queue_timeout=args.queue_timeout)
+        await run("unbounded", stub, unbounded, args)
+        await asyncio.sleep(1.5)  # let the provider's window reset
+        await run("adaptive", stub, adaptive, args)
+        await registry.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--spread", type=float, default=1.0, help="seconds over which the burst arrives")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--provider-limit", type=int, default=16)
+    parser.add_argument("--queue-timeout", type=float, default=3.0)
+    parser.add_argument("--port", type=int, default=9500)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,105 @@
+# benchmarks/bench_llm_router.py
+# Tail latency and failover of llm_router against two local stub servers
+# with injected delays and errors:
+#
+#   tail      primary: 2% of requests take 2 s instead of 0.1 s
+#             - one endpoint, no hedging (the old behaviour)
+#             - primary + backup, hedged at the primary's observed p95
+#   failing   primary returns 500s: failover, then its breaker opens
+#   hanging   primary never answers in time: per-endpoint deadline
+#
+#   cd backend && python benchmarks/bench_llm_router.py --requests 400
+#   add --concurrency to change the number of simultaneous requests
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_llm import StubServer, create_stub_app  # noqa: E402
+from clients import registry  # noqa: E402
+from settings import settings  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "Evaluate this answer."}]
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def configure(*stubs, hedge=True, timeout=None):
+    from llm_router import router
+
+    settings.llm_endpoints = json.dumps([
+        {"name": name, "url": stub.url, **({"timeout": timeout} if timeout and name == "primary" else {})}
+        for name, stub in stubs
+    ])
+    settings.llm_hedge_enabled = hedge
+    router._endpoints = None  # reload from settings
+    router.requests = router.hedged = 0
+    return router
+
+
+async def drive(label, router, requests, concurrency):
+    from llm_client import chat_completion
+
+    sem = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one():
+        nonlocal errors
+        async with sem:
+            start = time.perf_counter()
+            try:
+                await chat_completion(MESSAGES)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    per_endpoint = ", ".join(
+        f"{name}: {s['requests']} req / {s['failures']} fail / {s['breaker']}" for name, s in router.stats()["endpoints"].items()
+    )
+    print(
+        f"{label:<26} p50 {percentile(latencies, 50) * 1000:7.1f}  p95 {percentile(latencies, 95) * 1000:7.1f}"
+        f"  p99 {percentile(latencies, 99) * 1000:7.1f} ms  errors {errors:3d}  hedged {router.hedged:3d}   [{per_endpoint}]"
+    )
+
+
+async def main(args):
+    primary_app = create_stub_app(0.1, reply="ok", slow_rate=0.02, slow_latency=2.0)
+    backup_app = create_stub_app(0.12, reply="ok")
+    with StubServer(primary_app, port=args.port) as primary, StubServer(backup_app, port=args.port + 1) as backup:
+        settings.llm_cache_enabled = False
+        settings.llm_hedge_min_samples = 20
+        settings.llm_hedge_default_ms = 500  # before the first 20 samples give a p95
+
+        await drive("tail: single, no hedge", configure(("primary", primary), hedge=False), args.requests, args.concurrency)
+        await drive("tail: single, hedged", configure(("primary", primary)), args.requests, args.concurrency)
+        await drive("tail: primary+backup", configure(("primary", primary), ("backup", backup)), args.requests, args.concurrency)
+
+        primary_app.state.slow_rate, primary_app.state.fail_rate = 0.0, 1.0
+        await drive("failing primary", configure(("primary", primary), ("backup", backup)), args.requests, args.concurrency)
+
+        primary_app.state.fail_rate, primary_app.state.latency = 0.0, 30.0
+        settings.llm_hedge_default_ms = 10_000  # isolate the deadline from hedging
+        await drive(
+            "hanging primary (1 s cap)",
+            configure(("primary", primary), ("backup", backup), hedge=False, timeout=1.0),
+            min(args.requests, 100),
+            args.concurrency,
+        )
+        await registry.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--port", type=int, default=9800)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,210 @@
+# benchmarks/bench_load.py
+# Closed-loop load test of the whole app on benchmarks/harness.py (stub
+# LLM + fake Firestore, no network, no credentials). `--concurrency`
+# virtual users each pick an endpoint from `--mix` by weight and fire the
+# next request as soon as the previous one returns, for `--duration`
+# seconds. Per-endpoint p50/p95/p99, requests/s and error counts are
+# printed and written as JSON; `--compare` diffs against an earlier run.
+#
+#   cd backend && python benchmarks/bench_load.py --concurrency 32 --duration 20
+#   python benchmarks/bench_load.py --out after.json --compare before.json
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import Harness  # noqa: E402  (must come before settings)
+from benchmarks.pdf_corpus import make_resume_pdf  # noqa: E402
+
+DEFAULT_MIX = "topic-question=4,generate-quiz=2,submit-resume-answer=3,resume-review=1"
+TOPICS = ["Docker", "Kubernetes", "Python", "Terraform", "Linux", "AWS", "SQL", "Git", "Networking", "Java"]
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+ROLES = ["DevOps", "Full stack Development", "Data Scientist", "Data Engineer"]
+ANSWER = "A container packages the app with its dependencies and runs isolated on a shared kernel. " * 3
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+class VirtualUser:
+    def __init__(self, n, client, pdfs, rng):
+        self.user = f"load-{n}@bench.dev"
+        self.client = client
+        self.pdfs = pdfs
+        self.rng = rng
+        self.session_open = False
+
+    async def topic_question(self):
+        body = {"topic": self.rng.choice(TOPICS), "difficulty": self.rng.choice(DIFFICULTIES)}
+        return await self.client.post("/topic-question", json=body)
+
+    async def generate_quiz(self):
+        return await self.client.post("/generate-quiz", json={"topic": self.rng.choice(TOPICS)})
+
+    async def start_resume_session(self):
+        files = {"file": ("resume.pdf", self.rng.choice(self.pdfs), "application/pdf")}
+        return await self.client.post("/start-resume-session", data={"user": self.user}, files=files)
+
+    async def submit_resume_answer(self):
+        return await self.client.post("/submit-resume-answer", json={"user": self.user, "answer": ANSWER})
+
+    async def resume_review(self):
+        files = {"file": ("resume.pdf", self.rng.choice(self.pdfs), "application/pdf")}
+        return await self.client.post("/resume-review", data={"role": self.rng.choice(ROLES)}, files=files)
+
+
+def failed(res) -> bool:
+    if res.status_code >= 400:
+        return True
+    try:
+        body = res.json()
+    except ValueError:
+        return False
+    return isinstance(body, dict) and "error" in body
+
+
+async def run_user(vu, ops, weights, deadline, samples, errors):
+    async def timed(name, call):
+        start = time.perf_counter()
+        try:
+            res = await call()
+            bad = failed(res)
+        except Exception:
+            res, bad = None, True
+        samples[name].append(time.perf_counter() - start)
+        if bad:
+            errors[name] += 1
+        return res
+
+    while time.perf_counter() < deadline:
+        op = vu.rng.choices(ops, weights)[0]
+        if op == "submit-resume-answer" and not vu.session_open:
+            res = await timed("start-resume-session", vu.start_resume_session)
+            vu.session_open = res is not None and not failed(res)
+            continue
+        res = await timed(op, getattr(vu, op.replace("-", "_")))
+        if op == "submit-resume-answer" and (res is None or failed(res) or "message" in res.json()):
+            vu.session_open = False  # interview complete (or lost): start a new one next time
+
+
+def summarize(samples, errors, elapsed):
+    def stats(values, errs):
+        return {
+            "requests": len(values),
+            "errors": errs,
+            "rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 1) if values else None,
+            "p95_ms": round(percentile(values, 95) * 1000, 1) if values else None,
+            "p99_ms": round(percentile(values, 99) * 1000, 1) if values else None,
+        }
+
+    endpoints = {name: stats(values, errors[name]) for name, values in sorted(samples.items())}
+    everything = [v for values in samples.values() for v in values]
+    return endpoints, stats(everything, sum(errors.values()))
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+def print_table(result, baseline=None):
+    def delta(name, key):
+        if not baseline:
+            return ""
+        before = (baseline["endpoints"].get(name) if name != "overall" else baseline["overall"]) or {}
+        old, new = before.get(key), (result["endpoints"].get(name) if name != "overall" else result["overall"])[key]
+        if not old or new is None:
+            return f"{'':>8}"
+        return f"{(new - old) / old:+7.0%} "
+
+    print(f"{'endpoint':<22} {'req':>6} {'err':>5} {'rps':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}", end="")
+    print(f" {'Δrps':>8} {'Δp95':>8}" if baseline else "")
+    rows = list(result["endpoints"].items()) + [("overall", result["overall"])]
+    for name, row in rows:
+        print(
+            f"{name:<22} {row['requests']:6d} {row['errors']:5d} {row['rps']:7.1f}"
+            f" {row['p50_ms'] or 0:8.1f} {row['p95_ms'] or 0:8.1f} {row['p99_ms'] or 0:8.1f}",
+            end="",
+        )
+        print(f" {delta(name, 'rps')}{delta(name, 'p95_ms')}" if baseline else "")
+
+
+async def main(args):
+    mix = dict(part.split("=") for part in args.mix.split(","))
+    ops, weights = list(mix), [float(w) for w in mix.values()]
+    pdfs = [make_resume_pdf(pages, seed=seed) for seed, pages in enumerate([1, 2, 2, 3, 5, 8][: args.resumes])]
+
+    samples, errors = defaultdict(list), defaultdict(int)
+    async with Harness(
+        latency=args.latency,
+        token_delay=args.token_delay,
+        firestore_latency=args.firestore_latency,
+        llm_cache=not args.no_cache,
+        question_bank=not args.no_bank,
+        port=args.port,
+    ) as harness:
+        users = [VirtualUser(n, harness.client, pdfs, random.Random(n)) for n in range(args.concurrency)]
+        calls = harness.upstream_calls
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(*(run_user(vu, ops, weights, deadline, samples, errors) for vu in users))
+        elapsed = time.perf_counter() - start
+        upstream = harness.upstream_calls - calls
+
+    endpoints, overall = summarize(samples, errors, elapsed)
+    result = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        "elapsed_s": round(elapsed, 2),
+        "upstream_calls": upstream,
+        "endpoints": endpoints,
+        "overall": overall,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    print(f"{args.concurrency} users, {elapsed:.1f} s, {upstream} upstream LLM calls")
+    print_table(result, baseline)
+
+    out = args.out or os.path.join("bench-results", f"load-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    if os.path.dirname(out):
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"results written to {out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="endpoint=weight,...")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub time to first token")
+    parser.add_argument("--token-delay", type=float, default=0.002, help="stub delay per generated token")
+    parser.add_argument("--firestore-latency", type=float, default=0.02)
+    parser.add_argument("--resumes", type=int, default=6, help="distinct resume PDFs in rotation")
+    parser.add_argument("--no-cache", action="store_true", help="disable the LLM completion cache")
+    parser.add_argument("--no-bank", action="store_true", help="disable the topic question bank")
+    parser.add_argument("--port", type=int, default=9700)
+    parser.add_argument("--out", help="JSON results file (default bench-results/load-<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    asyncio.run(main(parser.parse_args()))
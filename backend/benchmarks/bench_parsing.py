@@ -0,0 +1,110 @@
+# benchmarks/bench_parsing.py
+# Success rate and cost of the old ad-hoc parsers vs. llm_parsing on the
+# messy-completion corpus. Every failed parse used to mean an error or
+# "N/A" for the user, and usually a retry (= another LLM call).
+#
+#   cd backend && python benchmarks/bench_parsing.py --samples 300
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.parse_corpus import corpus  # noqa: E402
+from llm_parsing import parse_evaluation, parse_question_list, parse_quiz  # noqa: E402
+
+# ---- the parsers this replaced (verbatim logic) ----
+
+OLD_SCORE_RE = re.compile(r"Score\s*[:\-]?\s*(\d(?:\.\d)?)/?5?", re.IGNORECASE)
+OLD_FEEDBACK_RE = re.compile(r"feedback\s*[:\-]?\s*(.+)", re.IGNORECASE)
+OLD_CORRECT_RE = re.compile(r"Correct Answer\s*[:\-]?\s*(.+)", re.IGNORECASE)
+
+
+def old_evaluation(text):
+    score = OLD_SCORE_RE.search(text)
+    feedback = OLD_FEEDBACK_RE.search(text)
+    correct = OLD_CORRECT_RE.search(text)
+    return (
+        float(score.group(1)) if score else None,
+        feedback.group(1).strip() if feedback else None,
+        correct.group(1).strip() if correct else None,
+    )
+
+
+def old_questions(content):
+    lines = [line.strip() for line in content.split("\n") if line.strip()]
+    questions = [line.split(". ", 1)[-1].strip() for line in lines if line[0].isdigit()]
+    if not questions:
+        raise ValueError("No numbered questions found in model output.")
+    return questions
+
+
+def old_quiz(text):
+    cleaned = re.sub(r"^```(json)?", "", text.strip())
+    cleaned = re.sub(r"```$", "", cleaned)
+    cleaned = cleaned.replace("\\_", "_")
+    cleaned = cleaned.replace("’", "'").replace("“", '"').replace("”", '"')
+    json_start = cleaned.find("[")
+    json_end = cleaned.rfind("]")
+    if json_start == -1 or json_end == -1:
+        raise ValueError("No valid JSON array found in response.")
+    quiz_data = json.loads(cleaned[json_start:json_end + 1])
+    if not isinstance(quiz_data, list):
+        raise ValueError("Parsed data is not a list.")
+    return quiz_data
+
+
+# ---- adapters to a common (parsed) shape ----
+
+def new_evaluation(text):
+    e = parse_evaluation(text)
+    return e.score, e.feedback, e.correct_answer
+
+
+def evaluation_ok(parsed, expected):
+    score, feedback, correct = parsed
+    return score == expected[0] and feedback == expected[1] and correct == expected[2]
+
+
+def questions_ok(parsed, expected):
+    return parsed == expected
+
+
+def quiz_ok(parsed, expected):
+    got = [(q.get("question"), sorted(q.get("correct_answer") or [])) for q in parsed]
+    want = [(q["question"], sorted(q["correct_answer"])) for q in expected]
+    return got == want
+
+
+def score(samples, parse, ok):
+    good, start = 0, time.perf_counter()
+    for text, expected in samples:
+        try:
+            good += ok(parse(text), expected)
+        except Exception:
+            pass
+    return good / len(samples), (time.perf_counter() - start) / len(samples) * 1e6
+
+
+def main(args):
+    data = corpus(args.samples)
+    cases = [
+        ("evaluation", old_evaluation, new_evaluation, evaluation_ok),
+        ("question list", old_questions, parse_question_list, questions_ok),
+        ("quiz", old_quiz, parse_quiz, quiz_ok),
+    ]
+    print(f"{'kind':<14} {'old ok':>8} {'old µs':>8} {'new ok':>8} {'new µs':>8}")
+    for (kind, old, new, ok), samples in zip(cases, data.values()):
+        old_rate, old_us = score(samples, old, ok)
+        new_rate, new_us = score(samples, new, ok)
+        print(f"{kind:<14} {old_rate:8.1%} {old_us:8.1f} {new_rate:8.1%} {new_us:8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, default=300)
+    main(parser.parse_args())
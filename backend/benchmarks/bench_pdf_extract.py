@@ -0,0 +1,56 @@
+# benchmarks/bench_pdf_extract.py
+# Old in-request `text += page.get_text()` vs the pdf_extractor service,
+# over a synthetic corpus of 1 to 150 page PDFs.
+#
+#   cd backend && python benchmarks/bench_pdf_extract.py
+
+import asyncio
+import os
+import sys
+import time
+
+import fitz
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.pdf_corpus import corpus  # noqa: E402
+from pdf_extractor import extract_text, shutdown_pool  # noqa: E402
+from settings import settings  # noqa: E402
+
+
+def old_extract(pdf_bytes):
+    text = ""
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        for page in doc:
+            text += page.get_text()
+    return text
+
+
+async def timed(coro_fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await coro_fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def main():
+    pdfs = corpus()
+    await extract_text(pdfs[1])  # warm the process pool
+
+    print(f"{'pages':>5} {'old ms':>9} {'pool ms':>9} {'budget ms':>10}")
+    for pages, data in pdfs.items():
+        async def old():
+            old_extract(data)
+
+        old_ms = await timed(old)
+        pool_ms = await timed(lambda: extract_text(data))
+        budget_ms = await timed(lambda: extract_text(data, max_chars=settings.resume_text_budget))
+        print(f"{pages:>5} {old_ms:>9.1f} {pool_ms:>9.1f} {budget_ms:>10.1f}")
+
+    shutdown_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
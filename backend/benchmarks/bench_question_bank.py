@@ -0,0 +1,94 @@
+# benchmarks/bench_question_bank.py
+# /topic-question served live vs. from the pre-generated bank, plus a look
+# at refill, dedup and rotation (consecutive users get different sets).
+#
+#   cd backend && python benchmarks/bench_question_bank.py
+
+import argparse
+import asyncio
+import itertools
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import httpx
+from fastapi import FastAPI
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_llm import StubServer, create_stub_app  # noqa: E402
+from clients import registry  # noqa: E402
+from settings import settings  # noqa: E402
+
+_counter = itertools.count()
+
+
+def reply(body):
+    # A fresh batch of numbered questions per call, with some repeats to exercise dedup
+    n = next(_counter)
+    return "\n".join(f"{i}. How would you use Docker feature {(n * 7 + i) % 40}?" for i in range(1, 11))
+
+
+async def timed_requests(client, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        res = await client.post("/topic-question", json={"topic": "Docker", "difficulty": "Easy"})
+        res.raise_for_status()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+async def main(args):
+    with StubServer(create_stub_app(args.latency, reply=reply), port=args.port) as stub, \
+            tempfile.TemporaryDirectory() as tmp:
+        settings.together_url = stub.url
+        settings.llm_cache_enabled = False  # every miss really goes upstream
+
+        import question_bank
+        from topic_question import router
+
+        question_bank.bank = question_bank.QuestionBank(os.path.join(tmp, "bank.sqlite3"))
+        bank = question_bank.bank
+        app = FastAPI()
+        app.include_router(router)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            settings.question_bank_enabled = False
+            live = await timed_requests(client, args.runs)
+            settings.question_bank_enabled = True
+
+            await timed_requests(client, 1)  # first request: miss, banks the live result and tops the key up
+            await asyncio.gather(*bank._top_ups.values())
+            after_miss = []
+            for _ in range(3):
+                res = await client.post("/topic-question", json={"topic": "Docker", "difficulty": "Easy"})
+                after_miss.append(frozenset(res.json()["questions"]))
+            print(f"after one miss: bank {bank.stats()['questions']} questions, next 3 requests got "
+                  f"{len(set(after_miss))} distinct sets")
+            before = stub.app.state.calls
+            added = [await bank.refill_once() for _ in range(4)]
+            print(f"refill rounds added {added} questions ({stub.app.state.calls - before} LLM calls), "
+                  f"bank now {bank.stats()['questions']}; duplicates were skipped")
+
+            calls = stub.app.state.calls
+            banked = await timed_requests(client, args.runs)
+            print(f"live generation     p50 {live:8.2f} ms")
+            print(f"from question bank  p50 {banked:8.2f} ms  ({stub.app.state.calls - calls} LLM calls)")
+
+        start = time.perf_counter()
+        sets = [tuple(bank.take("Docker", "Easy")) for _ in range(1000)]
+        per_take = (time.perf_counter() - start) / len(sets) * 1e6
+        repeats = sum(1 for a, b in zip(sets, sets[1:]) if set(a) & set(b))
+        print(f"bank.take()         {per_take:8.1f} µs per call; consecutive sets sharing a question: {repeats}/999")
+        await registry.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=1.0)
+    parser.add_argument("--port", type=int, default=9700)
+    asyncio.run(main(parser.parse_args()))
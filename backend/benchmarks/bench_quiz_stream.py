@@ -0,0 +1,91 @@
+# benchmarks/bench_quiz_stream.py
+# /generate-quiz as one JSON body vs ?stream=true NDJSON: time until the
+# first question can be rendered, and the total. The stub streams one
+# token every --token-delay seconds; with --bad N, N of the 10 items are
+# malformed (missing options, broken JSON) to show they are skipped.
+# Served by uvicorn: httpx's ASGITransport buffers whole response bodies.
+#
+#   cd backend && python benchmarks/bench_quiz_stream.py --runs 3 --bad 2
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import harness  # noqa: E402
+from benchmarks.stub_llm import StubServer, create_stub_app  # noqa: E402
+from clients import registry  # noqa: E402
+from settings import settings  # noqa: E402
+
+
+# item index -> how it is broken
+BROKEN = {
+    1: lambda raw: raw.replace('"options"', '"choices"'),  # valid JSON, not a question
+    6: lambda raw: raw.replace('",\n  "options"', '"\n  "options"'),  # missing comma
+}
+
+
+def quiz_reply(bad):
+    broken = dict(list(BROKEN.items())[:bad])
+
+    def reply(body):
+        items = [json.dumps(item, indent=2) for item in json.loads(harness.reply(body))]
+        return "[\n" + ",\n".join(broken.get(n, str)(raw) for n, raw in enumerate(items)) + "\n]"
+    return reply
+
+
+async def measure(client, stream):
+    start = time.perf_counter()
+    if not stream:
+        res = await client.post("/generate-quiz", json={"topic": "Docker"})
+        elapsed = time.perf_counter() - start
+        return elapsed, elapsed, len(res.json()) if res.status_code == 200 else 0
+    first, count = None, 0
+    async with client.stream("POST", "/generate-quiz?stream=true", json={"topic": "Docker"}) as res:
+        async for line in res.aiter_lines():
+            if line and "question" in json.loads(line):
+                count += 1
+                if first is None:
+                    first = time.perf_counter() - start
+    return first, time.perf_counter() - start, count
+
+
+async def main(args):
+    stub_app = create_stub_app(args.latency, reply=quiz_reply(args.bad), token_delay=args.token_delay)
+    with StubServer(stub_app, port=args.port) as stub:
+        from quiz_generator import router
+
+        settings.together_url = stub.url
+        settings.llm_cache_enabled = False
+        app = FastAPI()
+        app.include_router(router)
+
+        with StubServer(app, port=args.port + 1) as api:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{api.port}", timeout=120) as client:
+                for label, stream in (("json body", False), ("ndjson stream", True)):
+                    runs = [await measure(client, stream) for _ in range(args.runs)]
+                    first = statistics.median(r[0] for r in runs)
+                    total = statistics.median(r[1] for r in runs)
+                    print(
+                        f"{label:<14} first question p50 {first * 1000:7.1f} ms   total p50 {total * 1000:7.1f} ms"
+                        f"   questions {runs[0][2]}"
+                    )
+        await registry.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    parser.add_argument("--bad", type=int, default=0, help="malformed items out of 10 (max 2)")
+    parser.add_argument("--port", type=int, default=9900)
+    asyncio.run(main(parser.parse_args()))
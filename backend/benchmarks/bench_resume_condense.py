@@ -0,0 +1,114 @@
+# benchmarks/bench_resume_condense.py
+# Prompt tokens and end-to-end latency of the resume prompts, old vs.
+# condensed: question generation used resume_text[:3000], the review sent
+# the whole text. The stub LLM charges prefill time per prompt token, and
+# "skills kept" counts how many of the resume's role skills reach the
+# prompt (truncation drops whatever comes after a long summary/experience).
+#
+#   cd backend && python benchmarks/bench_resume_condense.py --resumes 40
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_llm import StubServer, create_stub_app  # noqa: E402
+from clients import registry  # noqa: E402
+from resume_condenser import ROLE_TERMS, condense, count_tokens  # noqa: E402
+from settings import settings  # noqa: E402
+
+ROLES = ["DevOps", "Full stack Development", "Data Scientist", "Data Engineer"]
+FILLER = (
+    "collaborated with cross-functional stakeholders to deliver business value in an agile environment "
+    "participated in daily standups sprint planning and retrospectives while maintaining documentation"
+).split()
+VERBS = ["Built", "Migrated", "Automated", "Designed", "Reduced", "Owned", "Led", "Improved"]
+
+
+def make_resume(role: str, jobs: int, rng: random.Random):
+    """Text as extract_text() returns it: contact line, page footers, a
+    running footer on every page, "\f" page breaks, wrapped bullets,
+    skills listed after the experience."""
+    key = next(name for name in ROLE_TERMS if name in role.lower())
+    skills = rng.sample(ROLE_TERMS[key].split(), 8)
+    lines = ["Jordan Example", "jordan@example.com | +1 555 010 2030 | linkedin.com/in/jordan", "Summary"]
+    lines += [" ".join(rng.choice(FILLER) for _ in range(14)) for _ in range(4)]
+    lines.append("Experience")
+    for job in range(jobs):
+        lines.append(f"Engineer, Company {job} (20{10 + job % 14}-20{11 + job % 14})")
+        for _ in range(6):
+            tech = rng.choice(skills) if rng.random() < 0.4 else rng.choice(FILLER)
+            lines.append(f"• {rng.choice(VERBS)} {tech} " + " ".join(rng.choice(FILLER) for _ in range(10)))
+            lines.append(" ".join(rng.choice(FILLER) for _ in range(8)))  # wrapped line
+        if job % 3 == 2:
+            lines += ["Jordan Example - Resume", f"Page {job // 3 + 1}", "\f"]
+    lines.append("Skills")
+    lines.append(", ".join(skills))
+    lines += ["Education", "B.Sc. Computer Science, State University", "References available upon request"]
+    lines += ["Jordan Example - Resume", f"Page {jobs // 3 + 1}"]
+    return "\n".join(lines), skills
+
+
+def prompt_for(resume_text: str) -> list:
+    return [{"role": "user", "content": f"Generate 5 technical interview questions.\n\nResume:\n{resume_text}"}]
+
+
+async def timed(call):
+    start = time.perf_counter()
+    await call
+    return (time.perf_counter() - start) * 1000
+
+
+async def main(args):
+    rng = random.Random(11)
+    resumes = [(role, *make_resume(role, rng.choice([2, 4, 8, 16, 30]), rng)) for role in rng.choices(ROLES, k=args.resumes)]
+
+    with StubServer(create_stub_app(args.latency, reply="ok", prompt_token_delay=args.prefill), port=args.port) as stub:
+        settings.together_url = stub.url
+        settings.llm_cache_enabled = False
+        from llm_client import chat_completion
+
+        rows = {}
+        for kind, old_text, budget in [
+            ("questions", lambda text: text[:3000], settings.resume_prompt_tokens),
+            ("review", lambda text: text, settings.resume_review_prompt_tokens),
+        ]:
+            old_tokens, new_tokens, old_ms, new_ms, condense_ms, kept_old, kept_new = [], [], [], [], [], 0, 0
+            for role, text, skills in resumes:
+                start = time.perf_counter()
+                condensed = condense(text, role if kind == "review" else "", budget)
+                condense_ms.append((time.perf_counter() - start) * 1000)
+                old = old_text(text)
+                old_tokens.append(count_tokens(old))
+                new_tokens.append(condensed.tokens_after)
+                kept_old += sum(skill in old for skill in skills)
+                kept_new += sum(skill in condensed.text for skill in skills)
+                old_ms.append(await timed(chat_completion(prompt_for(old))))
+                new_ms.append(await timed(chat_completion(prompt_for(condensed.text))))
+            total = sum(len(skills) for _, _, skills in resumes)
+            rows[kind] = (old_tokens, new_tokens, old_ms, new_ms, condense_ms, kept_old / total, kept_new / total)
+        await registry.aclose()
+
+    print(f"{len(resumes)} resumes, prefill {args.prefill * 1000:.2f} ms/token")
+    print(f"{'prompt':<10} {'old tok':>8} {'new tok':>8} {'saved':>6} {'old ms':>8} {'new ms':>8} {'condense':>9} {'skills old':>10} {'new':>5}")
+    for kind, (old_t, new_t, old_ms, new_ms, c_ms, k_old, k_new) in rows.items():
+        saved = 1 - sum(new_t) / sum(old_t)
+        print(
+            f"{kind:<10} {statistics.mean(old_t):8.0f} {statistics.mean(new_t):8.0f} {saved:6.0%}"
+            f" {statistics.mean(old_ms):8.1f} {statistics.mean(new_ms):8.1f} {statistics.mean(c_ms):7.2f}ms"
+            f" {k_old:10.0%} {k_new:5.0%}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--prefill", type=float, default=0.0002, help="seconds of prefill per prompt token")
+    parser.add_argument("--port", type=int, default=9410)
+    asyncio.run(main(parser.parse_args()))
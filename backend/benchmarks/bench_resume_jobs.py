@@ -0,0 +1,132 @@
+# benchmarks/bench_resume_jobs.py
+# /resume-review held open for the whole review vs ?job=true + long-poll
+# on GET /jobs/{id}, on benchmarks/harness.py with a slow stub review.
+# Reported per mode: how long the longest single HTTP request stays open
+# (what a proxy timeout cuts), submit latency, time to the result and the
+# peak number of concurrent upstream calls.
+#
+# Then a crash: workers are killed mid-job without requeueing anything
+# and a fresh JobQueue on the same SQLite file takes over once the
+# leases expire; every job still finishes.
+#
+#   cd backend && python benchmarks/bench_resume_jobs.py --clients 16 --latency 3 --wait 5
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import Harness  # noqa: E402  (must come before settings)
+from benchmarks.pdf_corpus import make_resume_pdf  # noqa: E402
+import jobs  # noqa: E402
+from settings import settings  # noqa: E402
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+async def review_sync(client, pdf):
+    start = time.perf_counter()
+    res = await client.post("/resume-review", data={"role": "DevOps"}, files={"file": ("r.pdf", pdf, "application/pdf")})
+    res.raise_for_status()
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed, elapsed
+
+
+async def review_job(client, pdf, wait):
+    start = time.perf_counter()
+    res = await client.post(
+        "/resume-review?job=true", data={"role": "DevOps"}, files={"file": ("r.pdf", pdf, "application/pdf")}
+    )
+    assert res.status_code == 202, res.text
+    submitted = time.perf_counter() - start
+    longest = submitted
+    while True:
+        poll_start = time.perf_counter()
+        job = (await client.get(f"/jobs/{res.json()['job_id']}", params={"wait": wait})).json()
+        longest = max(longest, time.perf_counter() - poll_start)
+        if job["status"] in jobs.FINISHED:
+            assert job["status"] == "done", job
+            return submitted, time.perf_counter() - start, longest
+
+
+async def compare(args):
+    settings.llm_hedge_enabled = False  # one upstream call per review in both modes
+    modes = [("sync request", None)] + [(f"job, {n} workers", n) for n in args.workers]
+    for mode, (label, workers) in enumerate(modes):
+        # Distinct PDFs per client and mode: no review cache hits
+        pdfs = [make_resume_pdf(2, seed=100 * (mode + 1) + n) for n in range(args.clients)]
+        if workers:
+            jobs.queue.workers = workers
+        async with Harness(latency=args.latency) as h:
+            if workers is None:
+                run = review_sync
+            else:
+                def run(client, pdf):
+                    return review_job(client, pdf, args.wait)
+            results = await asyncio.gather(*(run(h.client, pdf) for pdf in pdfs))
+            submit = [r[0] for r in results]
+            total = [r[1] for r in results]
+            print(
+                f"{label:<17} longest request {max(r[2] for r in results):6.2f} s   submit p50 {statistics.median(submit) * 1000:7.1f} ms"
+                f"   result p50 {statistics.median(total):6.2f} s  p99 {percentile(total, 99):6.2f} s"
+                f"   peak upstream {h.stub_app.state.peak_active}"
+            )
+
+
+async def crash(args):
+    settings.job_timeout = 1.0
+    jobs.queue.workers = 4
+    jobs.LEASE_MARGIN = 0.5
+    async with Harness(latency=args.latency) as h:
+        pdfs = [make_resume_pdf(1, seed=900 + n) for n in range(8)]
+        ids = []
+        for pdf in pdfs:
+            res = await h.client.post(
+                "/resume-review?job=true", data={"role": "DevOps"}, files={"file": ("r.pdf", pdf, "application/pdf")}
+            )
+            ids.append(res.json()["job_id"])
+        await asyncio.sleep(0.3)
+        # Crash: workers vanish mid-job; nothing is handed back
+        for task in jobs.queue._tasks:
+            task.cancel()
+        await asyncio.gather(*jobs.queue._tasks, return_exceptions=True)
+        jobs.queue._tasks, jobs.queue._running = [], set()
+        before = {k: v for k, v in jobs.queue.stats()["jobs"].items() if k in ("queued", "running")}
+
+        # Restarted process: same file, same handlers; review now fast enough for the time limit
+        settings.job_timeout = 30.0
+        h.stub_app.state.latency = 0.2
+        await asyncio.sleep(1.6)
+        restarted = jobs.JobQueue(path=settings.job_db)
+        restarted._handlers = jobs.queue._handlers
+        jobs.queue = restarted
+        started = time.perf_counter()
+        restarted.start()
+        finished = [await restarted.wait(job_id, 30) for job_id in ids]
+        await restarted.stop()
+        print(
+            f"crash + restart   before {before}   after: {sum(j['status'] == 'done' for j in finished)}/{len(ids)} done"
+            f" in {time.perf_counter() - started:.2f} s, recovered {restarted.recovered},"
+            f" attempts {sorted(j['attempts'] for j in finished)}"
+        )
+
+
+async def main(args):
+    await compare(args)
+    await crash(args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=3.0, help="stub LLM time per review")
+    parser.add_argument("--wait", type=float, default=5, help="long-poll seconds per GET /jobs/{id}")
+    parser.add_argument("--workers", type=int, nargs="+", default=[4, 16], help="job worker pool sizes to try")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,76 @@
+# benchmarks/bench_session_store.py
+# Multi-worker load test for the SQLite session store.
+#
+# N worker processes (standing in for uvicorn workers) share one database.
+# Phase 1: every worker starts and completes its own sessions.
+# Phase 2: all workers race to answer the *same* sessions; the
+# compare-and-set must record each question exactly once.
+#
+#   cd backend && python benchmarks/bench_session_store.py --workers 4
+
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from session_store import SQLiteSessionStore  # noqa: E402
+
+QUESTIONS = [f"Question {i}?" for i in range(5)]
+
+
+def own_sessions(path, worker, count):
+    store = SQLiteSessionStore(path)
+    for n in range(count):
+        user = f"user-{worker}-{n}"
+        store.create(user, QUESTIONS)
+        for index in range(len(QUESTIONS)):
+            assert store.advance(user, index, {"answer": f"a{index}"}) is not None
+    return count * (1 + len(QUESTIONS))
+
+
+def shared_sessions(path, worker, users):
+    store = SQLiteSessionStore(path)
+    won = 0
+    for user in users:
+        while True:
+            session = store.get(user)
+            if session["index"] >= len(QUESTIONS):
+                break
+            if store.advance(user, session["index"], {"answer": f"w{worker}"}) is not None:
+                won += 1
+    return won
+
+
+def main(args):
+    path = os.path.join(tempfile.mkdtemp(), "sessions.sqlite3")
+    SQLiteSessionStore(path)
+
+    with mp.Pool(args.workers) as pool:
+        start = time.perf_counter()
+        ops = sum(pool.starmap(own_sessions, [(path, w, args.sessions) for w in range(args.workers)]))
+        elapsed = time.perf_counter() - start
+        print(f"independent: {args.workers} workers, {ops} ops in {elapsed:.2f}s -> {ops / elapsed:,.0f} ops/s")
+
+        store = SQLiteSessionStore(path)
+        users = [f"shared-{n}" for n in range(args.sessions)]
+        for user in users:
+            store.create(user, QUESTIONS)
+        start = time.perf_counter()
+        won = sum(pool.starmap(shared_sessions, [(path, w, users) for w in range(args.workers)]))
+        elapsed = time.perf_counter() - start
+
+    recorded = sum(len(store.get(u)["answers"]) for u in users)
+    expected = len(users) * len(QUESTIONS)
+    print(f"contended:   {won} successful advances, {recorded} answers stored, expected {expected} ({elapsed:.2f}s)")
+    assert won == recorded == expected, "lost or duplicated answers"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--sessions", type=int, default=200)
+    main(parser.parse_args())
@@ -0,0 +1,88 @@
+# benchmarks/bench_singleflight.py
+# N students ask for the same topic at the same moment: upstream calls
+# without and with request coalescing, plus the cancellation and error
+# cases (one waiter cancelled, every waiter cancelled, upstream failure).
+#
+#   cd backend && python benchmarks/bench_singleflight.py --concurrency 50
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_llm import StubServer, create_stub_app  # noqa: E402
+from clients import registry  # noqa: E402
+from settings import settings  # noqa: E402
+
+QUESTION_REPLY = "What is a closure?\nExplain the GIL.\nWhat is a decorator?"
+
+
+async def run(label, stub, make_call, concurrency):
+    calls = stub.app.state.calls
+    start = time.perf_counter()
+    results = await asyncio.gather(*(make_call() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<16} {concurrency} requests  {stub.app.state.calls - calls:3d} upstream calls  {elapsed * 1000:7.1f} ms")
+    return results
+
+
+async def check_cancellation(stub, generate):
+    # One waiter gives up: the others still get the answer
+    calls = stub.app.state.calls
+    tasks = [asyncio.ensure_future(generate("python", "Easy")) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    tasks[0].cancel()
+    done = await asyncio.gather(*tasks, return_exceptions=True)
+    assert isinstance(done[0], asyncio.CancelledError) and done[1] == done[2] == QUESTION_REPLY.split("\n")
+    print(f"one waiter cancelled: others served, {stub.app.state.calls - calls} upstream call")
+
+    # Every waiter gives up: the shared call is cancelled too
+    from llm_cache import flight
+
+    tasks = [asyncio.ensure_future(generate("rust", "Easy")) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert flight.in_flight() == 0
+    print("all waiters cancelled: shared call cancelled, nothing left in flight")
+
+
+async def check_errors(stub, generate):
+    stub.app.state.reply = ""  # parse_question_list rejects an empty reply
+    results = await asyncio.gather(*(generate("go", "Hard") for _ in range(5)), return_exceptions=True)
+    stub.app.state.reply = QUESTION_REPLY
+    assert all(isinstance(r, ValueError) for r in results)
+    print(f"upstream error: raised in all {len(results)} waiters")
+
+
+async def main(args):
+    with StubServer(create_stub_app(args.latency, reply=QUESTION_REPLY), port=args.port) as stub:
+        settings.together_url = stub.url
+        settings.llm_cache_enabled = False  # measure coalescing alone
+
+        import llm_client
+        from topic_question_generator import generate_questions_by_topic
+
+        messages = [{"role": "user", "content": "Generate 5 questions on python"}]
+        await run("no coalescing", stub, lambda: llm_client.chat_completion(messages), args.concurrency)
+        results = await run(
+            "single-flight", stub, lambda: generate_questions_by_topic("python", "Easy"), args.concurrency
+        )
+        assert all(r == results[0] for r in results)
+
+        await check_cancellation(stub, generate_questions_by_topic)
+        await check_errors(stub, generate_questions_by_topic)
+        await registry.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--port", type=int, default=9400)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,80 @@
+# benchmarks/bench_startup.py
+# Cold-start cost of the API: time to `import main` (which heavy SDKs it
+# pulls in) and time from launching uvicorn to the first /topic-question
+# answer, with the LLM pointed at the local stub.
+#
+#   cd backend && python benchmarks/bench_startup.py --runs 5
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+from benchmarks.stub_llm import StubServer, create_stub_app  # noqa: E402
+
+HEAVY_MODULES = ("fitz", "grpc", "google.cloud.firestore", "firebase_admin.firestore")
+
+IMPORT_PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+QUESTION_REPLY = "1. What is a closure?\n2. Explain the GIL.\n3. What is a decorator?"
+
+
+def measure_import():
+    out = subprocess.run([sys.executable, "-c", IMPORT_PROBE], cwd=BACKEND, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure_first_request(stub_url, port):
+    env = dict(os.environ, TOGETHER_URL=stub_url, LLM_CACHE_ENABLED="0")
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND,
+        env=env,
+    )
+    try:
+        with httpx.Client(timeout=10) as client:
+            while True:
+                try:
+                    res = client.post(f"http://127.0.0.1:{port}/topic-question", json={"topic": "python"})
+                    res.raise_for_status()
+                    return time.perf_counter() - start
+                except httpx.TransportError:
+                    if proc.poll() is not None:
+                        raise RuntimeError("uvicorn exited before serving a request")
+                    time.sleep(0.01)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main(args):
+    imports = [measure_import() for _ in range(args.runs)]
+    print(f"import main        p50 {statistics.median(r['seconds'] for r in imports) * 1000:7.1f} ms")
+    print(f"heavy modules loaded at import: {imports[0]['loaded'] or 'none'}")
+
+    with StubServer(create_stub_app(args.latency, reply=QUESTION_REPLY), port=args.port) as stub:
+        firsts = [measure_first_request(stub.url, args.port + 1) for _ in range(args.runs)]
+    print(f"first /topic-question p50 {statistics.median(firsts) * 1000:7.1f} ms (stub latency {args.latency * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--port", type=int, default=9300)
+    main(parser.parse_args())
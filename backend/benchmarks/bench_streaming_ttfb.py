@@ -0,0 +1,61 @@
+# benchmarks/bench_streaming_ttfb.py
+# Time-to-first-byte of /topic-evaluate with and without ?stream=true,
+# against the stub LLM streaming one token every --token-delay seconds.
+#
+#   cd backend && python benchmarks/bench_streaming_ttfb.py
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_llm import StubServer, create_stub_app  # noqa: E402
+
+
+async def measure(client, url, runs):
+    ttfb, total = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        async with client.stream("POST", url, json={"question": "What is CI/CD?", "answer": "Automation."}) as res:
+            first = None
+            async for _ in res.aiter_raw():
+                if first is None:
+                    first = time.perf_counter() - start
+        ttfb.append(first)
+        total.append(time.perf_counter() - start)
+    return statistics.median(ttfb), statistics.median(total)
+
+
+async def main(args):
+    with StubServer(create_stub_app(args.latency, token_delay=args.token_delay), port=args.port) as stub:
+        from clients import registry
+        from settings import settings
+        from topic_evaluate import router
+
+        settings.together_url = stub.url
+        app = FastAPI()
+        app.include_router(router)
+
+        with StubServer(app, port=args.port + 1) as api:
+            base = f"http://127.0.0.1:{api.port}/topic-evaluate"
+            async with httpx.AsyncClient(timeout=60) as client:
+                for label, url in (("json (today)", base), ("sse stream", base + "?stream=true")):
+                    ttfb, total = await measure(client, url, args.runs)
+                    print(f"{label:<14} ttfb p50 {ttfb * 1000:7.1f} ms   total p50 {total * 1000:7.1f} ms")
+        await registry.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--token-delay", type=float, default=0.05)
+    parser.add_argument("--port", type=int, default=9100)
+    asyncio.run(main(parser.parse_args()))
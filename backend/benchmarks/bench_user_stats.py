@@ -0,0 +1,80 @@
+# benchmarks/bench_user_stats.py
+# "How am I doing" for a user with N stored evaluations: paging the whole
+# history through /get-sessions' summary view and averaging on the client
+# vs. reading the write-time user_stats document. Also the write-path
+# cost: record() per evaluation, the commits its flushes take, and the
+# stored recent list, which must stay bounded (flushed every 100 records).
+#
+#   cd backend && python benchmarks/bench_user_stats.py --history 100 1000 5000
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_firestore import FakeFirestore  # noqa: E402
+from session_history import fetch_sessions_page  # noqa: E402
+from user_stats import UserStats  # noqa: E402
+
+TOPICS = ["Docker", "Kubernetes", "Python", "SQL"]
+
+
+def client_side_summary(db, user):
+    scores, cursor = [], None
+    while True:
+        items, cursor = fetch_sessions_page(db, user, limit=200, cursor=cursor, view="summary")
+        scores += [item["score"] for item in items if item["score"] is not None]
+        if cursor is None:
+            return statistics.mean(scores), len(scores)
+
+
+async def main(args):
+    print(f"{'history':>8} {'page reads':>10} {'pages ms':>9} {'stats reads':>11} {'stats ms':>9} {'record µs':>10} {'commits':>8} {'recent kept':>11}")
+    for size in args.history:
+        db = FakeFirestore(latency=args.latency)
+        stats = UserStats(client_factory=lambda: db, flush_ms=200)
+        user, start_at = f"user-{size}@bench.dev", datetime(2026, 1, 1)
+
+        history = [(start_at + timedelta(minutes=n), (n % 5) + 1) for n in range(size)]
+        for n, (at, score) in enumerate(history):
+            feedback = f"Score: {score}\nConstructive feedback: ok\nCorrect Answer: x"
+            db.collection("interview_sessions").document(f"s{n:06d}")._write(
+                {"user": user, "question": f"Q{n}", "answer": "A", "feedback": feedback, "timestamp": at}
+            )
+
+        # Write path: what each stored evaluation costs the request handler
+        record_s = 0.0
+        for n, (at, score) in enumerate(history):
+            t = time.perf_counter()
+            stats.record(user, score, TOPICS[n % len(TOPICS)], "interview", f"Q{n}", at)
+            record_s += time.perf_counter() - t
+            if n % 100 == 99:
+                await stats.flush()
+        record_us = record_s / size * 1e6
+        await stats.stop()
+        kept = len(db.collection("user_stats").document(user).get().to_dict()["recent"])
+
+        reads = db.reads
+        t = time.perf_counter()
+        mean_pages, _ = client_side_summary(db, user)
+        pages_ms, page_reads = (time.perf_counter() - t) * 1000, db.reads - reads
+
+        reads = db.reads
+        t = time.perf_counter()
+        summary = stats.read(user)
+        stats_ms, stats_reads = (time.perf_counter() - t) * 1000, db.reads - reads
+        assert summary["count"] == size and abs(summary["mean_score"] - mean_pages) < 0.01
+
+        print(f"{size:8d} {page_reads:10d} {pages_ms:9.1f} {stats_reads:11d} {stats_ms:9.1f} {record_us:10.1f} {stats.commits:8d} {kept:11d}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--history", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--latency", type=float, default=0.02, help="Firestore round trip")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,145 @@
+# benchmarks/bench_ws_interview.py
+# --candidates simulated candidates run a 5-question resume interview at
+# the same time against the whole app served by uvicorn (stub LLM,
+# FakeFirestore; sessions are created directly so only the interview is
+# measured):
+#
+#   http  POST /submit-resume-answer per answer; the next question comes
+#         back with the grade
+#   ws    one /ws/resume-interview connection; the next question is pushed
+#         once the answer is accepted, grades arrive as they finish
+#
+# Reported: answer -> next question (p50/p99, first 4 answers), time
+# until the interview is over with every grade in, throughput, errors.
+# Candidates, app and stub share one process (and here one CPU), so the
+# absolute numbers are pessimistic; compare the two modes.
+#
+#   cd backend && python benchmarks/bench_ws_interview.py --candidates 1000 --latency 0.5
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+# Enough upstream slots and pooled connections for the stub; not what is measured here
+os.environ.setdefault("LLM_CONCURRENCY", "256")
+os.environ.setdefault("LLM_MAX_CONCURRENCY", "512")
+os.environ.setdefault("LLM_QUEUE_MAX", "8192")
+os.environ.setdefault("LLM_QUEUE_TIMEOUT", "120")
+os.environ.setdefault("LLM_POOL_SIZE", "1024")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from websockets.asyncio.client import connect  # noqa: E402
+
+from benchmarks import harness  # noqa: E402  (must come before settings)
+from benchmarks.fake_firestore import FakeFirestore  # noqa: E402
+from benchmarks.stub_llm import StubServer, create_stub_app  # noqa: E402
+from clients import registry  # noqa: E402
+from settings import settings  # noqa: E402
+
+QUESTIONS = [f"Tell me about project {n} on your resume and the trade-offs you made." for n in range(1, 6)]
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def answer_text(user, n):
+    return f"{user} answer {n}: I designed the pipeline, measured it and rolled it out gradually."
+
+
+async def candidate_http(client, user, think, gaps, errors):
+    for n in range(len(QUESTIONS)):
+        await asyncio.sleep(think)
+        start = time.perf_counter()
+        res = await client.post("/submit-resume-answer", json={"user": user, "answer": answer_text(user, n)})
+        body = res.json() if res.status_code == 200 else {}
+        if "feedback" not in body:
+            errors.append(body.get("error") or res.status_code)
+        if n < len(QUESTIONS) - 1:
+            gaps.append(time.perf_counter() - start)
+
+
+async def candidate_ws(base, user, think, gaps, errors):
+    async with connect(f"{base}/ws/resume-interview?user={user}", max_size=None, open_timeout=120) as ws:
+        message = json.loads(await ws.recv())  # current question, pushed on connect
+        for n in range(len(QUESTIONS)):
+            await asyncio.sleep(think)
+            start = time.perf_counter()
+            await ws.send(json.dumps({"type": "answer", "answer": answer_text(user, n), "index": n}))
+            while True:
+                message = json.loads(await ws.recv())
+                if message["type"] == "error":
+                    errors.append(message["error"])
+                if message["type"] in ("question", "complete"):
+                    break
+            if n < len(QUESTIONS) - 1:
+                gaps.append(time.perf_counter() - start)
+        # "complete" comes after the last grade has been pushed
+        assert message["type"] == "complete", message
+
+
+async def run(label, candidate, users, think):
+    from resume_session import sessions
+
+    for user in users:
+        sessions.create(user, QUESTIONS)
+    gaps, errors = [], []
+    start = time.perf_counter()
+    durations = []
+
+    async def one(user):
+        t = time.perf_counter()
+        try:
+            await candidate(user, think, gaps, errors)
+        except Exception as e:
+            errors.append(repr(e))
+        durations.append(time.perf_counter() - t)
+
+    await asyncio.gather(*(one(user) for user in users))
+    elapsed = time.perf_counter() - start
+    graded = sum(
+        1 for user in users for a in (sessions.get(user) or {}).get("answers", []) if a.get("feedback")
+    )
+    print(
+        f"{label:<5} answer->next question p50 {statistics.median(gaps) * 1000:7.1f} ms  p99 {percentile(gaps, 99) * 1000:7.1f} ms"
+        f"   interview p50 {statistics.median(durations):6.2f} s  p99 {percentile(durations, 99):6.2f} s"
+        f"   {graded / elapsed:6.1f} grades/s   graded {graded}/{len(users) * len(QUESTIONS)}   errors {len(errors)}"
+    )
+    if errors:
+        print(f"      first error: {errors[0]}")
+
+
+async def main(args):
+    settings.answer_reuse_enabled = False  # every answer is graded by the (stub) LLM
+    settings.question_bank_enabled = False
+    with StubServer(create_stub_app(args.latency, reply=harness.reply), port=args.port) as stub:
+        settings.together_url = stub.url
+        registry.set_firestore(FakeFirestore(latency=0.005))
+        from main import app
+
+        # The app on its own uvicorn thread (lifespan included); httpx's ASGI transport has no WebSockets
+        with StubServer(app, port=args.port + 1) as api:
+            base = f"http://127.0.0.1:{api.port}"
+            limits = httpx.Limits(max_connections=args.candidates, max_keepalive_connections=args.candidates)
+            async with httpx.AsyncClient(base_url=base, timeout=300, limits=limits) as client:
+                users = [f"http-{n}@bench.dev" for n in range(args.candidates)]
+                await run("http", lambda u, *a: candidate_http(client, u, *a), users, args.think)
+            users = [f"ws-{n}@bench.dev" for n in range(args.candidates)]
+            ws_base = base.replace("http://", "ws://")
+            await run("ws", lambda u, *a: candidate_ws(ws_base, u, *a), users, args.think)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.5, help="stub LLM time per evaluation")
+    parser.add_argument("--think", type=float, default=0.5, help="candidate time per answer")
+    parser.add_argument("--port", type=int, default=9950)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,213 @@
+# benchmarks/fake_firestore.py
+# In-process stand-in for the subset of the Firestore client the backend
+# uses. Every round trip (get, stream, commit, add) sleeps `latency`
+# seconds, and `fail_rate` injects transient commit errors. Merge writes
+# apply Increment / ArrayUnion / ArrayRemove transforms like the server.
+
+import copy
+import random
+import threading
+import time
+import uuid
+
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data, reference=None):
+        self.id = doc_id
+        self._data = data
+        self.reference = reference
+        self.exists = data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field):
+        return (self._data or {}).get(field)
+
+
+def _apply(current, value):
+    kind = type(value).__name__
+    if kind == "Increment":
+        return (current or 0) + value.value
+    if kind == "ArrayUnion":
+        return (current or []) + [v for v in value.values if v not in (current or [])]
+    if kind == "ArrayRemove":
+        return [v for v in current or [] if v not in value.values]
+    if isinstance(value, dict):
+        merged = dict(current) if isinstance(current, dict) else {}
+        for key, inner in value.items():
+            merged[key] = _apply(merged.get(key), inner)
+        return merged
+    return copy.deepcopy(value)
+
+
+class FakeDocRef:
+    def __init__(self, db, collection, doc_id):
+        self._db = db
+        self._collection = collection
+        self.id = doc_id
+
+    def get(self, transaction=None):
+        self._db._round_trip()
+        self._db.reads += 1
+        return FakeSnapshot(self.id, self._db._docs(self._collection).get(self.id), self)
+
+    def _write(self, data, merge=False):
+        docs = self._db._docs(self._collection)
+        if merge and self.id in docs:
+            docs[self.id] = _apply(docs[self.id], data)
+        else:
+            docs[self.id] = _apply(None, data)
+        self._db.writes += 1
+
+    def set(self, data, merge=False):
+        self._db._round_trip()
+        with self._db._lock:
+            self._write(data, merge)
+
+    def update(self, data):
+        self.set(data, merge=True)
+
+    def delete(self):
+        self._db._round_trip()
+        with self._db._lock:
+            self._db._docs(self._collection).pop(self.id, None)
+
+
+class FakeQuery:
+    def __init__(self, db, collection, filters=(), order=None, offset_after=None, limit=None, fields=None):
+        self._db = db
+        self._collection = collection
+        self._filters = list(filters)
+        self._order = order or []
+        self._after = offset_after
+        self._limit = limit
+        self._fields = fields
+
+    def _copy(self, **changes):
+        state = dict(
+            filters=self._filters, order=self._order, offset_after=self._after,
+            limit=self._limit, fields=self._fields,
+        )
+        state.update(changes)
+        return FakeQuery(self._db, self._collection, **state)
+
+    def where(self, field=None, op=None, value=None, filter=None):
+        if filter is not None:
+            field, op, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + [(field, op, value)])
+
+    def order_by(self, field, direction="ASCENDING"):
+        return self._copy(order=self._order + [(field, direction)])
+
+    def start_after(self, cursor):
+        values = cursor.to_dict() if isinstance(cursor, FakeSnapshot) else cursor
+        if isinstance(cursor, FakeSnapshot):
+            values = dict(values or {}, __name__=cursor.id)
+        return self._copy(offset_after=values)
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def select(self, field_paths):
+        return self._copy(fields=list(field_paths))
+
+    def _sort_key(self, item):
+        doc_id, data = item
+        return tuple(data.get(f) if f != "__name__" else doc_id for f, _ in self._order)
+
+    def stream(self, transaction=None):
+        self._db._round_trip()
+        with self._db._lock:
+            items = list(self._db._docs(self._collection).items())
+        for field, op, value in self._filters:
+            if op != "==":
+                raise NotImplementedError(op)
+            items = [(i, d) for i, d in items if d.get(field) == value]
+        if self._order:
+            descending = self._order[0][1] == "DESCENDING"
+            items.sort(key=self._sort_key, reverse=descending)
+            if self._after is not None:
+                after = tuple(self._after.get(f) for f, _ in self._order)
+                items = [
+                    (i, d) for i, d in items
+                    if (self._sort_key((i, d)) < after if descending else self._sort_key((i, d)) > after)
+                ]
+        if self._limit is not None:
+            items = items[: self._limit]
+        self._db.reads += len(items)
+        for doc_id, data in items:
+            if self._fields is not None:
+                data = {f: data[f] for f in self._fields if f in data}
+            yield FakeSnapshot(doc_id, copy.deepcopy(data), FakeDocRef(self._db, self._collection, doc_id))
+
+    def get(self):
+        return list(self.stream())
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, db, name):
+        super().__init__(db, name)
+
+    def document(self, doc_id=None):
+        return FakeDocRef(self._db, self._collection, doc_id or uuid.uuid4().hex[:20])
+
+    def add(self, data):
+        ref = self.document()
+        ref.set(data)
+        return time.time(), ref
+
+
+class FakeBatch:
+    def __init__(self, db):
+        self._db = db
+        self._ops = []
+
+    def set(self, ref, data, merge=False):
+        self._ops.append((ref, data, merge))
+
+    def update(self, ref, data):
+        self._ops.append((ref, data, True))
+
+    def commit(self):
+        self._db._round_trip()
+        if random.random() < self._db.fail_rate:
+            raise RuntimeError("injected commit failure")
+        with self._db._lock:
+            for ref, data, merge in self._ops:
+                ref._write(data, merge)
+        self._db.commits += 1
+
+
+class FakeFirestore:
+    def __init__(self, latency: float = 0.0, fail_rate: float = 0.0):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.data = {}
+        self.reads = 0
+        self.writes = 0
+        self.commits = 0
+        self._lock = threading.RLock()
+
+    def _round_trip(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _docs(self, collection):
+        return self.data.setdefault(collection, {})
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def get_all(self, references, field_paths=None):
+        """Batched document reads in one round trip."""
+        self._round_trip()
+        for ref in references:
+            self.reads += 1
+            data = self._docs(ref._collection).get(ref.id)
+            if data is not None and field_paths is not None:
+                data = {f: data[f] for f in field_paths if f in data}
+            yield FakeSnapshot(ref.id, copy.deepcopy(data), ref)
@@ -0,0 +1,130 @@
+# benchmarks/harness.py
+# The whole app in process, against fakes: main.app (with its lifespan)
+# behind an httpx.ASGITransport, the stub chat-completions server and
+# FakeFirestore. The stub answers in the shape each endpoint's prompt asks
+# for (question list, quiz JSON, evaluation, review), so responses parse
+# like real ones.
+#
+# Import this before anything that reads settings: the question bank,
+# session and job databases are pointed at a fresh temporary directory
+# and info logging is off.
+#
+#   async with Harness(latency=0.2, token_delay=0.01) as h:
+#       res = await h.client.post("/topic-question", json={"topic": "Docker"})
+
+import json
+import os
+import random
+import sys
+import tempfile
+
+_STATE_DIR = tempfile.mkdtemp(prefix="bench-state-")
+os.environ.setdefault("QUESTION_BANK_DB", os.path.join(_STATE_DIR, "question_bank.sqlite3"))
+os.environ.setdefault("SESSION_DB", os.path.join(_STATE_DIR, "sessions.sqlite3"))
+os.environ.setdefault("JOB_DB", os.path.join(_STATE_DIR, "jobs.sqlite3"))
+os.environ.setdefault("LOG_SAMPLE_RATE", "0")  # keep sampled completion dumps out of the report
+
+import httpx  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_firestore import FakeFirestore  # noqa: E402
+from benchmarks.stub_llm import StubServer, create_stub_app  # noqa: E402
+from clients import registry  # noqa: E402
+from settings import settings  # noqa: E402
+
+_rng = random.Random(3)
+_SUBJECTS = [
+    "container images", "rolling deployments", "garbage collection", "connection pooling", "index selection",
+    "message queues", "TLS handshakes", "cache invalidation", "load balancing", "feature flags",
+]
+REVIEW = (
+    "1. ✅ **Strengths** – Solid hands-on delivery of CI/CD pipelines and container platforms.\n"
+    "2. ⚠️ **Weaknesses** – Impact is rarely quantified; several bullets describe duties, not results.\n"
+    "3. 🔧 **Suggestions** – Lead each bullet with the outcome and a number; trim the summary.\n"
+    "4. Key skills – Kubernetes, Terraform, GitHub Actions, Prometheus, Python.\n"
+    "5. 🎓 **Recommended Certifications** – CKA, AWS Solutions Architect Associate."
+)
+EVALUATION = (
+    "Score: 4\nConstructive feedback: Correct and clear, but mention the trade-offs.\n"
+    "Correct Answer: Describe the mechanism, when to use it and its main failure modes."
+)
+
+
+def _questions(count=5):
+    return "\n".join(
+        f"{i}. How would you explain {_rng.choice(_SUBJECTS)} to a new team member, variant {_rng.randint(1, 10**6)}?"
+        for i in range(1, count + 1)
+    )
+
+
+def _quiz(count=10):
+    return json.dumps([
+        {
+            "question": f"Which statements about {_rng.choice(_SUBJECTS)} are true ({i})?",
+            "options": ["Option A text", "Option B text", "Option C text", "Option D text"],
+            "correct_answer": ["Option A text", "Option C text"],
+        }
+        for i in range(1, count + 1)
+    ], indent=2)
+
+
+def reply(body) -> str:
+    """Stub completion shaped like what the calling endpoint expects."""
+    messages = body.get("messages") or [{}]
+    prompt = messages[-1].get("content") or ""
+    system = messages[0].get("content") or ""
+    if "quiz" in system or "multiple-choice" in prompt:
+        return _quiz()
+    if "resume reviewer" in system:
+        return REVIEW
+    if "Score" in prompt or "Evaluate" in prompt:
+        return EVALUATION
+    if "question" in prompt:
+        return _questions()
+    return "ok"
+
+
+class Harness:
+    """Stub LLM + fake Firestore + the app's lifespan, as an async context manager."""
+
+    def __init__(
+        self,
+        latency: float = 0.2,
+        token_delay: float = 0.0,
+        firestore_latency: float = 0.02,
+        llm_cache: bool = True,
+        question_bank: bool = True,
+        port: int = 9700,
+    ):
+        self.stub_app = create_stub_app(latency, reply=reply, token_delay=token_delay)
+        self._stub = StubServer(self.stub_app, port=port)
+        self.db = FakeFirestore(latency=firestore_latency)
+        self.llm_cache = llm_cache
+        self.question_bank = question_bank
+        self.client: httpx.AsyncClient = None
+
+    async def __aenter__(self):
+        self._stub.__enter__()
+        settings.together_url = self._stub.url
+        settings.llm_cache_enabled = self.llm_cache
+        settings.question_bank_enabled = self.question_bank
+        registry.set_firestore(self.db)
+
+        from main import app
+
+        self.app = app
+        self._lifespan = app.router.lifespan_context(app)
+        await self._lifespan.__aenter__()
+        # In-process ASGI: the write-behind queue and bank refill run on this loop
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+        await self._lifespan.__aexit__(*exc)  # flushes Firestore writes, closes pools
+        self._stub.__exit__(*exc)
+
+    @property
+    def upstream_calls(self) -> int:
+        return self.stub_app.state.calls
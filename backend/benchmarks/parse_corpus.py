@@ -0,0 +1,103 @@
+# benchmarks/parse_corpus.py
+# Messy model completions with known ground truth, for the parsers in
+# llm_parsing.py. Each renderer reproduces a formatting habit seen in
+# real Mixtral replies (bold labels, numbering, preambles, code fences,
+# smart quotes, trailing commas, max_tokens truncation); `corpus()` mixes
+# them with a seeded fuzzer so runs are reproducible.
+
+import json
+import random
+
+EVALUATIONS = [
+    (4, "Clear answer, mention rollback strategies.", "CI/CD automates build, test and deploy; keep the last good artifact to roll back."),
+    (2, "Too vague, no concrete example.", "A deadlock is when threads wait on each other's locks forever."),
+    (5, "Excellent, precise and complete.", "Kubernetes schedules pods onto nodes based on resource requests."),
+    (3, "Correct idea but misses edge cases.", "Use a hash map for O(1) lookups and handle collisions."),
+]
+
+QUESTIONS = [
+    "What is the difference between a process and a thread?",
+    "How does Docker layer caching work?",
+    "Explain blue/green deployments and when to use them.",
+    "What problem does a service mesh solve?",
+    "How would you debug a memory leak in production?",
+]
+
+QUIZ = [
+    {"question": "Which of the following are CI/CD tools?", "options": ["Jenkins", "Docker", "Photoshop", "GitHub Actions"], "correct_answer": ["Jenkins", "GitHub Actions"]},
+    {"question": "Which command lists running containers?", "options": ["docker ps", "docker ls", "docker run", "docker rm"], "correct_answer": ["docker ps"]},
+    {"question": "What does IaC stand for?", "options": ["Infrastructure as Code", "Integration and Compile", "Internet as Cloud", "Image as Container"], "correct_answer": ["Infrastructure as Code"]},
+    {"question": "Which are Kubernetes objects?", "options": ["Pod", "Deployment", "Playbook", "Service"], "correct_answer": ["Pod", "Deployment", "Service"]},
+    {"question": "Which names follow PEP 8 function naming?", "options": ["get_user", "GetUser", "getUser", "load_all_rows"], "correct_answer": ["get_user", "load_all_rows"]},
+]
+
+
+# ---- evaluations ----
+
+def _evaluation_styles(score, feedback, correct):
+    return [
+        f"Score: {score}\nConstructive feedback: {feedback}\nCorrect Answer: {correct}",
+        f"**Score:** {score}/5\n**Constructive feedback:** {feedback}\n**Correct Answer:** {correct}",
+        f"1. Score (out of 5): {score}\n2. Feedback: {feedback}\n3. Correct answer: {correct}",
+        f"Score - {score * 2}/10\n\nFeedback:\n{feedback}\n\nCorrect Answer:\n{correct}",
+        f"Sure! Here is my evaluation.\n\nScore: {score} out of 5\nFeedback: {feedback}\nCorrect answer: {correct}\n\nLet me know if you need more.",
+        f"- **Score**: {score}\n- **Feedback**: {feedback}\n- **Correct Answer**: {correct}",
+        # /topic-evaluate's prompt asks for "1. Score (out of 5) 2. Give feedback 3. The correct answer"
+        f"1. Score (out of 5): {score}\n2. Feedback: {feedback}\n3. The correct answer: {correct}",
+        f"1. Score (out of 5): {score}\n2. Give feedback: {feedback}\n3. The correct answer: {correct}",
+        f"**1. Score (out of 5):** {score}\n**2. Give feedback:** {feedback}\n**3. The correct answer is:** {correct}",
+        f"Score: {score}/5\nProvide feedback: {feedback}\nThe correct answer is: {correct}",
+    ]
+
+
+# ---- question lists ----
+
+def _question_styles(questions):
+    numbered = "\n".join(f"{i}. {q}" for i, q in enumerate(questions, 1))
+    return [
+        numbered,
+        "Here are 5 interview questions:\n\n" + numbered + "\n\nGood luck!",
+        "\n".join(f"{i}) {q}" for i, q in enumerate(questions, 1)),
+        "\n".join(f"**{i}.** {q}" for i, q in enumerate(questions, 1)),
+        "\n".join(f"- {q}" for q in questions),
+        "\n".join(f"Q{i}: {q}" for i, q in enumerate(questions, 1)),
+        "\n".join(questions),
+    ]
+
+
+# ---- quiz ----
+
+def _quiz_styles(items, rng):
+    compact = json.dumps(items)
+    pretty = json.dumps(items, indent=2)
+    lettered = [dict(item, correct_answer=["ABCD"[item["options"].index(c)] for c in item["correct_answer"]]) for item in items]
+    return [
+        (compact, len(items)),
+        ("```json\n" + pretty + "\n```", len(items)),
+        ("Here is the quiz you asked for:\n" + pretty, len(items)),
+        (pretty.replace('"question"', "“question”").replace('"options"', "“options”"), len(items)),
+        (pretty.replace("]\n  }", "],\n  }"), len(items)),  # trailing commas
+        (json.dumps(lettered, indent=2), len(items)),
+        # max_tokens cut-off somewhere inside the last item
+        (pretty[: pretty.rfind('"question"') + rng.randint(5, 60)], len(items) - 1),
+        (pretty.replace("_", "\\_"), len(items)),  # markdown-escaped underscores, keys included
+    ]
+
+
+def corpus(samples: int = 300, seed: int = 7):
+    """Returns {"evaluation": [...], "questions": [...], "quiz": [...]} of
+    (text, expected) pairs."""
+    rng = random.Random(seed)
+    data = {"evaluation": [], "questions": [], "quiz": []}
+    for _ in range(samples):
+        score, feedback, correct = rng.choice(EVALUATIONS)
+        text = rng.choice(_evaluation_styles(score, feedback, correct))
+        data["evaluation"].append((text, (score, feedback, correct)))
+
+        questions = rng.sample(QUESTIONS, 5)
+        data["questions"].append((rng.choice(_question_styles(questions)), questions))
+
+        items = rng.sample(QUIZ, rng.randint(2, 4))
+        text, complete = rng.choice(_quiz_styles(items, rng))
+        data["quiz"].append((text, items[:complete]))
+    return data
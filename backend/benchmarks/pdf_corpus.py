@@ -0,0 +1,33 @@
+# benchmarks/pdf_corpus.py
+# Synthetic multi-page resume PDFs for the extraction benchmarks.
+
+import random
+
+import fitz  # PyMuPDF
+
+SECTIONS = ["Summary", "Experience", "Projects", "Skills", "Education", "Certifications"]
+WORDS = (
+    "kubernetes docker terraform ansible jenkins github actions aws gcp azure linux "
+    "prometheus grafana python bash helm argo cd pipelines microservices networking "
+    "designed implemented migrated automated reduced improved led mentored owned"
+).split()
+
+
+def make_resume_pdf(pages: int, lines_per_page: int = 45, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        y = 50
+        page.insert_text((50, y), SECTIONS[number % len(SECTIONS)], fontsize=14)
+        for _ in range(lines_per_page):
+            y += 15
+            line = "- " + " ".join(rng.choice(WORDS) for _ in range(12))
+            page.insert_text((50, y), line, fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def corpus(sizes=(1, 2, 5, 20, 60, 150)):
+    return {pages: make_resume_pdf(pages, seed=pages) for pages in sizes}
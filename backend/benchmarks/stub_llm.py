@@ -0,0 +1,134 @@
+# benchmarks/stub_llm.py
+# Local stand-in for the Together chat-completions endpoint.
+# Run directly:  python benchmarks/stub_llm.py --port 9100 --latency 0.2
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DEFAULT_REPLY = (
+    "Score: 4\n"
+    "Constructive feedback: Clear answer, mention rollback strategies.\n"
+    "Correct Answer: CI/CD automates integration, testing and delivery of code changes."
+)
+
+
+def create_stub_app(
+    latency: float = 0.2,
+    reply: str = DEFAULT_REPLY,
+    token_delay: float = 0.0,
+    max_concurrency: int = 0,
+    prompt_token_delay: float = 0.0,
+    slow_rate: float = 0.0,
+    slow_latency: float = 0.0,
+    fail_rate: float = 0.0,
+) -> FastAPI:
+    """`latency` is the time to the first token, `token_delay` the gap between
+    streamed tokens (a non-streaming reply waits for all of them). With
+    `max_concurrency` set, requests above it get a 429 like a throttling
+    provider would send. `reply` may also be a function of the request body.
+    `prompt_token_delay` adds prefill time per prompt token (~4 chars).
+    Tail/failure injection: `slow_rate` of requests wait `slow_latency`
+    instead of `latency`, `fail_rate` of them get a 500."""
+    app = FastAPI()
+    app.state.latency = latency
+    app.state.token_delay = token_delay
+    app.state.reply = reply
+    app.state.max_concurrency = max_concurrency
+    app.state.prompt_token_delay = prompt_token_delay
+    app.state.prompt_tokens = 0
+    app.state.slow_rate = slow_rate
+    app.state.slow_latency = slow_latency
+    app.state.fail_rate = fail_rate
+    app.state.failed = 0
+    app.state.calls = 0
+    app.state.active = 0
+    app.state.peak_active = 0
+    app.state.throttled = 0
+
+    def reply_for(body):
+        reply = app.state.reply
+        return reply(body) if callable(reply) else reply
+
+    def tokens(text):
+        words = text.split(" ")
+        return [w + " " for w in words[:-1]] + words[-1:]
+
+    async def stream_reply(model, text):
+        for token in tokens(text):
+            chunk = {"model": model, "choices": [{"index": 0, "delta": {"content": token}}]}
+            yield f"data: {json.dumps(chunk)}\n\n"
+            await asyncio.sleep(app.state.token_delay)
+        yield "data: [DONE]\n\n"
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        text = reply_for(body)
+        app.state.calls += 1
+        if app.state.max_concurrency and app.state.active >= app.state.max_concurrency:
+            app.state.throttled += 1
+            return JSONResponse({"error": "rate limited"}, status_code=429, headers={"Retry-After": "1"})
+        app.state.active += 1
+        app.state.peak_active = max(app.state.peak_active, app.state.active)
+        try:
+            prompt_tokens = sum(len(m.get("content") or "") for m in body.get("messages", [])) // 4
+            app.state.prompt_tokens += prompt_tokens
+            slow = random.random() < app.state.slow_rate
+            await asyncio.sleep(
+                (app.state.slow_latency if slow else app.state.latency) + app.state.prompt_token_delay * prompt_tokens
+            )
+            if random.random() < app.state.fail_rate:
+                app.state.failed += 1
+                return JSONResponse({"error": "upstream error"}, status_code=500)
+            if body.get("stream"):
+                return StreamingResponse(stream_reply(body.get("model"), text), media_type="text/event-stream")
+            await asyncio.sleep(app.state.token_delay * len(tokens(text)))
+        finally:
+            app.state.active -= 1
+        return {
+            "id": f"stub-{app.state.calls}",
+            "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}}],
+        }
+
+    return app
+
+
+class StubServer:
+    """Runs a stub app on a background thread; use as a context manager."""
+
+    def __init__(self, app: FastAPI, port: int = 9100):
+        self.app = app
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}/v1/chat/completions"
+        self._server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+        )
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.0)
+    args = parser.parse_args()
+    uvicorn.run(create_stub_app(args.latency, token_delay=args.token_delay), host="127.0.0.1", port=args.port)
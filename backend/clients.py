@@ -0,0 +1,83 @@
+# clients.py
+# Registry of process-wide clients, built lazily on first use.
+#
+# Nothing here runs at import time: the Firebase app, the Firestore client
+# (and the gRPC stack behind it) and the LLM connection pool are created by
+# the first request that needs them. The FastAPI lifespan attaches the
+# registry to app.state and closes everything on shutdown. Benchmarks swap
+# in fakes with set_firestore().
+
+import threading
+
+from settings import Settings, settings
+
+
+class ClientRegistry:
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self._lock = threading.Lock()
+        self._firebase_app = None
+        self._firestore = None
+        self._http = None
+
+    def firebase_app(self):
+        if self._firebase_app is None:
+            with self._lock:
+                if self._firebase_app is None:
+                    import firebase_admin
+                    from firebase_admin import credentials
+
+                    if not firebase_admin._apps:
+                        cred = credentials.Certificate(self.settings.firebase_credentials)
+                        firebase_admin.initialize_app(cred)
+                    self._firebase_app = firebase_admin.get_app()
+        return self._firebase_app
+
+    def firestore(self):
+        if self._firestore is None:
+            app = self.firebase_app()
+            with self._lock:
+                if self._firestore is None:
+                    from firebase_admin import firestore
+
+                    self._firestore = firestore.client(app)
+        return self._firestore
+
+    def set_firestore(self, client):
+        self._firestore = client
+
+    def http(self):
+        if self._http is None or self._http.is_closed:
+            import httpx
+
+            s = self.settings
+            self._http = httpx.AsyncClient(
+                http2=s.llm_http2,
+                limits=httpx.Limits(max_connections=s.llm_pool_size, max_keepalive_connections=s.llm_keepalive),
+                timeout=httpx.Timeout(s.llm_read_timeout, connect=s.llm_connect_timeout, pool=s.llm_connect_timeout),
+                headers={
+                    "Authorization": f"Bearer {s.together_api_key}",
+                    "Content-Type": "application/json",
+                },
+            )
+        return self._http
+
+    async def aclose(self):
+        from firestore_writer import writer
+        from pdf_extractor import shutdown_pool
+        from user_stats import user_stats
+
+        # ✅ Flush pending Firestore writes, then close pools
+        await user_stats.stop()
+        await writer.stop()
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        shutdown_pool()
+
+
+registry = ClientRegistry(settings)
+
+
+def get_db():
+    return registry.firestore()
@@ -1,57 +1,94 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel
+from typing import List, Optional
 from datetime import datetime
-import firebase_admin
-from firebase_admin import credentials, firestore
-import os
-import requests
-from dotenv import load_dotenv
+from llm_client import chat_completion, stream_chat_completion
+from llm_parsing import parse_evaluation, parse_evaluation_array
+from sse import sse_event, sse_response
+from firestore_writer import writer
+from answer_index import answer_index
+from llm_limiter import UpstreamBusy
+from metrics import log_event, span, timed
+from settings import settings
+from user_stats import user_stats
+import asyncio
+import logging
+import time
 
-load_dotenv()
 router = APIRouter()
 
-# ✅ Firebase Initialization
-if not firebase_admin._apps:
-    cred = credentials.Certificate("credentials/serviceAccountKey.json")
-    firebase_admin.initialize_app(cred)
+FALLBACK_EVALUATION = "Score: 1\nConstructive feedback: Evaluation failed.\nCorrect Answer: Not available."
 
-db = firestore.client()
 
-# ✅ Together AI Config
-TOGETHER_API_KEY = os.getenv("TOGETHER_API_KEY")
-TOGETHER_URL = "https://api.together.xyz/v1/chat/completions"
-MODEL = "mistralai/Mixtral-8x7B-Instruct-v0.1"
+def evaluation_score(text, evaluation=None):
+    """Score to store for an evaluation; None for the failure fallback,
+    so a failed grade is kept unscored instead of counting as a 1."""
+    if text == FALLBACK_EVALUATION:
+        return None
+    return (evaluation or parse_evaluation(text)).score
+
 
 @router.post("/evaluate-answer")
-async def evaluate_answer(request: Request):
+async def evaluate_answer(request: Request, stream: bool = False):
     try:
-        data = await request.json()
+        with span("body_parse"):
+            data = await request.json()
         question = data.get("question")
         answer = data.get("answer")
         user = data.get("user")
+        topic = data.get("topic")
+
+        # 📡 Token-by-token Server-Sent Events instead of one JSON body
+        if stream:
+            return sse_response(_stream_evaluation(user, question, answer, topic))
 
         # 🔍 Evaluate using helper
-        feedback = evaluate_with_gpt(question, answer)
-
-        # ✅ Save to Firebase
-        db.collection("interview_sessions").add({
-            "user": user,
-            "question": question,
-            "answer": answer,
-            "feedback": feedback,
-            "timestamp": datetime.utcnow()
-        })
+        feedback = await evaluate_with_gpt(question, answer)
+
+        save_evaluation(user, question, answer, feedback, topic)
 
         return {"evaluation": feedback}
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print("❌ Evaluation Error:", str(e))
+        log_event("evaluation_failed", logging.ERROR, error=str(e))
         return {"evaluation": "❌ Error evaluating your answer. Please check backend logs."}
 
 
-# ✅ Utility used by resume_session.py
-def evaluate_with_gpt(question, answer):
+def save_evaluation(user, question, answer, feedback, topic=None):
+    # 🔢 Score parsed once here, stored with the result and added to the user's summary
+    score = evaluation_score(feedback)
+    now = datetime.utcnow()
+    # ✅ Save to Firebase (batched write-behind, off the request path)
+    writer.enqueue("interview_sessions", {
+        "user": user,
+        "question": question,
+        "answer": answer,
+        "feedback": feedback,
+        "score": score,
+        "topic": topic,
+        "timestamp": now
+    })
+    user_stats.record(user, score, topic, "interview", question, now)
+
+
+async def _stream_evaluation(user, question, answer, topic=None):
+    parts = []
     try:
-        prompt = f"""
+        async for delta in stream_evaluation_with_gpt(question, answer):
+            parts.append(delta)
+            yield sse_event({"text": delta}, event="token")
+        feedback = "".join(parts).strip()
+        save_evaluation(user, question, answer, feedback, topic)
+        yield sse_event({"evaluation": feedback}, event="done")
+    except Exception as e:
+        log_event("evaluation_failed", logging.ERROR, error=str(e))
+        yield sse_event({"evaluation": "❌ Error evaluating your answer. Please check backend logs."}, event="error")
+
+
+def build_evaluation_prompt(question, answer):
+    return f"""
 You are a strict but fair senior interviewer.
 
 Evaluate the candidate's answer below.
@@ -68,24 +105,166 @@ Correct Answer: <complete answer>
 Only return these 3 lines.
 """
 
-        headers = {
-            "Authorization": f"Bearer {TOGETHER_API_KEY}",
-            "Content-Type": "application/json",
-        }
-
-        payload = {
-            "model": MODEL,
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.3,
-        }
 
-        res = requests.post(TOGETHER_URL, headers=headers, json=payload)
-        res.raise_for_status()
+# ✅ Utility used by resume_session.py
+async def evaluate_with_gpt(question, answer):
+    # ♻️ A near-identical answer to the same question was graded before
+    match = answer_index.lookup(question, answer)
+    if match is not None:
+        return match.evaluation
 
-        content = res.json()["choices"][0]["message"]["content"].strip()
-        print("✅ GPT Evaluation:\n", content)
+    try:
+        prompt = build_evaluation_prompt(question, answer)
+        start = time.perf_counter()
+        content = (await chat_completion(
+            [{"role": "user", "content": prompt}],
+            temperature=0.3,
+        )).strip()
+        log_event("llm_output", kind="evaluation", content=content)
+        answer_index.add(question, answer, content, time.perf_counter() - start)
         return content
 
+    except UpstreamBusy:
+        raise  # don't score the answer with the fallback; let the client retry
     except Exception as e:
-        print("❌ GPT Evaluation Error:", str(e))
-        return "Score: 1\nConstructive feedback: Evaluation failed.\nCorrect Answer: Not available."
+        log_event("evaluation_failed", logging.ERROR, error=str(e))
+        return FALLBACK_EVALUATION
+
+
+async def stream_evaluation_with_gpt(question, answer):
+    match = answer_index.lookup(question, answer)
+    if match is not None:
+        yield match.evaluation  # one "token": the whole earlier evaluation
+        return
+
+    prompt = build_evaluation_prompt(question, answer)
+    start, parts = time.perf_counter(), []
+    async for delta in stream_chat_completion([{"role": "user", "content": prompt}], temperature=0.3):
+        parts.append(delta)
+        yield delta
+    answer_index.add(question, answer, "".join(parts).strip(), time.perf_counter() - start)
+
+
+# 📝 Grade a whole interview in one request
+class EvaluateItem(BaseModel):
+    question: str
+    answer: str
+
+
+class EvaluateBatchRequest(BaseModel):
+    user: Optional[str] = None
+    topic: Optional[str] = None
+    items: List[EvaluateItem]
+    mode: Optional[str] = None  # "single_prompt" | "fanout"; defaults to EVALUATE_BATCH_MODE
+
+
+@router.post("/evaluate-batch")
+async def evaluate_batch(req: EvaluateBatchRequest):
+    mode = req.mode or settings.evaluate_batch_mode
+    if mode not in ("single_prompt", "fanout"):
+        raise HTTPException(status_code=400, detail="mode must be 'single_prompt' or 'fanout'.")
+    if not req.items:
+        raise HTTPException(status_code=400, detail="No items to evaluate.")
+    if len(req.items) > settings.evaluate_batch_max_items:
+        raise HTTPException(status_code=400, detail=f"At most {settings.evaluate_batch_max_items} items per batch.")
+
+    pairs = [(item.question, item.answer) for item in req.items]
+    if mode == "single_prompt":
+        results = await evaluate_batch_single_prompt(pairs)
+    else:
+        results = await evaluate_batch_fanout(pairs)
+
+    # ✅ All results of one interview go to Firestore in the same batch commit
+    now = datetime.utcnow()
+    writer.enqueue_many([
+        ("interview_sessions", {
+            "user": req.user,
+            "question": r["question"],
+            "answer": r["answer"],
+            "feedback": r["evaluation"],
+            "score": r["score"],
+            "topic": req.topic,
+            "timestamp": now,
+        })
+        for r in results
+    ])
+    for r in results:
+        user_stats.record(req.user, r["score"], req.topic, "interview", r["question"], now)
+    return {"mode": mode, "results": results}
+
+
+def _batch_result(question, answer, evaluation, text=None):
+    return {
+        "question": question,
+        "answer": answer,
+        "score": evaluation_score(text, evaluation),
+        "feedback": evaluation.feedback,
+        "correct_answer": evaluation.correct_answer,
+        # Same 3-line text /evaluate-answer returns and /get-sessions shows
+        "evaluation": text or evaluation.to_text(),
+    }
+
+
+async def evaluate_batch_fanout(pairs):
+    # One prompt per item, sent concurrently (bounded by the LLM limiter)
+    evaluations = await asyncio.gather(*(evaluate_with_gpt(q, a) for q, a in pairs))
+    return [
+        _batch_result(question, answer, parse_evaluation(text), text)
+        for (question, answer), text in zip(pairs, evaluations)
+    ]
+
+
+@timed("prompt_build")
+def build_batch_evaluation_prompt(pairs):
+    items = "\n\n".join(
+        f"{i}.\nQuestion: {question}\nAnswer: {answer}" for i, (question, answer) in enumerate(pairs, 1)
+    )
+    return f"""
+You are a strict but fair senior interviewer.
+
+Evaluate each numbered answer below.
+
+{items}
+
+Respond with only a JSON array, one object per item, in the same order:
+[{{"index": 1, "score": <1-5>, "feedback": "<one sentence of feedback>", "correct_answer": "<complete answer>"}}]
+"""
+
+
+async def evaluate_batch_single_prompt(pairs):
+    # One prompt for the whole interview; items the model skipped or garbled are re-graded one by one
+    reused = {}
+    for i, (question, answer) in enumerate(pairs, 1):
+        match = answer_index.lookup(question, answer)
+        if match is not None:
+            reused[i] = _batch_result(question, answer, parse_evaluation(match.evaluation), match.evaluation)
+    pending = [i for i in range(1, len(pairs) + 1) if i not in reused]
+
+    parsed = {}
+    if pending:
+        try:
+            content = await chat_completion(
+                [{"role": "user", "content": build_batch_evaluation_prompt([pairs[i - 1] for i in pending])}],
+                temperature=0.3,
+                max_tokens=300 * len(pending),
+            )
+            # Prompt numbering covers only the pending items
+            parsed = {pending[n - 1]: e for n, e in parse_evaluation_array(content, len(pending)).items()}
+        except UpstreamBusy:
+            raise
+        except Exception as e:
+            log_event("batch_evaluation_failed", logging.ERROR, error=str(e))
+        for i, evaluation in parsed.items():
+            answer_index.add(*pairs[i - 1], evaluation.to_text())
+
+    missing = [i for i in pending if i not in parsed]
+    retried = {}
+    if missing:
+        log_event("batch_evaluation_partial", logging.WARNING, missing=missing)  # graded individually
+        graded = await evaluate_batch_fanout([pairs[i - 1] for i in missing])
+        retried = dict(zip(missing, graded))
+
+    return [
+        reused.get(i) or (_batch_result(question, answer, parsed[i]) if i in parsed else retried[i])
+        for i, (question, answer) in enumerate(pairs, 1)
+    ]
@@ -0,0 +1,152 @@
+# firestore_writer.py
+# Write-behind queue for interview results.
+#
+# Request handlers enqueue records and return immediately; a background
+# task groups them into Firestore batch commits of up to
+# FIRESTORE_BATCH_SIZE documents or FIRESTORE_FLUSH_MS of waiting,
+# whichever comes first. Records enqueued together with enqueue_many() are
+# never split across commits. Failed commits are retried with exponential
+# backoff, and the queue is drained on shutdown.
+
+import asyncio
+import logging
+import random
+import time
+from typing import Callable, List, Optional, Tuple
+
+from clients import get_db
+from metrics import log_event, span
+from settings import settings
+
+Record = Tuple[str, dict]  # (collection, document data)
+
+
+class FirestoreWriter:
+    def __init__(
+        self,
+        client_factory: Callable = get_db,
+        batch_size: int = settings.firestore_batch_size,
+        flush_ms: int = settings.firestore_flush_ms,
+        max_retries: int = settings.firestore_max_retries,
+        queue_max: int = settings.firestore_queue_max,
+    ):
+        self.client_factory = client_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000
+        self.max_retries = max_retries
+        self.queue_max = queue_max
+        self._client = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._carry: Optional[List[Record]] = None  # group that didn't fit the last batch
+        self.committed = 0
+        self.commits = 0
+        self.retries = 0
+        self.dropped = 0
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self.client_factory()
+        return self._client
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._queue = self._queue or asyncio.Queue(maxsize=self.queue_max)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def enqueue(self, collection: str, data: dict):
+        self.enqueue_many([(collection, data)])
+
+    def enqueue_many(self, records: List[Record]):
+        """Queues records that must land in the same batch commit."""
+        records = list(records)
+        if not records:
+            return
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(records)
+        except asyncio.QueueFull:
+            # Backpressure: write these directly, off the event loop
+            log_event("firestore_queue_full", logging.WARNING, records=len(records))  # writing inline
+            asyncio.get_running_loop().run_in_executor(None, self._commit_with_retry, records)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth(),
+            "committed": self.committed,
+            "commits": self.commits,
+            "retries": self.retries,
+            "dropped": self.dropped,
+        }
+
+    async def _next_batch(self) -> List[List[Record]]:
+        groups = [self._carry or await self._queue.get()]
+        self._carry = None
+        size = len(groups[0])
+        deadline = asyncio.get_running_loop().time() + self.flush_interval
+        while size < self.batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                group = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if size + len(group) > self.batch_size:
+                self._carry = group  # starts the next batch
+                break
+            groups.append(group)
+            size += len(group)
+        return groups
+
+    async def _run(self):
+        while True:
+            groups = await self._next_batch()
+            await asyncio.to_thread(self._commit_with_retry, [record for group in groups for record in group])
+            for _ in groups:
+                self._queue.task_done()
+
+    def _commit(self, records: List[Record]):
+        with span("firestore_write"):
+            db = self.client
+            batch = db.batch()
+            for collection, data in records:
+                batch.set(db.collection(collection).document(), data)
+            batch.commit()
+
+    def _commit_with_retry(self, records: List[Record]):
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._commit(records)
+                self.commits += 1
+                self.committed += len(records)
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.dropped += len(records)
+                    log_event("firestore_batch_dropped", logging.ERROR, records=len(records), attempts=attempt + 1, error=str(e))
+                    return
+                self.retries += 1
+                time.sleep(min(5.0, 0.1 * 2 ** attempt) * (0.5 + random.random()))
+
+    async def flush(self):
+        if self._queue is not None and self._task is not None and not self._task.done():
+            await self._queue.join()
+
+    async def stop(self):
+        """Drains the queue, then stops the background task (app shutdown)."""
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+writer = FirestoreWriter()
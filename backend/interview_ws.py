@@ -0,0 +1,220 @@
+# interview_ws.py
+# A whole resume interview over one WebSocket: /ws/resume-interview?user=...
+#
+# Client -> server
+#   binary frame                                     the resume PDF; starts a new session
+#   {"type": "answer", "answer": "...", "index": 2}  index optional (rejects stale answers)
+#   {"type": "ping"}
+# Server -> client
+#   {"type": "question", "index", "total", "question"}
+#   {"type": "evaluation", "index", "question", "score", "feedback", "correct_answer"}
+#   {"type": "complete", "answered"}                 after the last evaluation; then closes
+#   {"type": "error", "error"}                       (plus "index" for a failed evaluation)
+#
+# An accepted answer advances the session straight away and the next
+# question is pushed at once; grading runs concurrently and each
+# evaluation is pushed, and stored like /submit-resume-answer does, when
+# it is ready. The session is read once per connection, not per message.
+# Evaluations of answers already accepted are still stored if the
+# client disconnects.
+#
+# uvicorn buffers a whole frame before the app sees it, so the frame size
+# is capped by the server: run it with --ws-max-size WS_MAX_SIZE (python
+# main.py does). Larger frames are refused with close code 1009 while
+# their header is read; uvicorn's own default is 16 MB.
+
+import asyncio
+import json
+import logging
+import time
+from collections import Counter
+
+from fastapi import APIRouter, WebSocket
+
+from evaluator import evaluate_with_gpt, evaluation_score
+from llm_limiter import UpstreamBusy
+from llm_parsing import parse_evaluation
+from metrics import log_event, observe_stage
+from resume_gpt_generator import generate_resume_questions
+from resume_session import answer_feedback, save_answer, sessions, start_session
+from settings import settings
+from uploads import MAX_RESUME_BYTES
+
+router = APIRouter()
+
+WS_MAX_SIZE = MAX_RESUME_BYTES  # the largest frame is the resume PDF
+
+stats = Counter()
+
+
+class InterviewChannel:
+    def __init__(self, websocket: WebSocket, user: str):
+        self.ws = websocket
+        self.user = user
+        self.questions = []
+        self.index = 0
+        self.open = True
+        self.finished = False
+        self._send_lock = asyncio.Lock()
+        self._grading = set()
+
+    def _load(self, session):
+        self.questions = session["questions"]
+        self.index = session["index"]
+
+    async def send(self, message: dict):
+        if not self.open:
+            return
+        # Grading tasks and the receive loop share the socket
+        async with self._send_lock:
+            try:
+                await self.ws.send_json(message)
+            except Exception:
+                self.open = False  # client gone; grading still finishes and is stored
+
+    async def error(self, text: str, **fields):
+        await self.send({"type": "error", "error": text, **fields})
+
+    async def push_current(self):
+        if self.index < len(self.questions):
+            await self.send({
+                "type": "question",
+                "index": self.index,
+                "total": len(self.questions),
+                "question": self.questions[self.index],
+            })
+        else:
+            await self.finish()
+
+    async def finish(self):
+        if self._grading:
+            await asyncio.gather(*self._grading, return_exceptions=True)
+        await self.send({"type": "complete", "answered": self.index})
+        self.finished = True
+
+    async def run(self):
+        session = sessions.get(self.user)
+        if session:
+            self._load(session)
+            await self.push_current()
+        while not self.finished:
+            try:
+                async with asyncio.timeout(settings.ws_idle_timeout):
+                    message = await self.ws.receive()
+            except TimeoutError:
+                await self.ws.close(code=1000, reason="idle")
+                return
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes") is not None:
+                await self.start(message["bytes"])
+            else:
+                await self.handle(message.get("text") or "")
+        await self.ws.close(code=1000)
+
+    async def handle(self, text: str):
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return await self.error("Invalid JSON.")
+        kind = data.get("type") if isinstance(data, dict) else None
+        if kind == "answer":
+            await self.answer(data)
+        elif kind == "ping":
+            await self.send({"type": "pong"})
+        else:
+            await self.error(f"Unknown message type: {kind!r}.")
+
+    async def start(self, pdf: bytes):
+        if self._grading:
+            return await self.error("Wait for the pending evaluations before starting a new session.")
+        if len(pdf) > MAX_RESUME_BYTES:
+            return await self.error(f"Resume too large (max {MAX_RESUME_BYTES // (1024 * 1024)} MB).")
+        try:
+            questions = (await generate_resume_questions(pdf))[:5]
+            start_session(self.user, questions)
+        except Exception as e:
+            return await self.error(f"Failed to generate questions: {getattr(e, 'detail', None) or e}")
+        self._load(sessions.get(self.user))
+        await self.push_current()
+
+    async def answer(self, data: dict):
+        answer = str(data.get("answer") or "").strip()
+        if not self.questions:
+            return await self.error("No active session. Send the resume PDF first.")
+        if not answer:
+            return await self.error("Missing answer.")
+        if self.index >= len(self.questions):
+            return await self.error("Interview already completed.")
+        if data.get("index") is not None and data["index"] != self.index:
+            return await self.error("Stale answer: that question is not the current one.", current=self.index)
+
+        index, question = self.index, self.questions[self.index]
+        # ✅ Advance now (compare-and-set); the evaluation is filled in when grading finishes
+        session = sessions.advance(self.user, index, {
+            "question": question,
+            "answer": answer,
+            "feedback": None,
+            "correct_answer": None
+        })
+        if session is None:
+            session = sessions.get(self.user)
+            if session is None:
+                self.questions = []
+                return await self.error("The session expired.")
+            self._load(session)
+            await self.error("This question was already answered.")
+            return await self.push_current()
+
+        stats["answers"] += 1
+        self._load(session)
+        task = asyncio.create_task(self.grade(index, question, answer))
+        self._grading.add(task)
+        task.add_done_callback(self._grading.discard)
+        # ⏭️ Next question without waiting for the grade
+        await self.push_current()
+
+    async def grade(self, index: int, question: str, answer: str):
+        started = time.perf_counter()
+        try:
+            for attempt in range(settings.ws_eval_retries + 1):
+                try:
+                    result = await evaluate_with_gpt(question, answer)
+                    break
+                except UpstreamBusy as e:
+                    # Nobody is waiting on this grade: back off instead of failing it
+                    if attempt == settings.ws_eval_retries:
+                        raise
+                    await asyncio.sleep(e.retry_after)
+            evaluation = parse_evaluation(result)
+            feedback, correct_answer = answer_feedback(evaluation)
+            score = evaluation_score(result, evaluation)
+            sessions.update_answer(self.user, index, {"feedback": feedback, "correct_answer": correct_answer})
+            save_answer(self.user, question, answer, evaluation, score)
+        except Exception as e:
+            stats["evaluations_failed"] += 1
+            log_event("ws_evaluation_failed", logging.ERROR, index=index, error=str(e))
+            return await self.error(f"Evaluation failed: {getattr(e, 'detail', None) or e}", index=index)
+
+        stats["evaluations"] += 1
+        observe_stage("ws_evaluation", time.perf_counter() - started)
+        await self.send({
+            "type": "evaluation",
+            "index": index,
+            "question": question,
+            "score": score,
+            "feedback": feedback,
+            "correct_answer": correct_answer,
+        })
+
+
+# 🔌 One connection per interview: questions pushed as soon as an answer is accepted
+@router.websocket("/ws/resume-interview")
+async def resume_interview(websocket: WebSocket, user: str):
+    await websocket.accept()
+    stats["connections"] += 1
+    stats["open"] += 1
+    try:
+        await InterviewChannel(websocket, user).run()
+    finally:
+        stats["open"] -= 1
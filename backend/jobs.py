@@ -0,0 +1,311 @@
+# jobs.py
+# Background jobs for slow requests (resume review, resume questions).
+#
+# POST ...?job=true stores the job, upload included, in SQLite and
+# answers 202 with its id straight away. JOB_WORKERS workers per process
+# claim queued jobs (one atomic UPDATE, so several processes can share
+# the file) and run the registered handler under JOB_TIMEOUT.
+# GET /jobs/{id} returns the status and result; ?wait=N long-polls until
+# the job finishes, for at most JOB_MAX_WAIT seconds.
+#
+# A claimed job holds a lease of JOB_TIMEOUT plus a margin. If its
+# worker dies, the job is queued again when the lease runs out (up to
+# JOB_MAX_ATTEMPTS tries), so jobs survive a restart. Upstream-busy and
+# connection errors are retried with backoff; other errors fail the job.
+# Finished jobs are kept for JOB_RETENTION seconds, then deleted.
+
+import asyncio
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+
+from llm_limiter import UpstreamBusy
+from metrics import log_event, observe_stage
+from settings import settings
+
+FINISHED = ("done", "failed")
+LEASE_MARGIN = 30  # seconds past JOB_TIMEOUT before a running job counts as abandoned
+MAINTENANCE_INTERVAL = 30
+
+Handler = Callable[[dict, Optional[bytes]], Awaitable[dict]]
+
+router = APIRouter()
+
+
+def _retryable(error: BaseException) -> bool:
+    return isinstance(error, (UpstreamBusy, httpx.TransportError))
+
+
+def _error_message(error: BaseException) -> str:
+    if isinstance(error, HTTPException):
+        return str(error.detail)
+    if isinstance(error, TimeoutError):
+        return f"Job exceeded its {settings.job_timeout:g} s time limit."
+    return str(error) or type(error).__name__
+
+
+class JobQueue:
+    def __init__(self, path: Optional[str] = None, workers: Optional[int] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.workers = workers or settings.job_workers
+        self._handlers: Dict[str, Handler] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._done: Dict[str, asyncio.Event] = {}  # long-pollers of jobs running here
+        self._running = set()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.recovered = 0
+
+    @staticmethod
+    def _open(path: str) -> sqlite3.Connection:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL,"
+            " params TEXT NOT NULL, input BLOB, result TEXT, error TEXT,"
+            " attempts INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL, available_at REAL NOT NULL,"
+            " started_at REAL, finished_at REAL, lease_until REAL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_queue ON jobs(status, available_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_finished ON jobs(status, finished_at)")
+        return conn
+
+    def _execute(self, sql: str, args: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            # Opened on first use (the lifespan's start()), not at import
+            if self._db is None:
+                self._db = self._open(self.path or settings.job_db)
+            return self._db.execute(sql, args)
+
+    def handler(self, kind: str):
+        """Registers `async fn(params, data) -> dict` for jobs of `kind`."""
+
+        def register(fn: Handler) -> Handler:
+            self._handlers[kind] = fn
+            return fn
+
+        return register
+
+    def submit(self, kind: str, params: dict, data: Optional[bytes] = None) -> str:
+        if kind not in self._handlers:
+            raise ValueError(f"No handler for job kind {kind!r}")
+        queued = self._execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+        if queued >= settings.job_max_queued:
+            raise HTTPException(status_code=503, detail="Too many queued jobs. Please retry shortly.",
+                                headers={"Retry-After": "5"})
+        job_id, now = secrets.token_urlsafe(12), time.time()
+        self._execute(
+            "INSERT INTO jobs (id, kind, status, params, input, created_at, available_at)"
+            " VALUES (?, ?, 'queued', ?, ?, ?, ?)",
+            (job_id, kind, json.dumps(params), data, now, now),
+        )
+        self.submitted += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        row = self._execute(
+            "SELECT id, kind, status, attempts, result, error, created_at, started_at, finished_at"
+            " FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        job = {
+            "id": row[0],
+            "kind": row[1],
+            "status": row[2],
+            "attempts": row[3],
+            "result": json.loads(row[4]) if row[4] is not None else None,
+            "error": row[5],
+            "created_at": row[6],
+            "started_at": row[7],
+            "finished_at": row[8],
+        }
+        if job["status"] == "queued":
+            job["position"] = self._execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND available_at < ?", (job["created_at"],)
+            ).fetchone()[0]
+        return job
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[dict]:
+        """The job once it has finished, or as it is when `timeout` runs out."""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job["status"] in FINISHED or remaining <= 0:
+                if job is None or job["status"] in FINISHED:
+                    self._done.pop(job_id, None)
+                return job
+            # Woken by a local worker; the poll interval covers jobs run by other processes
+            event = self._done.setdefault(job_id, asyncio.Event())
+            try:
+                await asyncio.wait_for(event.wait(), min(remaining, settings.job_poll_interval))
+            except asyncio.TimeoutError:
+                pass
+
+    def _claim(self) -> Optional[tuple]:
+        now = time.time()
+        return self._execute(
+            "UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ?, lease_until = ?"
+            " WHERE id = (SELECT id FROM jobs WHERE status = 'queued' AND available_at <= ?"
+            "             ORDER BY available_at LIMIT 1)"
+            " RETURNING id, kind, params, input, attempts, created_at",
+            (now, now + settings.job_timeout + LEASE_MARGIN, now),
+        ).fetchone()
+
+    def _finish(self, job_id: str, status: str, result: Optional[dict] = None, error: Optional[str] = None):
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, input = NULL, finished_at = ?, lease_until = NULL"
+            " WHERE id = ? AND status = 'running'",
+            (status, json.dumps(result) if result is not None else None, error, time.time(), job_id),
+        )
+        event = self._done.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    def _requeue(self, job_id: str, delay: float, refund: bool = False):
+        self._execute(
+            "UPDATE jobs SET status = 'queued', available_at = ?, lease_until = NULL, attempts = attempts - ?"
+            " WHERE id = ? AND status = 'running'",
+            (time.time() + delay, 1 if refund else 0, job_id),
+        )
+
+    async def _run(self, job_id, kind, params, data, attempts, created_at):
+        if attempts == 1:
+            observe_stage("job_queue", time.time() - created_at)
+        self._running.add(job_id)
+        try:
+            handler = self._handlers.get(kind)
+            if handler is None:
+                raise ValueError(f"No handler for job kind {kind!r}")
+            async with asyncio.timeout(settings.job_timeout):
+                result = await handler(json.loads(params), data)
+        except asyncio.CancelledError:
+            raise  # shutting down: stop() puts the job back
+        except Exception as e:
+            if _retryable(e) and attempts < settings.job_max_attempts:
+                delay = e.retry_after if isinstance(e, UpstreamBusy) else min(60, 2 ** attempts)
+                self._requeue(job_id, delay)
+                self.retried += 1
+                log_event("job_retry", logging.WARNING, job=job_id, kind=kind, attempts=attempts, error=str(e))
+            else:
+                self._finish(job_id, "failed", error=_error_message(e))
+                self.failed += 1
+                log_event("job_failed", logging.ERROR, job=job_id, kind=kind, attempts=attempts, error=str(e))
+        else:
+            self._finish(job_id, "done", result=result)
+            self.completed += 1
+        finally:
+            self._running.discard(job_id)
+
+    async def _work(self):
+        while True:
+            self._wakeup.clear()
+            job = self._claim()
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), settings.job_poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(*job)
+
+    def maintain(self):
+        """Requeues jobs whose worker died, fails those out of attempts and
+        deletes finished jobs past JOB_RETENTION."""
+        now = time.time()
+        recovered = self._execute(
+            "UPDATE jobs SET status = 'queued', available_at = ?, lease_until = NULL"
+            " WHERE status = 'running' AND lease_until < ? AND attempts < ?",
+            (now, now, settings.job_max_attempts),
+        ).rowcount
+        self._execute(
+            "UPDATE jobs SET status = 'failed', error = 'Job was interrupted too many times.', input = NULL,"
+            " finished_at = ?, lease_until = NULL WHERE status = 'running' AND lease_until < ?",
+            (now, now),
+        )
+        self._execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?", (now - settings.job_retention,)
+        )
+        if recovered:
+            self.recovered += recovered
+            log_event("jobs_recovered", logging.WARNING, jobs=recovered)
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+    async def _maintenance(self):
+        while True:
+            await asyncio.sleep(MAINTENANCE_INTERVAL)
+            try:
+                self.maintain()
+            except Exception as e:
+                log_event("jobs_maintenance_failed", logging.WARNING, error=str(e))
+
+    def start(self):
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self.maintain()
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(loop.create_task(self._maintenance()))
+
+    async def stop(self):
+        interrupted = list(self._running)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Clean shutdown: hand unfinished jobs to the next worker without using up an attempt
+        for job_id in interrupted:
+            self._requeue(job_id, 0, refund=True)
+
+    def stats(self) -> dict:
+        counts = dict(self._execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {
+            "workers": self.workers,
+            "running_here": len(self._running),
+            "jobs": {status: counts.get(status, 0) for status in ("queued", "running", "done", "failed")},
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "recovered": self.recovered,
+        }
+
+
+queue = JobQueue()
+
+
+def accepted(job_id: str) -> JSONResponse:
+    return JSONResponse({"job_id": job_id, "status": "queued", "poll": f"/jobs/{job_id}"}, status_code=202)
+
+
+# 🧾 Poll (or long-poll with ?wait=30) a background job
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = 0):
+    job = await queue.wait(job_id, min(max(wait, 0.0), settings.job_max_wait))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found (unknown id, or expired).")
+    return job
@@ -0,0 +1,172 @@
+# llm_cache.py
+# Content-addressed cache for LLM completions.
+#
+# Key = sha256(model, messages, temperature, max_tokens). Each key holds a
+# pool of up to LLM_CACHE_VARIANTS completions: until the pool is full every
+# request goes upstream and adds a new variant, afterwards a random variant
+# is served so repeat users still see different questions.
+#
+# Tier 1 is an in-process TTL/LRU cache, tier 2 an optional SQLite file
+# (set LLM_CACHE_DB) shared between workers and restarts. Concurrent misses
+# for the same key share one upstream call (single-flight).
+
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Callable, List, Optional
+
+from cachetools import TTLCache
+
+from llm_client import chat_completion
+from settings import settings
+from singleflight import SingleFlight, StreamFlight
+
+
+def cache_key(
+    model: str, messages: List[dict], temperature: float, max_tokens: Optional[int], extra: Optional[dict] = None
+) -> str:
+    payload = {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens}
+    if extra:
+        # top_p, stop, seed, response_format, ... change the completion too (sort_keys makes the order irrelevant)
+        payload["extra"] = extra
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SQLiteTier:
+    def __init__(self, path: str, ttl: int, max_rows: int):
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT NOT NULL, content TEXT NOT NULL, created_at REAL NOT NULL,"
+            " PRIMARY KEY (key, content))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_created ON llm_cache(created_at)")
+
+    def get(self, key: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT content FROM llm_cache WHERE key = ? AND created_at > ?",
+                (key, time.time() - self.ttl),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def add(self, key: str, content: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, content, created_at) VALUES (?, ?, ?)",
+                (key, content, time.time()),
+            )
+
+    def evict(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at <= ?", (time.time() - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE rowid IN ("
+                " SELECT rowid FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_rows,),
+            )
+
+
+class LLMCache:
+    def __init__(
+        self,
+        max_keys: int = settings.llm_cache_max_keys,
+        ttl: int = settings.llm_cache_ttl,
+        variants: int = settings.llm_cache_variants,
+        db_path: Optional[str] = settings.llm_cache_db,
+    ):
+        self.variants = max(1, variants)
+        self.memory = TTLCache(maxsize=max_keys, ttl=ttl)
+        self.disk = SQLiteTier(db_path, ttl, settings.llm_cache_db_max_rows) if db_path else None
+        self._writes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _pool(self, key: str) -> List[str]:
+        pool = self.memory.get(key)
+        if pool is None and self.disk is not None:
+            pool = self.disk.get(key)
+            if pool:
+                self.memory[key] = pool
+                self.disk_hits += 1
+        return pool or []
+
+    def get(self, key: str) -> Optional[str]:
+        pool = self._pool(key)
+        if len(pool) >= self.variants:
+            self.hits += 1
+            return random.choice(pool)
+        self.misses += 1
+        return None
+
+    def add(self, key: str, content: str):
+        pool = [c for c in self._pool(key) if c != content]
+        pool.append(content)
+        self.memory[key] = pool[-self.variants:]
+        if self.disk is not None:
+            self.disk.add(key, content)
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self.disk.evict()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "keys": len(self.memory),
+            "coalesced": flight.shared,
+            "coalesced_streams": stream_flight.shared,
+        }
+
+
+cache = LLMCache()
+flight = SingleFlight()
+stream_flight = StreamFlight()  # same for streamed completions
+
+
+async def cached_chat_completion(
+    messages: List[dict],
+    model: Optional[str] = None,
+    temperature: float = 0.7,
+    max_tokens: Optional[int] = None,
+    parse: Optional[Callable[[str], object]] = None,
+    cacheable: Optional[Callable[[object], bool]] = None,
+    **extra,
+):
+    """chat_completion() through the cache. If `parse` is given the parsed
+    value is returned and only completions that parse are cached; with
+    `cacheable`, only those for which cacheable(result) is true (a
+    salvaged, partial result is returned but not kept)."""
+    model = model or settings.llm_model
+    key = cache_key(model, messages, temperature, max_tokens, extra)
+
+    if settings.llm_cache_enabled:
+        content = cache.get(key)
+        if content is not None:
+            return parse(content) if parse else content
+
+    # 🛬 Identical requests already in flight wait for that call instead
+    content = await flight.do(
+        key,
+        lambda: chat_completion(messages, model=model, temperature=temperature, max_tokens=max_tokens, **extra),
+    )
+    result = parse(content) if parse else content
+
+    if settings.llm_cache_enabled and (cacheable is None or cacheable(result)):
+        cache.add(key, content)
+    return result
@@ -0,0 +1,67 @@
+# llm_client.py
+# Shared async client for the Together chat-completions API.
+# One keep-alive connection pool for the whole process instead of a fresh
+# TLS handshake per `requests.post`, and no blocking of the event loop.
+# Requests go through llm_router (deadlines, hedging, failover).
+
+import json
+import time
+from typing import AsyncIterator, List, Optional
+
+from llm_limiter import limiter
+from llm_router import router
+from metrics import observe_stage, span
+from settings import settings
+
+
+async def chat_completion(
+    messages: List[dict],
+    model: Optional[str] = None,
+    temperature: float = 0.7,
+    max_tokens: Optional[int] = None,
+    **extra,
+) -> str:
+    payload = {"model": model or settings.llm_model, "messages": messages, "temperature": temperature, **extra}
+    if max_tokens is not None:
+        payload["max_tokens"] = max_tokens
+
+    # 🚦 Waits for a slot / rate budget, or raises UpstreamBusy (503)
+    async with limiter.admit(messages, max_tokens) as ticket:
+        with span("upstream"):
+            body = await router.complete(payload)
+        ticket.used_tokens = (body.get("usage") or {}).get("total_tokens")
+    return body["choices"][0]["message"]["content"]
+
+
+async def stream_chat_completion(
+    messages: List[dict],
+    model: Optional[str] = None,
+    temperature: float = 0.7,
+    max_tokens: Optional[int] = None,
+    **extra,
+) -> AsyncIterator[str]:
+    """Yields content deltas as the upstream streams them (OpenAI-style SSE)."""
+    payload = {"model": model or settings.llm_model, "messages": messages, "temperature": temperature, "stream": True, **extra}
+    if max_tokens is not None:
+        payload["max_tokens"] = max_tokens
+
+    # The slot is held until the stream ends
+    async with limiter.admit(messages, max_tokens):
+        start, first = time.perf_counter(), True
+        res = await router.open_stream(payload)
+        try:
+            async for line in res.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or [{}]
+                delta = choices[0].get("delta", {}).get("content")
+                if delta:
+                    if first:
+                        observe_stage("upstream_ttft", time.perf_counter() - start)
+                        first = False
+                    yield delta
+        finally:
+            await res.aclose()
@@ -0,0 +1,291 @@
+# llm_limiter.py
+# Admission control for upstream LLM calls.
+#
+# Every completion goes through `limiter.admit()`:
+#   - token buckets for requests/min and tokens/min (LLM_RPM / LLM_TPM),
+#   - an AIMD concurrency limit: +1/limit per success, halved on 429, 5xx
+#     or timeout (at most once per upstream round-trip),
+#   - a bounded FIFO wait queue. A request that can't get a slot before
+#     LLM_QUEUE_TIMEOUT, or that is predicted to wait longer than that, is
+#     rejected straight away with UpstreamBusy (503 + Retry-After) instead
+#     of piling up behind a provider that is already throttling us.
+# Optional extra calls (hedged duplicates) use admit(..., wait=False): they
+# get a slot and rate budget only if both are free right now.
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+import httpx
+from fastapi import HTTPException
+
+from metrics import observe_stage
+from settings import settings
+
+OVERLOAD_STATUSES = {429, 500, 502, 503, 504}
+
+
+class UpstreamBusy(HTTPException):
+    """Raised instead of queueing when the provider can't take more work."""
+
+    def __init__(self, reason: str, retry_after: float):
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(
+            status_code=503,
+            detail=f"The AI service is busy ({reason}). Please retry shortly.",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+
+class TokenBucket:
+    """`per_minute` units refilled continuously; 0 disables the bucket.
+    Callers reserve first and then sleep off any deficit, so concurrent
+    reservations queue up behind each other instead of overdrawing."""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Takes `amount` and returns how long to wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+        return max(0.0, -self.tokens / self.rate)
+
+    def refund(self, amount: float):
+        if self.rate > 0:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + min(amount, self.capacity))
+
+
+class Timing:
+    def __init__(self, window: int = 1024):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent = deque(maxlen=window)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self._recent.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        if not self._recent:
+            return 0.0
+        ordered = sorted(self._recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def stats(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 1) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50) * 1000, 1),
+            "p95_ms": round(self.percentile(0.95) * 1000, 1),
+            "max_ms": round(self.max * 1000, 1),
+        }
+
+
+class Ticket:
+    """Handed to the caller inside admit(); report real usage if known."""
+
+    def __init__(self, tokens: int):
+        self.tokens = tokens
+        self.used_tokens: Optional[int] = None
+
+
+def estimate_tokens(messages: List[dict], max_tokens: Optional[int]) -> int:
+    # ~4 characters per token for English prompts, plus the completion budget
+    prompt = sum(len(m.get("content") or "") for m in messages) // 4
+    return prompt + (max_tokens or settings.llm_default_completion_tokens)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        rpm: int = settings.llm_rpm,
+        tpm: int = settings.llm_tpm,
+        concurrency: int = settings.llm_concurrency,
+        min_concurrency: int = settings.llm_min_concurrency,
+        max_concurrency: int = settings.llm_max_concurrency,
+        queue_max: int = settings.llm_queue_max,
+        queue_timeout: float = settings.llm_queue_timeout,
+    ):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.limit = float(concurrency)
+        self.min_limit = float(min_concurrency)
+        self.max_limit = float(max_concurrency)
+        self.queue_max = queue_max
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.blocked_until = 0.0  # set from an upstream Retry-After
+        self._waiters = deque()
+        self._last_decrease = 0.0
+        self.queue_time = Timing()
+        self.upstream_time = Timing()
+        self.counters = {"admitted": 0, "rejected": 0, "skipped": 0, "overloaded": 0, "decreases": 0}
+
+    # ---- concurrency slots ----
+
+    def _has_slot(self) -> bool:
+        return self.active < max(1, int(self.limit))
+
+    def _wake(self):
+        while self._waiters and self._has_slot():
+            fut = self._waiters.popleft()
+            if not fut.done():
+                self.active += 1
+                fut.set_result(None)
+
+    def _release_slot(self):
+        self.active -= 1
+        self._wake()
+
+    def _reject(self, reason: str, retry_after: float):
+        self.counters["rejected"] += 1
+        raise UpstreamBusy(reason, retry_after)
+
+    def estimated_wait(self, position: int) -> float:
+        # Each freed slot lets one waiter in; slots free up every ~p50 upstream time
+        typical = self.upstream_time.percentile(0.50)
+        return position * typical / max(1, int(self.limit))
+
+    async def _acquire_slot(self, deadline: float, wait: bool = True):
+        if self._has_slot() and not self._waiters:
+            self.active += 1
+            return
+        if not wait:
+            self.counters["skipped"] += 1
+            raise UpstreamBusy("no free slot", 0)
+        if len(self._waiters) >= self.queue_max:
+            self._reject("queue full", self.estimated_wait(len(self._waiters)))
+        expected = self.estimated_wait(len(self._waiters) + 1)
+        if time.monotonic() + expected > deadline:
+            self._reject("queue too long", expected)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await asyncio.wait_for(fut, max(0.0, deadline - time.monotonic()))
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if fut.done() and not fut.cancelled():
+                self._release_slot()  # granted just as we gave up
+            elif fut in self._waiters:
+                self._waiters.remove(fut)
+            if isinstance(e, asyncio.TimeoutError):
+                self._reject("queue timeout", self.estimated_wait(len(self._waiters) + 1))
+            raise
+
+    # ---- AIMD ----
+
+    def _on_success(self):
+        self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def _on_overload(self, retry_after: Optional[float]):
+        now = time.monotonic()
+        self.counters["overloaded"] += 1
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+        # One decrease per round-trip: a burst of 429s from the same window counts once
+        if now - self._last_decrease >= max(0.1, self.upstream_time.percentile(0.50)):
+            self.limit = max(self.min_limit, self.limit / 2)
+            self._last_decrease = now
+            self.counters["decreases"] += 1
+
+    # ---- public ----
+
+    @asynccontextmanager
+    async def admit(self, messages: List[dict], max_tokens: Optional[int] = None, wait: bool = True):
+        """wait=False: never queue or sleep; UpstreamBusy unless a slot and
+        the rate budget are available immediately."""
+        queued_at = time.monotonic()
+        deadline = queued_at + self.queue_timeout
+        await self._acquire_slot(deadline, wait)
+
+        ticket = Ticket(estimate_tokens(messages, max_tokens))
+        try:
+            delay = max(
+                self.requests.reserve(1),
+                self.tokens.reserve(ticket.tokens),
+                self.blocked_until - time.monotonic(),
+            )
+            if delay > 0 and not wait:
+                self.requests.refund(1)
+                self.tokens.refund(ticket.tokens)
+                self.counters["skipped"] += 1
+                raise UpstreamBusy("rate limited", delay)
+            if time.monotonic() + delay > deadline:
+                self.requests.refund(1)
+                self.tokens.refund(ticket.tokens)
+                self._reject("rate limited", delay)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        except BaseException:
+            self._release_slot()
+            raise
+
+        started = time.monotonic()
+        self.queue_time.add(started - queued_at)
+        observe_stage("upstream_queue", started - queued_at)
+        self.counters["admitted"] += 1
+        succeeded, overloaded, retry_after = False, False, None
+        try:
+            yield ticket
+            succeeded = True
+        except httpx.HTTPStatusError as e:
+            overloaded = e.response.status_code in OVERLOAD_STATUSES
+            retry_after = _retry_after(e.response)
+            raise
+        except httpx.TimeoutException:
+            overloaded = True
+            raise
+        finally:
+            self.upstream_time.add(time.monotonic() - started)
+            if ticket.used_tokens is not None:
+                # Settle the estimate against what the provider reports
+                delta = ticket.tokens - ticket.used_tokens
+                if delta > 0:
+                    self.tokens.refund(delta)
+                else:
+                    self.tokens.reserve(-delta)
+            self.active -= 1
+            if overloaded:
+                self._on_overload(retry_after)
+            elif succeeded:
+                self._on_success()
+            self._wake()
+
+    def stats(self) -> dict:
+        return dict(
+            self.counters,
+            limit=round(self.limit, 2),
+            active=self.active,
+            queued=len(self._waiters),
+            queue_time=self.queue_time.stats(),
+            upstream_time=self.upstream_time.stats(),
+        )
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return float(response.headers.get("retry-after", ""))
+    except ValueError:
+        return None
+
+
+limiter = AdmissionController()
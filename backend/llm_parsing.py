@@ -0,0 +1,411 @@
+# llm_parsing.py
+# One place that turns model output into typed results.
+#
+# Completions arrive with markdown bold, numbering, code fences, smart
+# quotes, preambles ("Sure! Here are...") and, when max_tokens cuts them
+# off, truncated JSON. Every parser here is tolerant of that: an
+# evaluation is read label by label, question lists keep only list
+# items, and quiz arrays are scanned object by object so the complete
+# items of a cut-off reply are still served instead of failing the
+# request (which users answer with a retry, i.e. another LLM call).
+# Outcomes are counted in `stats` (see /admin/llm-stats).
+
+import json
+import re
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+from metrics import timed
+
+stats = Counter()
+
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "’": "'", "‘": "'"})
+
+
+def _number(value: float):
+    return int(value) if float(value).is_integer() else value
+
+
+# ---- evaluations ("Score / Constructive feedback / Correct Answer") ----
+
+SCORE_RE = re.compile(r"Score\s*(?:\(out of 5\))?\s*[:\-–]?\s*[*_]*\s*(\d+(?:\.\d+)?)(?:\s*(?:/|out of)\s*(\d+))?", re.IGNORECASE)
+
+# "**2. Constructive feedback:** ...", "Score (out of 5) - 4/5", "- Correct answer: ...",
+# and /topic-evaluate's own "2. Give feedback: ...", "3. The correct answer is: ..."
+_LABEL_RE = re.compile(
+    r"^[\s>#*_\-•]*(?:\d+[.)]\s*)?[*_]*\s*(?:(?:give|provide|the|your|an?)\s+)*"
+    r"(score|(?:constructive\s+)?feedback|(?:correct|ideal|model|expected)\s+answer)"
+    r"[^:\-–\n]{0,20}?[*_]*\s*[:\-–]\s*[*_]*\s*(.*?)[*_\s]*$",
+    re.IGNORECASE,
+)
+_SIGN_OFF_RE = re.compile(r"^(?:let me know|hope (?:this|that) helps|i hope|feel free|good luck)\b", re.IGNORECASE)
+_SCORE_VALUE_RE = re.compile(r"(\d+(?:\.\d+)?)(?:\s*(?:/|out of)\s*(\d+))?", re.IGNORECASE)
+
+
+@dataclass
+class Evaluation:
+    score: Optional[float] = None
+    feedback: Optional[str] = None
+    correct_answer: Optional[str] = None
+
+    @property
+    def complete(self) -> bool:
+        return self.score is not None and bool(self.feedback) and bool(self.correct_answer)
+
+    def score_text(self) -> str:
+        return "N/A" if self.score is None else str(self.score)
+
+    def fields(self) -> Dict[str, str]:
+        found = {"score": self.score_text()} if self.score is not None else {}
+        if self.feedback:
+            found["feedback"] = self.feedback
+        if self.correct_answer:
+            found["correct_answer"] = self.correct_answer
+        return found
+
+    def to_text(self) -> str:
+        return (
+            f"Score: {self.score_text()}\n"
+            f"Constructive feedback: {self.feedback or 'N/A'}\n"
+            f"Correct Answer: {self.correct_answer or 'Not available.'}"
+        )
+
+
+def parse_score(value) -> Optional[float]:
+    """4, "4", "4/5", "8/10", "4.5 out of 5" -> score out of 5."""
+    match = _SCORE_VALUE_RE.search(str(value))
+    if not match:
+        return None
+    score = float(match.group(1))
+    scale = float(match.group(2)) if match.group(2) else 5.0
+    if scale and scale != 5.0:
+        score = round(score * 5.0 / scale, 1)
+    return _number(min(5.0, max(0.0, score)))
+
+
+def find_score(text: str) -> Optional[float]:
+    """First "Score ..." anywhere in the text, out of 5."""
+    match = SCORE_RE.search(text or "")
+    return parse_score(text[match.start(1):match.end()]) if match else None
+
+
+def _field_name(label: str) -> str:
+    label = label.lower()
+    if label.startswith("score"):
+        return "score"
+    return "feedback" if "feedback" in label else "correct_answer"
+
+
+def _read_evaluation(text: str) -> Evaluation:
+    values: Dict[str, List[str]] = {}
+    current = None
+    for line in text.splitlines():
+        match = _LABEL_RE.match(line)
+        if match:
+            name = _field_name(match.group(1))
+            current = None if name in values else name  # first occurrence wins
+            if current:
+                values[name] = [match.group(2).strip()] if match.group(2).strip() else []
+            continue
+        line = line.strip()
+        if not line or current is None:
+            continue
+        if _SIGN_OFF_RE.match(line):
+            current = None  # chatter after the evaluation
+            continue
+        if current == "score" and values["score"]:
+            current = None  # score is one value; unlabeled text after it isn't part of it
+            continue
+        values[current].append(line)
+
+    score = parse_score(" ".join(values["score"])) if values.get("score") else None
+    if score is None:
+        score = find_score(text)
+    return Evaluation(
+        score=score,
+        feedback=" ".join(values.get("feedback", [])) or None,
+        correct_answer="\n".join(values.get("correct_answer", [])) or None,
+    )
+
+
+@timed("response_parse")
+def parse_evaluation(text: str) -> Evaluation:
+    evaluation = _read_evaluation(text or "")
+    stats["evaluation_ok" if evaluation.complete else "evaluation_partial"] += 1
+    return evaluation
+
+
+class EvaluationStreamParser:
+    """Incrementally pulls score / feedback / correct answer out of a
+    streamed evaluation. A field is emitted once its line is complete;
+    `evaluation` holds the full parse after close()."""
+
+    def __init__(self):
+        self.text = ""
+        self.fields: Dict[str, str] = {}
+        self.evaluation: Optional[Evaluation] = None
+        self._pending = ""
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        self.text += chunk
+        self._pending += chunk
+        *lines, self._pending = self._pending.split("\n")
+        return self._scan(lines)
+
+    def close(self) -> List[Tuple[str, str]]:
+        lines, self._pending = [self._pending], ""
+        found = self._scan(lines)
+        self.evaluation = parse_evaluation(self.text)
+        return found
+
+    def _scan(self, lines: List[str]) -> List[Tuple[str, str]]:
+        found = []
+        for line in lines:
+            for name, value in _read_evaluation(line).fields().items():
+                if name not in self.fields:
+                    self.fields[name] = value
+                    found.append((name, value))
+        return found
+
+
+# ---- question lists ----
+
+_LIST_ITEM_RE = re.compile(r"^\s*(?:[*_]{0,2}(?:Q(?:uestion)?\s*)?\d+\s*[.):\-]|\(\d+\)|[-*•])[*_]{0,2}\s+")
+_PREAMBLE_RE = re.compile(r"^(?:here (?:are|is)\b|sure\b|certainly\b|of course\b|below\b)|:\s*$", re.IGNORECASE)
+
+
+def clean_question(text: str) -> str:
+    """Drops list numbering / bullets and markdown emphasis."""
+    return _LIST_ITEM_RE.sub("", text).replace("**", "").strip()
+
+
+@timed("response_parse")
+def parse_question_list(text: str, min_words: int = 1) -> List[str]:
+    lines = [line for line in (text or "").splitlines() if line.strip()]
+    items = [line for line in lines if _LIST_ITEM_RE.match(line)]
+    if not items:
+        # Plain one-per-line reply: keep everything that isn't chatter
+        items = [line for line in lines if not _PREAMBLE_RE.search(line.strip())]
+
+    questions, seen = [], set()
+    for line in items:
+        question = clean_question(line)
+        if len(question.split()) >= min_words and question.lower() not in seen:
+            seen.add(question.lower())
+            questions.append(question)
+    if not questions:
+        stats["questions_failed"] += 1
+        raise ValueError("No questions found in model output.")
+    stats["questions_ok"] += 1
+    return questions
+
+
+# ---- JSON arrays (quiz, batch evaluation) ----
+
+_STRUCT_RE = re.compile(r'[\[\]{}"\\]')
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+
+
+def _decode_object(raw: str) -> Optional[dict]:
+    for candidate in (raw, _TRAILING_COMMA_RE.sub(r"\1", raw.replace("\\_", "_"))):
+        try:
+            value = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        return value if isinstance(value, dict) else None
+    return None
+
+
+class JsonArrayStreamParser:
+    """Yields each complete top-level object of a JSON array as soon as its
+    closing brace arrives. Text before the first '[' (fences, chatter) is
+    ignored, a malformed object is skipped rather than failing the rest,
+    and a truncated tail simply never completes."""
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._skip = 0
+        self._depth = 0
+        self._start = 0
+        self._in_string = False
+        self.started = False
+        self.finished = False
+        self.skipped = 0
+
+    def feed(self, chunk: str) -> List[dict]:
+        if self.finished:
+            return []
+        self._text += chunk.translate(_SMART_QUOTES)
+        objects = []
+        for match in _STRUCT_RE.finditer(self._text, self._pos):
+            i, ch = match.start(), match.group()
+            if i < self._skip:
+                continue
+            if self._in_string:
+                if ch == "\\":
+                    self._skip = i + 2
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if not self.started:
+                self.started = ch == "["
+                continue
+            if ch == '"':
+                self._in_string = self._depth > 0
+            elif ch == "{" or (ch == "[" and self._depth > 0):
+                if self._depth == 0:
+                    self._start = i
+                self._depth += 1
+            elif self._depth == 0:
+                if ch == "]":
+                    self.finished = True
+                    break
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    obj = _decode_object(self._text[self._start:i + 1])
+                    if obj is None:
+                        self.skipped += 1
+                    else:
+                        objects.append(obj)
+        self._pos = len(self._text)
+        return objects
+
+
+def parse_json_objects(text: str) -> Tuple[List[dict], bool]:
+    """All objects of the first JSON array in `text`, and whether the
+    reply needed salvaging (truncated, or bad items skipped)."""
+    cleaned = (text or "").translate(_SMART_QUOTES)
+    start, end = cleaned.find("["), cleaned.rfind("]")
+    if start != -1 and end > start:
+        try:
+            value = json.loads(cleaned[start:end + 1])
+            if isinstance(value, list):
+                return [v for v in value if isinstance(v, dict)], False
+        except json.JSONDecodeError:
+            pass
+    parser = JsonArrayStreamParser()
+    return parser.feed(cleaned), True
+
+
+# ---- quiz ----
+
+_OPTION_PREFIX_RE = re.compile(r"^\(?([A-Ha-h])[.):]\s+")
+
+
+@dataclass
+class QuizItem:
+    question: str
+    options: List[str]
+    correct_answer: List[str]
+
+    @classmethod
+    def from_raw(cls, raw: dict) -> Optional["QuizItem"]:
+        question = raw.get("question")
+        options = raw.get("options")
+        correct = raw.get("correct_answer", raw.get("correct_answers", raw.get("answer")))
+        if not isinstance(question, str) or not question.strip():
+            return None
+        if not isinstance(options, list) or len(options) < 2:
+            return None
+        options = [str(o).strip() for o in options]
+        if isinstance(correct, (str, int)):
+            correct = [correct]
+        if not isinstance(correct, list):
+            return None
+        resolved = [o for o in (_resolve_option(c, options) for c in correct) if o]
+        if not resolved:
+            return None
+        return cls(question.strip(), options, list(dict.fromkeys(resolved)))
+
+
+def _resolve_option(answer, options: List[str]) -> Optional[str]:
+    """Maps "Jenkins", "B", "b) Jenkins" or 1 (index) onto the option text."""
+    if isinstance(answer, int) and not isinstance(answer, bool):
+        return options[answer] if 0 <= answer < len(options) else None
+    answer = str(answer).strip()
+    if answer in options:
+        return answer
+    lowered = {_OPTION_PREFIX_RE.sub("", o).lower(): o for o in options}
+    bare = _OPTION_PREFIX_RE.sub("", answer).lower()
+    if bare in lowered:
+        return lowered[bare]
+    if len(answer) == 1 and answer.isalpha():
+        index = ord(answer.upper()) - ord("A")
+        return options[index] if index < len(options) else None
+    return None
+
+
+@timed("response_parse")
+def parse_quiz(text: str) -> List[dict]:
+    """Valid quiz questions as dicts (question, options, correct_answer)."""
+    raw, salvaged = parse_json_objects(text)
+    items = [QuizItem.from_raw(r) for r in raw]
+    valid = [asdict(item) for item in items if item is not None]
+    stats["quiz_items_dropped"] += len(items) - len(valid)
+    if not valid:
+        stats["quiz_failed"] += 1
+        raise ValueError("No valid quiz questions in model output.")
+    stats["quiz_salvaged" if salvaged else "quiz_ok"] += 1
+    return valid
+
+
+class QuizStreamParser:
+    """Valid quiz questions from a streamed reply, each returned by feed()
+    as soon as its object closes. Invalid items are skipped and counted."""
+
+    def __init__(self):
+        self._array = JsonArrayStreamParser()
+        self.count = 0
+        self.dropped = 0
+
+    @property
+    def skipped(self) -> int:
+        return self.dropped + self._array.skipped
+
+    @property
+    def finished(self) -> bool:
+        return self._array.finished
+
+    def feed(self, chunk: str) -> List[dict]:
+        valid = []
+        for raw in self._array.feed(chunk):
+            item = QuizItem.from_raw(raw)
+            if item is None:
+                self.dropped += 1
+            else:
+                valid.append(asdict(item))
+        self.count += len(valid)
+        return valid
+
+    def close(self):
+        stats["quiz_items_dropped"] += self.dropped
+        if not self.count:
+            stats["quiz_failed"] += 1
+        else:
+            salvaged = self.skipped or not self._array.finished
+            stats["quiz_salvaged" if salvaged else "quiz_ok"] += 1
+
+
+# ---- batch evaluation ----
+
+@timed("response_parse")
+def parse_evaluation_array(text: str, count: int) -> Dict[int, Evaluation]:
+    """{1-based index: Evaluation} for the usable entries of a JSON reply."""
+    raw, _ = parse_json_objects(text)
+    parsed = {}
+    for position, entry in enumerate(raw, 1):
+        try:
+            index = int(entry.get("index", position))
+        except (TypeError, ValueError):
+            continue
+        score = parse_score(entry.get("score", ""))
+        feedback = str(entry.get("feedback") or "").strip()
+        if 1 <= index <= count and score is not None and feedback:
+            correct = str(entry.get("correct_answer") or "").strip() or "Not available."
+            parsed[index] = Evaluation(score=score, feedback=feedback, correct_answer=correct)
+    stats["batch_evaluation_items"] += len(parsed)
+    stats["batch_evaluation_missing"] += count - len(parsed)
+    return parsed
@@ -0,0 +1,335 @@
+# llm_router.py
+# Routes chat completions over one or more OpenAI-compatible endpoints.
+#
+# LLM_ENDPOINTS is a JSON list, in priority order, e.g.
+#   [{"name": "together", "url": "https://api.together.xyz/v1/chat/completions",
+#     "model": "mistralai/Mixtral-8x7B-Instruct-v0.1", "timeout": 20,
+#     "api_key_env": "TOGETHER_API_KEY"},
+#    {"name": "backup", "url": "http://10.0.0.5:8000/v1/chat/completions",
+#     "model": "mixtral", "api_key_env": "BACKUP_API_KEY"}]
+# and defaults to the single TOGETHER_URL / LLM_MODEL endpoint. Only that
+# built-in endpoint is sent TOGETHER_API_KEY; a configured endpoint gets
+# its own key, or no Authorization at all.
+#
+# Every attempt runs under min(endpoint timeout, what is left of the
+# request's LLM_REQUEST_DEADLINE). If the first endpoint hasn't answered
+# within its observed p95, a hedged duplicate goes to the next healthy
+# endpoint (or the same one when it is alone) and the first success wins;
+# hedges are capped at LLM_HEDGE_MAX_RATIO of requests and each needs its
+# own limiter slot and RPM/TPM budget (skipped, never queued, when the
+# limiter has none free). Errors fail over
+# to the next endpoint immediately. Per-endpoint circuit breakers skip an
+# endpoint after LLM_BREAKER_FAILURES consecutive failures, for
+# LLM_BREAKER_COOLDOWN seconds, then let one trial request through.
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import httpx
+
+from clients import registry
+from llm_limiter import UpstreamBusy, limiter
+from metrics import observe_stage
+from settings import settings
+
+# Same request fails the same way everywhere: no failover
+NON_RETRYABLE_STATUSES = {400, 401, 403, 404, 422}
+
+
+class LatencyWindow:
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+        self._sorted: Optional[List[float]] = None
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+        self._sorted = None
+
+    def quantile(self, q: float) -> Optional[float]:
+        if len(self._samples) < settings.llm_hedge_min_samples:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self._samples)
+        return self._sorted[min(len(self._sorted) - 1, int(q * len(self._sorted)))]
+
+
+class CircuitBreaker:
+    def __init__(self):
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < settings.llm_breaker_cooldown:
+            return "open"
+        return "half_open"
+
+    def available(self) -> bool:
+        state = self.state
+        return state == "closed" or (state == "half_open" and not self.trial_in_flight)
+
+    def begin(self):
+        if self.opened_at is not None:
+            self.trial_in_flight = True  # half-open: this request is the trial
+
+    def success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def failure(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.failures >= settings.llm_breaker_failures:
+            self.opened_at = time.monotonic()  # (re)open; a failed trial restarts the cooldown
+
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, settings.llm_breaker_cooldown - (time.monotonic() - self.opened_at))
+
+
+@dataclass
+class Endpoint:
+    name: str
+    url: Optional[str] = None  # None: TOGETHER_URL, read at call time
+    model: Optional[str] = None
+    api_key: Optional[str] = None
+    timeout: Optional[float] = None
+    latency: LatencyWindow = field(default_factory=LatencyWindow)
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker)
+    requests: int = 0
+    failures: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+
+    @property
+    def target(self) -> str:
+        return self.url or settings.together_url
+
+    def hedge_delay(self) -> float:
+        p95 = self.latency.quantile(0.95)
+        if p95 is None:
+            return settings.llm_hedge_default_ms / 1000
+        return max(settings.llm_hedge_min_ms / 1000, p95)
+
+    def stats(self) -> dict:
+        p50, p95 = self.latency.quantile(0.5), self.latency.quantile(0.95)
+        return {
+            "url": self.target,
+            "model": self.model,
+            "breaker": self.breaker.state,
+            "requests": self.requests,
+            "failures": self.failures,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+
+
+def load_endpoints(raw: Optional[str]) -> List[Endpoint]:
+    if not raw:
+        return [Endpoint(name="primary")]
+    endpoints = []
+    for n, item in enumerate(json.loads(raw)):
+        key = item.get("api_key") or (os.getenv(item["api_key_env"]) if item.get("api_key_env") else None)
+        endpoints.append(
+            Endpoint(
+                name=item.get("name") or f"endpoint-{n}",
+                url=item["url"],
+                model=item.get("model"),
+                api_key=key,
+                timeout=item.get("timeout"),
+            )
+        )
+    return endpoints
+
+
+def _retryable(error: BaseException) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code not in NON_RETRYABLE_STATUSES
+    return True
+
+
+class LLMRouter:
+    def __init__(self, endpoints: Optional[List[Endpoint]] = None):
+        self._endpoints = endpoints
+        self.requests = 0
+        self.hedged = 0
+        self.hedges_skipped = 0
+
+    @property
+    def endpoints(self) -> List[Endpoint]:
+        if self._endpoints is None:
+            self._endpoints = load_endpoints(settings.llm_endpoints)
+        return self._endpoints
+
+    def _payload(self, endpoint: Endpoint, payload: dict) -> dict:
+        return dict(payload, model=endpoint.model) if endpoint.model else payload
+
+    def _headers(self, endpoint: Endpoint) -> Optional[dict]:
+        if endpoint.url is None:
+            return None  # built-in endpoint: the client's TOGETHER_API_KEY header
+        # Never leak the Together key to another host
+        return {"Authorization": f"Bearer {endpoint.api_key}" if endpoint.api_key else ""}
+
+    def _budget(self, endpoint: Endpoint, deadline: float) -> float:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise httpx.TimeoutException("LLM request deadline exceeded")
+        return min(endpoint.timeout or settings.llm_endpoint_timeout, remaining)
+
+    def _available(self) -> List[Endpoint]:
+        available = [e for e in self.endpoints if e.breaker.available()]
+        if not available:
+            retry_after = min(e.breaker.retry_after() for e in self.endpoints)
+            raise UpstreamBusy("all LLM endpoints failing", retry_after)
+        return available
+
+    def _may_hedge(self) -> bool:
+        if not settings.llm_hedge_enabled:
+            return False
+        # Budget: a few hedges to start with, then LLM_HEDGE_MAX_RATIO of requests
+        return self.hedged < 5 + settings.llm_hedge_max_ratio * self.requests
+
+    async def _attempt(self, endpoint: Endpoint, payload: dict, deadline: float) -> dict:
+        endpoint.requests += 1
+        endpoint.breaker.begin()
+        started = time.monotonic()
+        try:
+            async with asyncio.timeout(self._budget(endpoint, deadline)):
+                res = await registry.http().post(
+                    endpoint.target, json=self._payload(endpoint, payload), headers=self._headers(endpoint)
+                )
+                res.raise_for_status()
+                body = res.json()
+        except asyncio.CancelledError:
+            endpoint.breaker.trial_in_flight = False  # lost a hedge race; not a failure
+            raise
+        except TimeoutError:
+            endpoint.failures += 1
+            endpoint.breaker.failure()
+            raise httpx.TimeoutException(f"{endpoint.name} exceeded its deadline")
+        except Exception:
+            endpoint.failures += 1
+            endpoint.breaker.failure()
+            raise
+        elapsed = time.monotonic() - started
+        endpoint.latency.add(elapsed)
+        endpoint.breaker.success()
+        observe_stage(f"upstream:{endpoint.name}", elapsed)
+        return body
+
+    async def _hedge(self, endpoint: Endpoint, payload: dict, deadline: float) -> dict:
+        # A hedge is one more upstream call: its own slot, RPM/TPM and AIMD feedback
+        async with limiter.admit(payload["messages"], payload.get("max_tokens"), wait=False) as ticket:
+            body = await self._attempt(endpoint, payload, deadline)
+            ticket.used_tokens = (body.get("usage") or {}).get("total_tokens")
+        return body
+
+    async def complete(self, payload: dict) -> dict:
+        """Response body of the first successful attempt."""
+        self.requests += 1
+        deadline = time.monotonic() + settings.llm_request_deadline
+        queue = self._available()
+        running = {}  # task -> endpoint
+        last_error: Optional[BaseException] = None
+
+        def launch(endpoint, hedge=False):
+            attempt = self._hedge if hedge else self._attempt
+            task = asyncio.ensure_future(attempt(endpoint, payload, deadline))
+            running[task] = (endpoint, hedge)
+
+        primary = queue.pop(0)
+        hedging = True
+        launch(primary)
+        try:
+            while running:
+                timeout = None
+                if len(running) == 1 and hedging and self._may_hedge():
+                    (only, _), = running.values()
+                    timeout = only.hedge_delay()
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # Slower than its p95: race a duplicate
+                    target = queue.pop(0) if queue else primary
+                    self.hedged += 1
+                    target.hedges += 1
+                    launch(target, hedge=True)
+                    continue
+
+                for task in done:
+                    endpoint, hedge = running.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        if hedge:
+                            endpoint.hedge_wins += 1
+                        return task.result()
+                    if hedge and isinstance(error, UpstreamBusy):
+                        # Limiter full: no duplicate for this request; the endpoint stays a failover target
+                        hedging = False
+                        self.hedged -= 1
+                        endpoint.hedges -= 1
+                        self.hedges_skipped += 1
+                        if endpoint is not primary:
+                            queue.insert(0, endpoint)
+                        continue
+                    last_error = error
+                    if not _retryable(error):
+                        raise error
+                if not running and queue:
+                    launch(queue.pop(0))  # fail over
+            raise last_error
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def open_stream(self, payload: dict):
+        """Connected streaming response from the first endpoint that accepts
+        the request (fail over before any token; no hedging for streams)."""
+        deadline = time.monotonic() + settings.llm_request_deadline
+        last_error: Optional[BaseException] = None
+        for endpoint in self._available():
+            endpoint.requests += 1
+            endpoint.breaker.begin()
+            client = registry.http()
+            request = client.build_request(
+                "POST", endpoint.target, json=self._payload(endpoint, payload), headers=self._headers(endpoint)
+            )
+            try:
+                async with asyncio.timeout(self._budget(endpoint, deadline)):
+                    res = await client.send(request, stream=True)
+                if res.is_error:
+                    await res.aread()
+                    res.raise_for_status()
+            except Exception as e:
+                endpoint.failures += 1
+                endpoint.breaker.failure()
+                last_error = httpx.TimeoutException(f"{endpoint.name} exceeded its deadline") if isinstance(e, TimeoutError) else e
+                if not _retryable(last_error):
+                    raise last_error
+                continue
+            endpoint.breaker.success()
+            return res
+        raise last_error
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedges_skipped": self.hedges_skipped,
+            "endpoints": {e.name: e.stats() for e in self.endpoints},
+        }
+
+
+router = LLMRouter()
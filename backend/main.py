@@ -1,27 +1,46 @@
+
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from settings import settings
+from clients import registry
 from evaluator import router as evaluator_router
-from dotenv import load_dotenv
-from resume_parser import router as resume_router
 from resume_parser import router as resume_parser_router
 from resume_session import router as session_router
-from resume_session import router as resume_router
-from routes.topic_route import router as topic_router
-from topic_question import router as topic_router
+from interview_ws import WS_MAX_SIZE, router as interview_ws_router
+from routes.topic_route import router as topic_route_router
 from topic_question import router as topic_question_router
 from topic_evaluate import router as topic_eval_router
 from resume_review import router as resume_review_router
 from admin_routes import router as admin_router
+from user_stats import router as user_stats_router
 from quiz_generator import router as quiz_router
+from uploads import UploadLimitMiddleware
+from question_bank import bank
+from jobs import queue as jobs, router as jobs_router
+from answer_index import answer_index
+from metrics import MetricsMiddleware, router as metrics_router
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # ✅ Clients (Firebase, Firestore, LLM pool) are created on first use
+    app.state.settings = settings
+    app.state.registry = registry
+    # 🏦 Keep popular topic/difficulty pairs stocked with pre-generated questions
+    if settings.question_bank_enabled:
+        bank.start()
+    # 🧾 Workers for ?job=true requests; picks up jobs left by a previous run
+    jobs.start()
+    yield
+    await jobs.stop()
+    await bank.stop()
+    await answer_index.stop()  # ♻️ seeded on its first lookup, not here
+    # ✅ Flush pending Firestore writes, close the LLM pool and PDF workers
+    await registry.aclose()
 
 
-
-# ✅ Load environment variables from .env
-load_dotenv()
-
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # ✅ Allow frontend to call the backend locally
 app.add_middleware(
@@ -30,18 +49,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
+# ✅ Reject oversized resume uploads before the body is read
+app.add_middleware(UploadLimitMiddleware)
+
+# ✅ Outermost: times every request and serves the histograms at /metrics
+app.add_middleware(MetricsMiddleware)
+
 # ✅ Mount the evaluator route (e.g., /evaluate-answer)
 app.include_router(evaluator_router)
-app.include_router(resume_router)
 app.include_router(resume_parser_router)
 app.include_router(session_router)
-app.include_router(resume_router)
-app.include_router(topic_router)
-app.include_router(topic_router)
+app.include_router(interview_ws_router)
+app.include_router(topic_route_router)
 app.include_router(topic_question_router)
 app.include_router(topic_eval_router)
 app.include_router(resume_review_router)
 app.include_router(admin_router)
 app.include_router(quiz_router)
+app.include_router(user_stats_router)
+app.include_router(jobs_router)
+app.include_router(metrics_router)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # 🔌 Cap WebSocket frames at the resume size limit (uvicorn buffers whole frames)
+    uvicorn.run("main:app", port=8000, ws_max_size=WS_MAX_SIZE)
@@ -0,0 +1,244 @@
+# metrics.py
+# Request latency, per-stage spans, sampled structured logs and an opt-in
+# per-request profiler.
+#
+# MetricsMiddleware times every request under its route template;
+# `span(stage)` / `@timed(stage)` time one stage of it (body parse, PDF
+# extract, prompt build, upstream queue/wait, response parse, Firestore
+# write). Both feed histograms that /metrics serves in the Prometheus text
+# format. `log_event` replaces the print() dumps: warnings and errors are
+# always written, routine events only for LOG_SAMPLE_RATE of requests.
+# With PROFILING_ENABLED, a request sent with `X-Profile: 1` is profiled
+# (pyinstrument if installed, else cProfile) into PROFILE_DIR.
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import random
+import re
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, List, Tuple
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from settings import settings
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# The ASGI scope of the request being served; spans read the route from it
+_scope: contextvars.ContextVar = contextvars.ContextVar("request_scope", default=None)
+_sampled: contextvars.ContextVar = contextvars.ContextVar("log_sampled", default=None)
+
+logger = logging.getLogger("interview")
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(settings.log_level.upper())
+    logger.propagate = False
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...], buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> per-bucket counts (last one is +Inf only), then sum and count
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 3)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, labels))
+            prefix = base + "," if base else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {series[-1]}")
+        return lines
+
+    def reset(self):
+        self._series.clear()
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency until the last body byte is sent.", ("method", "route", "status")
+)
+STAGE_SECONDS = Histogram("stage_duration_seconds", "Time spent in one stage of a request.", ("route", "stage"))
+HISTOGRAMS = [REQUEST_SECONDS, STAGE_SECONDS]
+
+
+def current_route() -> str:
+    scope = _scope.get()
+    if scope is None:
+        return "background"
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def observe_stage(stage: str, seconds: float):
+    STAGE_SECONDS.observe(seconds, current_route(), stage)
+
+
+@contextmanager
+def span(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+def timed(stage: str):
+    """Decorator form of `span` for sync and async functions."""
+
+    def decorate(fn):
+        if asyncio.iscoroutinefunction(fn):
+
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def render() -> str:
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines += histogram.render()
+    return "\n".join(lines) + "\n"
+
+
+# ---- structured logging ----
+
+def log_event(event: str, level: int = logging.INFO, **fields):
+    """One JSON line per event. Below WARNING, only requests picked by
+    LOG_SAMPLE_RATE log (all of their events, so a sampled request reads
+    end to end)."""
+    if level < logging.WARNING:
+        sampled = _sampled.get()
+        if sampled is None:
+            sampled = random.random() < settings.log_sample_rate
+        if not sampled:
+            return
+    if not logger.isEnabledFor(level):
+        return
+    record = {"ts": round(time.time(), 3), "level": logging.getLevelName(level).lower(), "event": event}
+    record["route"] = current_route()
+    record.update(fields)
+    logger.log(level, json.dumps(record, default=str, ensure_ascii=False))
+
+
+# ---- profiling ----
+
+_profiling = False  # cProfile can't nest; one profiled request at a time
+
+
+def _start_profiler():
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler, "prof"
+    profiler = Profiler(async_mode="enabled")
+    profiler.start()
+    return profiler, "html"
+
+
+def _save_profile(profiler, kind: str, route: str, duration: float):
+    os.makedirs(settings.profile_dir, exist_ok=True)
+    slug = re.sub(r"[^a-z0-9]+", "-", route.lower()).strip("-") or "root"
+    path = os.path.join(settings.profile_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}.{kind}")
+    if kind == "html":
+        profiler.stop()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(profiler.output_html())
+    else:
+        profiler.disable()
+        profiler.dump_stats(path)  # flame graph: `snakeviz` / `flameprof`
+    log_event("profile_saved", logging.WARNING, path=path, duration_ms=round(duration * 1000, 1))
+
+
+class MetricsMiddleware:
+    """Times each HTTP request until its last body byte (streams included)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+
+        async def timed_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        global _profiling
+        profiler = None
+        if settings.profiling_enabled and not _profiling and (b"x-profile", b"1") in scope["headers"]:
+            _profiling = True
+            profiler, kind = _start_profiler()
+
+        scope_token = _scope.set(scope)
+        sampled_token = _sampled.set(random.random() < settings.log_sample_rate)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            duration = time.perf_counter() - start
+            route = current_route()
+            REQUEST_SECONDS.observe(duration, scope["method"], route, str(status))
+            if profiler is not None:
+                try:
+                    _save_profile(profiler, kind, route, duration)
+                finally:
+                    _profiling = False
+            _sampled.reset(sampled_token)
+            _scope.reset(scope_token)
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,86 @@
+# pdf_extractor.py
+# Resume PDF text extraction off the event loop.
+#
+# PyMuPDF runs on a bounded process pool. Small PDFs are extracted in one
+# task; larger ones are split into page ranges that run in parallel. Page
+# texts are joined once at the end (no quadratic `text +=`), with a form
+# feed between pages, and extraction stops as soon as the prompt budget
+# is reached.
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple, Union
+
+from metrics import timed
+from settings import settings
+
+# Any buffer PyMuPDF can open in place: bytes, bytearray or memoryview
+PdfSource = Union[bytes, bytearray, memoryview]
+
+# Between page texts, so the condenser can tell running headers from content
+PAGE_BREAK = "\f"
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _extract_pages(source: PdfSource, start: int, stop: int, max_chars: Optional[int]) -> Tuple[int, List[str]]:
+    import fitz  # PyMuPDF, imported in the worker process
+
+    texts, size = [], 0
+    with fitz.open(stream=source, filetype="pdf") as doc:
+        page_count = doc.page_count
+        for number in range(start, min(stop, page_count)):
+            page_text = doc.load_page(number).get_text()
+            texts.append(page_text)
+            size += len(page_text)
+            if max_chars is not None and size >= max_chars:
+                break
+    return page_count, texts
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if _pool is None and settings.pdf_workers > 0:
+        # Not fork: by the time the first resume arrives the gRPC (Firestore) and
+        # HTTP client threads are running, and forking past them can deadlock
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.pdf_workers, mp_context=multiprocessing.get_context("forkserver")
+        )
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def _run(source, start, stop, max_chars):
+    # PDF_WORKERS=0 extracts on a thread instead of a process pool
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), _extract_pages, source, start, stop, max_chars)
+
+
+@timed("pdf_extract")
+async def extract_text(source: PdfSource, max_chars: Optional[int] = None) -> str:
+    """Text of an in-memory PDF, cut at `max_chars`."""
+    first_pages = settings.pdf_parallel_min_pages
+    page_count, texts = await _run(source, 0, first_pages, max_chars)
+    size = sum(len(t) for t in texts)
+
+    # Remaining pages split evenly over the workers, one wave per pool size
+    wave = max(1, settings.pdf_workers)
+    step = max(settings.pdf_min_pages_per_task, -(-(page_count - first_pages) // wave))
+    ranges = [(start, start + step) for start in range(first_pages, page_count, step)]
+    while ranges and (max_chars is None or size < max_chars):
+        batch, ranges = ranges[:wave], ranges[wave:]
+        remaining = None if max_chars is None else max_chars - size
+        results = await asyncio.gather(*(_run(source, start, stop, remaining) for start, stop in batch))
+        for _, chunk in results:
+            texts.extend(chunk)
+            size += sum(len(t) for t in chunk)
+
+    text = PAGE_BREAK.join(texts)
+    return text if max_chars is None else text[:max_chars]
@@ -0,0 +1,244 @@
+# question_bank.py
+# Pre-generated interview questions per (topic, difficulty), in SQLite.
+#
+# /topic-question and /generate-topic-questions take five questions from
+# the bank (least-served first, so consecutive users get different sets)
+# and only fall back to live generation while a key has fewer than two
+# sets; a miss also banks QUESTION_BANK_REFILL_BATCH more for that key in
+# the background. Every request is counted as demand; a worker tops up
+# the most requested keys to QUESTION_BANK_LOW_WATER fresh questions and
+# retires questions served QUESTION_BANK_MAX_SERVES times. Questions are
+# deduplicated by a hash of their normalized text.
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from llm_parsing import clean_question, parse_question_list
+from metrics import log_event
+from settings import settings
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+def topic_key(topic: str) -> str:
+    return " ".join(topic.lower().split())
+
+
+def question_hash(text: str) -> str:
+    # "1. What is Docker?" and "what is docker" are the same question
+    normalized = _NON_WORD_RE.sub(" ", clean_question(text).lower()).strip()
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+class QuestionBank:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._top_ups: Dict[tuple, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.refilled = 0
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # Opened on first use, not at import; every caller holds _lock
+        if self._db is None:
+            self._db = self._open(self.path or settings.question_bank_db)
+        return self._db
+
+    @staticmethod
+    def _open(path: str) -> sqlite3.Connection:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS questions ("
+            " topic TEXT NOT NULL, difficulty TEXT NOT NULL, hash TEXT NOT NULL, text TEXT NOT NULL,"
+            " served INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL,"
+            " PRIMARY KEY (topic, difficulty, hash))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS questions_serve ON questions(topic, difficulty, served)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS demand ("
+            " topic TEXT NOT NULL, difficulty TEXT NOT NULL, label TEXT NOT NULL,"
+            " requests INTEGER NOT NULL, last_requested REAL NOT NULL,"
+            " PRIMARY KEY (topic, difficulty))"
+        )
+        return conn
+
+    def record_demand(self, topic: str, difficulty: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO demand (topic, difficulty, label, requests, last_requested) VALUES (?, ?, ?, 1, ?)"
+                " ON CONFLICT (topic, difficulty) DO UPDATE SET requests = requests + 1, last_requested = excluded.last_requested",
+                (topic_key(topic), difficulty.lower(), topic.strip(), time.time()),
+            )
+
+    def take(self, topic: str, difficulty: str, count: int = 5) -> Optional[List[str]]:
+        """Least-served `count` questions, or None while the key has fewer
+        than two sets (with just one, every caller would get the same)."""
+        key, level = topic_key(topic), difficulty.lower()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT hash, text FROM questions WHERE topic = ? AND difficulty = ?"
+                    " ORDER BY served, random() LIMIT ?",
+                    (key, level, 2 * count),
+                ).fetchall()
+                rows = rows[:count] if len(rows) == 2 * count else []
+                if not rows:
+                    self._conn.execute("COMMIT")
+                    self.misses += 1
+                    return None
+                self._conn.executemany(
+                    "UPDATE questions SET served = served + 1 WHERE topic = ? AND difficulty = ? AND hash = ?",
+                    [(key, level, h) for h, _ in rows],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        self.hits += 1
+        return [text for _, text in rows]
+
+    def add(self, topic: str, difficulty: str, questions: List[str]) -> int:
+        """Stores new questions; returns how many were not already banked."""
+        key, level, now = topic_key(topic), difficulty.lower(), time.time()
+        rows = [(key, level, question_hash(q), clean_question(q), now) for q in questions if clean_question(q)]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO questions (topic, difficulty, hash, text, created_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            return self._conn.total_changes - before
+
+    def fresh_count(self, topic: str, difficulty: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM questions WHERE topic = ? AND difficulty = ? AND served < ?",
+                (topic_key(topic), difficulty.lower(), settings.question_bank_max_serves),
+            ).fetchone()[0]
+
+    def hot_keys(self, limit: int) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT label, difficulty FROM demand ORDER BY requests DESC, last_requested DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+
+    def retire(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM questions WHERE served >= ?", (settings.question_bank_max_serves,)
+            ).rowcount
+
+    # ---- background refill ----
+
+    async def refill_once(self) -> int:
+        from llm_limiter import UpstreamBusy
+
+        added = 0
+        self.retire()
+        for label, difficulty in self.hot_keys(settings.question_bank_hot_keys):
+            if self.fresh_count(label, difficulty) >= settings.question_bank_low_water:
+                continue
+            try:
+                questions = await generate_fresh_questions(label, difficulty, settings.question_bank_refill_batch)
+            except UpstreamBusy:
+                break  # provider is saturated; users come first, try next round
+            except Exception as e:
+                log_event("question_bank_refill_failed", logging.WARNING, topic=label, difficulty=difficulty, error=str(e))
+                continue
+            added += self.add(label, difficulty, questions)
+        self.refilled += added
+        return added
+
+    def top_up(self, topic: str, difficulty: str):
+        """Banks a QUESTION_BANK_REFILL_BATCH for a key that just missed, in
+        the background (at most one per key at a time)."""
+        key = (topic_key(topic), difficulty.lower())
+        if key in self._top_ups:
+            return
+        task = asyncio.get_running_loop().create_task(self._top_up(topic, difficulty))
+        self._top_ups[key] = task
+        task.add_done_callback(lambda _: self._top_ups.pop(key, None))
+
+    async def _top_up(self, topic: str, difficulty: str):
+        try:
+            questions = await generate_fresh_questions(topic, difficulty, settings.question_bank_refill_batch)
+            self.refilled += self.add(topic, difficulty, questions)
+        except Exception as e:  # UpstreamBusy included: the periodic refill catches up
+            log_event("question_bank_refill_failed", logging.WARNING, topic=topic, difficulty=difficulty, error=str(e))
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refill_once()
+            except Exception as e:
+                log_event("question_bank_refill_failed", logging.WARNING, error=str(e))
+            await asyncio.sleep(settings.question_bank_refill_interval)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        for task in list(self._top_ups.values()):
+            task.cancel()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            banked = self._conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+            keys = self._conn.execute("SELECT COUNT(*) FROM demand").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "refilled": self.refilled, "questions": banked, "keys": keys}
+
+
+async def generate_fresh_questions(topic: str, difficulty: str, count: int) -> List[str]:
+    # Not through the completion cache: the refill wants new variants every time
+    from llm_client import chat_completion
+
+    prompt = f"""
+You are a interviewer.
+Generate {count} distinct technical interview questions on the topic "{topic}" with {difficulty} difficulty.
+Respond with one question per line.
+"""
+    content = await chat_completion([{"role": "user", "content": prompt}], temperature=0.9)
+    return parse_question_list(content)
+
+
+async def questions_for(topic: str, difficulty: str, generate: Callable[[], Awaitable[List[str]]]) -> List[str]:
+    """Serves from the bank; on a miss generates live and banks the result."""
+    if not settings.question_bank_enabled:
+        return await generate()
+    bank.record_demand(topic, difficulty)
+    questions = bank.take(topic, difficulty)
+    if questions is not None:
+        return questions
+    questions = await generate()
+    bank.add(topic, difficulty, questions)
+    # 🏦 Enough for distinct sets next time, without waiting for the refill tick
+    bank.top_up(topic, difficulty)
+    return questions
+
+
+bank = QuestionBank()
@@ -1,23 +1,87 @@
+import logging
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-import os
-import requests
-from dotenv import load_dotenv
-
-load_dotenv()
+from llm_cache import cache, cache_key, cached_chat_completion, stream_flight
+from llm_client import stream_chat_completion
+from llm_parsing import QuizStreamParser, parse_quiz
+from metrics import log_event
+from settings import settings
+from sse import ndjson_line, ndjson_response
 
 router = APIRouter()
 
-TOGETHER_API_KEY = os.getenv("TOGETHER_API_KEY")
-TOGETHER_API_URL = "https://api.together.xyz/v1/chat/completions"
+TEMPERATURE = 0.7
+MAX_TOKENS = 1500
+QUIZ_SIZE = 10
 
 class QuizRequest(BaseModel):
     topic: str
 
 @router.post("/generate-quiz")
-def generate_quiz(req: QuizRequest):
+async def generate_quiz(req: QuizRequest, stream: bool = False):
+    messages = build_quiz_messages(req.topic)
+
+    # 📡 One MCQ per NDJSON line as soon as the model has written it
+    if stream:
+        return ndjson_response(_stream_quiz(messages))
+
+    try:
+        # ♻️ Served from the completion cache when the topic was asked before
+        return await cached_chat_completion(
+            messages,
+            temperature=TEMPERATURE,
+            max_tokens=MAX_TOKENS,
+            parse=parse_quiz,
+            cacheable=lambda quiz: len(quiz) == QUIZ_SIZE,  # a cut-off quiz is served, not replayed for hours
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        log_event("quiz_generation_failed", logging.ERROR, error=str(e))
+        raise HTTPException(status_code=500, detail=f"Error generating quiz: {e}")
+
+
+async def _stream_quiz(messages):
+    """Lines: each valid question object, then {"done": true, "count", "skipped"}
+    or {"error": ...}. Malformed items are skipped, not fatal."""
+    key = cache_key(settings.llm_model, messages, TEMPERATURE, MAX_TOKENS)
+    parser = QuizStreamParser()
+    try:
+        cached = cache.get(key) if settings.llm_cache_enabled else None
+        if cached is not None:
+            for item in parser.feed(cached):
+                yield ndjson_line(item)
+        else:
+            # 🛬 Identical quizzes already streaming are shared, like the non-streamed path
+            async for delta in stream_flight.stream(key, lambda: _generate_quiz(messages, key)):
+                for item in parser.feed(delta):
+                    yield ndjson_line(item)
+        parser.close()
+        if parser.count:
+            yield ndjson_line({"done": True, "count": parser.count, "skipped": parser.skipped})
+        else:
+            yield ndjson_line({"error": "No valid quiz questions in model output."})
+    except Exception as e:
+        log_event("quiz_generation_failed", logging.ERROR, error=str(e))
+        yield ndjson_line({"error": f"Error generating quiz: {e}"})
+
+
+async def _generate_quiz(messages, key):
+    # Runs once per in-flight key, whatever the number of readers
+    parts, parser = [], QuizStreamParser()
+    async for delta in stream_chat_completion(messages, temperature=TEMPERATURE, max_tokens=MAX_TOKENS):
+        parts.append(delta)
+        parser.feed(delta)
+        yield delta
+    # Only a complete quiz is cached; a cut-off or short one would be replayed as is
+    if settings.llm_cache_enabled and parser.finished and parser.count == QUIZ_SIZE and not parser.skipped:
+        cache.add(key, "".join(parts))
+
+
+def build_quiz_messages(topic):
     prompt = f"""
-Generate 10 multiple-choice questions (MCQs) for the topic "{req.topic}".
+Generate {QUIZ_SIZE} multiple-choice questions (MCQs) for the topic "{topic}".
 Some questions should have multiple correct answers.
 
 Return each question as a JSON object with:
@@ -37,53 +101,7 @@ Example:
 ]
 """
 
-    headers = {
-        "Authorization": f"Bearer {TOGETHER_API_KEY}",
-        "Content-Type": "application/json"
-    }
-
-    payload = {
-        "model": "mistralai/Mixtral-8x7B-Instruct-v0.1",
-        "messages": [
-            {"role": "system", "content": "You are an expert DevOps quiz generator."},
-            {"role": "user", "content": prompt}
-        ],
-        "temperature": 0.7,
-        "max_tokens": 1500,
-    }
-
-    try:
-        res = requests.post(TOGETHER_API_URL, headers=headers, json=payload)
-        res.raise_for_status()
-        text = res.json()["choices"][0]["message"]["content"]
-        print("🔍 GPT Raw Response:\n", text)
-
-        # ---- CLEANING GPT RESPONSE ----
-        import json, re
-
-        # Strip markdown or extra code wrappers
-        cleaned = re.sub(r"^```(json)?", "", text.strip())
-        cleaned = re.sub(r"```$", "", cleaned)
-        cleaned = cleaned.replace("\\_", "_")
-        cleaned = cleaned.replace("’", "'").replace("“", '"').replace("”", '"')
-
-        # Strip non-JSON prefix/suffix if accidentally added
-        json_start = cleaned.find("[")
-        json_end = cleaned.rfind("]")
-        if json_start == -1 or json_end == -1:
-            raise ValueError("No valid JSON array found in response.")
-
-        cleaned_json = cleaned[json_start : json_end + 1]
-
-        # Parse to Python object
-        quiz_data = json.loads(cleaned_json)
-
-        # Validate structure (basic)
-        if not isinstance(quiz_data, list):
-            raise ValueError("Parsed data is not a list.")
-
-        return quiz_data
-
-    except Exception as e:
-        print(f"❌ Quiz generation failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Error generating quiz: {e}")
+    return [
+        {"role": "system", "content": "You are an expert DevOps quiz generator."},
+        {"role": "user", "content": prompt}
+    ]
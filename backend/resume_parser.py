@@ -1,19 +1,24 @@
-from fastapi import APIRouter, UploadFile, File
+import logging
+from fastapi import APIRouter, UploadFile, File, HTTPException
+from metrics import log_event
 from resume_gpt_generator import generate_resume_questions
+from uploads import read_pdf_upload
 
 router = APIRouter()
 
 @router.post("/generate-questions-from-resume")
 async def generate_questions_from_resume(file: UploadFile = File(...)):
     try:
-        # ✅ Read uploaded PDF resume as bytes
-        contents = await file.read()
+        # ✅ Read uploaded PDF resume into a size-capped in-memory buffer
+        contents = await read_pdf_upload(file)
 
         # ✅ Directly pass bytes to resume_gpt_generator
-        questions = generate_resume_questions(contents)
+        questions = await generate_resume_questions(contents)
 
         return {"questions": questions}
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print("❌ Resume parsing/generation error:", str(e))
+        log_event("resume_questions_failed", logging.ERROR, error=str(e))
         return {"error": "Failed to generate questions from resume."}
@@ -1,35 +1,66 @@
 # resume_review.py
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-import os
-import fitz  # PyMuPDF
-import requests
-from dotenv import load_dotenv
+from jobs import accepted, queue as jobs
+from llm_client import chat_completion, stream_chat_completion
+from sse import sse_event, sse_response
+from resume_store import store
+from settings import settings
+from uploads import read_pdf_upload
 
-load_dotenv()
 router = APIRouter()
 
-TOGETHER_API_KEY = os.getenv("TOGETHER_API_KEY")
-TOGETHER_API_URL = "https://api.together.xyz/v1/chat/completions"
-
-def extract_text_from_pdf(file_path):
-    text = ""
-    with fitz.open(file_path) as doc:
-        for page in doc:
-            text += page.get_text()
-    return text
-
 @router.post("/resume-review")
-async def resume_review(file: UploadFile = File(...), role: str = Form(...)):
-    if not file.filename.endswith(".pdf"):
-        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+async def resume_review(file: UploadFile = File(...), role: str = Form(...), stream: bool = False, job: bool = False):
+    # 📥 Size-capped, in-memory read (no temp file)
+    contents = await read_pdf_upload(file)
 
-    file_path = f"temp_{file.filename}"
-    with open(file_path, "wb") as f:
-        f.write(await file.read())
+    # 🧾 Answer 202 with a job id right away; the review is fetched from GET /jobs/{id}
+    if job:
+        return accepted(jobs.submit("resume_review", {"role": role}, bytes(contents)))
 
     try:
-        resume_text = extract_text_from_pdf(file_path)
-        prompt = f"""
+        if not stream:
+            return {"feedback": await review_resume(contents, role)}
+
+        # ♻️ Reuse the extracted text / review if this exact PDF was seen before
+        artifact = store.artifact_for(contents)
+        cached = store.review(artifact, role)
+        if cached is not None:
+            return sse_response(_replay_review(cached))
+
+        # 📡 Pass upstream tokens straight through as Server-Sent Events
+        messages = await _review_messages(artifact, contents, role)
+        return sse_response(_stream_review(messages, artifact, role))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def review_resume(contents, role):
+    # ♻️ Reuse the extracted text / review if this exact PDF was seen before
+    artifact = store.artifact_for(contents)
+    cached = store.review(artifact, role)
+    if cached is not None:
+        return cached
+
+    feedback = await chat_completion(await _review_messages(artifact, contents, role), temperature=0.7)
+    store.save_review(artifact, role, feedback)
+    return feedback
+
+
+@jobs.handler("resume_review")
+async def _review_job(params, data):
+    return {"feedback": await review_resume(data, params["role"])}
+
+
+async def _review_messages(artifact, contents, role):
+    # ✂️ Ranked for the role and fitted to the review's token budget
+    resume_text = await store.condensed_text(
+        artifact, contents, role=role, budget=settings.resume_review_prompt_tokens
+    )
+    prompt = f"""
 You're an expert career advisor. Review the following resume text for the role of {role}. Provide a structured and detailed analysis with the following format:
 
 1. ✅ **Strengths** – Highlight specific strengths relevant to {role}
@@ -42,27 +73,25 @@ Resume:
 {resume_text}
 """
 
-        headers = {
-            "Authorization": f"Bearer {TOGETHER_API_KEY}",
-            "Content-Type": "application/json"
-        }
+    return [
+        {"role": "system", "content": "You are a resume reviewer."},
+        {"role": "user", "content": prompt}
+    ]
 
-        body = {
-            "model": "mistralai/Mixtral-8x7B-Instruct-v0.1",
-            "messages": [
-                {"role": "system", "content": "You are a resume reviewer."},
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0.7,
-        }
 
-        response = requests.post(TOGETHER_API_URL, json=body, headers=headers)
-        response.raise_for_status()
-        feedback = response.json()["choices"][0]["message"]["content"]
+async def _stream_review(messages, artifact, role):
+    parts = []
+    try:
+        async for delta in stream_chat_completion(messages, temperature=0.7):
+            parts.append(delta)
+            yield sse_event({"text": delta}, event="token")
+        feedback = "".join(parts)
+        store.save_review(artifact, role, feedback)
+        yield sse_event({"feedback": feedback}, event="done")
+    except Exception as e:
+        yield sse_event({"detail": str(e)}, event="error")
 
-        return {"feedback": feedback}
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        os.remove(file_path)
+async def _replay_review(feedback):
+    yield sse_event({"text": feedback}, event="token")
+    yield sse_event({"feedback": feedback}, event="done")
@@ -1,46 +1,60 @@
-from fastapi import APIRouter, UploadFile, File, Form, Request
+from fastapi import APIRouter, UploadFile, File, Form, Request, Response, Query, HTTPException
 from resume_gpt_generator import generate_resume_questions
-from evaluator import evaluate_with_gpt
-from typing import Dict, Any
-import firebase_admin
-from firebase_admin import credentials, firestore
+from jobs import accepted, queue as jobs
+from evaluator import evaluate_with_gpt, evaluation_score, stream_evaluation_with_gpt
+from llm_parsing import EvaluationStreamParser, parse_evaluation
+from sse import sse_event, sse_response
+from uploads import read_pdf_upload
+from session_store import get_session_store
+from firestore_writer import writer
+from user_stats import user_stats
+from metrics import span
+from session_history import fetch_all_sessions, fetch_sessions_page, page_etag
+from clients import get_db
+from settings import settings
+from typing import Optional
 from datetime import datetime
-import os
-
-# ✅ Initialize Firebase once
-if not firebase_admin._apps:
-    cred = credentials.Certificate("credentials/serviceAccountKey.json")
-    firebase_admin.initialize_app(cred)
-
-db = firestore.client()
 
 router = APIRouter()
 
-# 🧠 In-memory session storage
-sessions: Dict[str, Dict[str, Any]] = {}
+# 🧠 Session storage (in-memory by default, SESSION_STORE=sqlite to share across workers)
+sessions = get_session_store()
 
 @router.post("/start-resume-session")
-async def start_resume_session(user: str = Form(...), file: UploadFile = File(...)):
-    contents = await file.read()
+async def start_resume_session(user: str = Form(...), file: UploadFile = File(...), job: bool = False):
+    contents = await read_pdf_upload(file)
+
+    # 🧾 Generate the questions in the background; the session starts when the job is done
+    if job:
+        return accepted(jobs.submit("resume_session", {"user": user}, bytes(contents)))
+
     try:
-        questions = generate_resume_questions(contents)[:5]
+        questions = (await generate_resume_questions(contents))[:5]
+    except HTTPException:
+        raise
     except Exception as e:
         return {"error": f"Failed to generate questions: {str(e)}"}
 
-    sessions[user] = {
-        "questions": questions,
-        "index": 0,
-        "answers": []
-    }
+    return start_session(user, questions)
+
+
+def start_session(user, questions):
+    sessions.create(user, questions)
 
     return {
         "message": "Session started",
         "question": questions[0]
     }
 
+
+@jobs.handler("resume_session")
+async def _start_session_job(params, data):
+    return start_session(params["user"], (await generate_resume_questions(data))[:5])
+
 @router.post("/submit-resume-answer")
-async def submit_resume_answer(request: Request):
-    body = await request.json()
+async def submit_resume_answer(request: Request, stream: bool = False):
+    with span("body_parse"):
+        body = await request.json()
     user = body.get("user")
     answer = body.get("answer")
 
@@ -57,54 +71,87 @@ async def submit_resume_answer(request: Request):
 
     question = session["questions"][index]
 
+    # 📡 Stream the evaluation; score / feedback / correct answer are pushed as they parse
+    if stream:
+        return sse_response(_stream_resume_answer(user, index, question, answer))
+
     try:
         # 🧠 Evaluate with GPT
-        result = evaluate_with_gpt(question, answer)
-
-        # 🔍 Parse response
-        lines = [line.strip() for line in result.split("\n") if line.strip()]
-        score_line = next((line for line in lines if "Score" in line), "")
-        feedback_line = next((line for line in lines if "feedback" in line.lower()), "")
-        correct_line = next((line for line in lines if "Correct" in line), "")
-
-        feedback = f"{score_line}\n{feedback_line}".strip()
-        correct_answer = correct_line.replace("Correct Answer:", "").strip()
-
-        # ✅ Save to Firebase
-        db.collection("resume_sessions").add({
-            "user": user,
-            "question": question,
-            "answer": answer,
+        result = await evaluate_with_gpt(question, answer)
+        return record_answer(user, index, question, answer, result)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        return {"error": f"Evaluation failed: {str(e)}"}
+
+
+def record_answer(user, index, question, answer, result):
+    # 🔍 Parse response
+    evaluation = parse_evaluation(result)
+    feedback, correct_answer = answer_feedback(evaluation)
+
+    # ✅ Store in session (atomic: only if this question is still the current one)
+    session = sessions.advance(user, index, {
+        "question": question,
+        "answer": answer,
+        "feedback": feedback,
+        "correct_answer": correct_answer
+    })
+    if session is None:
+        return {"error": "This question was already answered or the session expired."}
+
+    save_answer(user, question, answer, evaluation, evaluation_score(result, evaluation))
+
+    # ✅ Return next question or finish
+    if session["index"] < len(session["questions"]):
+        return {
             "feedback": feedback,
             "correct_answer": correct_answer,
-            "timestamp": datetime.utcnow()
-        })
-
-        # ✅ Store in session
-        session["answers"].append({
-            "question": question,
-            "answer": answer,
+            "next_question": session["questions"][session["index"]]
+        }
+    else:
+        return {
             "feedback": feedback,
-            "correct_answer": correct_answer
-        })
-        session["index"] += 1
-
-        # ✅ Return next question or finish
-        if session["index"] < len(session["questions"]):
-            return {
-                "feedback": feedback,
-                "correct_answer": correct_answer,
-                "next_question": session["questions"][session["index"]]
-            }
-        else:
-            return {
-                "feedback": feedback,
-                "correct_answer": correct_answer,
-                "message": "Interview complete."
-            }
+            "correct_answer": correct_answer,
+            "message": "Interview complete."
+        }
+
+
+def answer_feedback(evaluation):
+    feedback = f"Score: {evaluation.score_text()}\nConstructive feedback: {evaluation.feedback or 'N/A'}"
+    return feedback, evaluation.correct_answer or ""
+
 
+def save_answer(user, question, answer, evaluation, score):
+    # ✅ Save to Firebase (batched write-behind, off the request path)
+    feedback, correct_answer = answer_feedback(evaluation)
+    now = datetime.utcnow()
+    writer.enqueue("resume_sessions", {
+        "user": user,
+        "question": question,
+        "answer": answer,
+        "feedback": feedback,
+        "correct_answer": correct_answer,
+        "score": score,
+        "timestamp": now
+    })
+    user_stats.record(user, score, "resume", "resume", question, now)
+
+
+async def _stream_resume_answer(user, index, question, answer):
+    parser = EvaluationStreamParser()
+    try:
+        async for delta in stream_evaluation_with_gpt(question, answer):
+            yield sse_event({"text": delta}, event="token")
+            for field, value in parser.feed(delta):
+                yield sse_event({field: value}, event=field)
+        for field, value in parser.close():
+            yield sse_event({field: value}, event=field)
+
+        yield sse_event(record_answer(user, index, question, answer, parser.text.strip()), event="done")
     except Exception as e:
-        return {"error": f"Evaluation failed: {str(e)}"}
+        yield sse_event({"error": f"Evaluation failed: {str(e)}"}, event="error")
 
 @router.get("/next-question")
 async def next_question(user: str):
@@ -116,9 +163,36 @@ async def next_question(user: str):
         return {"message": "Interview complete."}
 
     return {"question": session["questions"][session["index"]]}
+
 @router.get("/get-sessions")
-def get_user_sessions(user: str):
-    db = firestore.client()
-    sessions_ref = db.collection("interview_sessions").where("user", "==", user).order_by("timestamp", direction=firestore.Query.DESCENDING)
-    sessions = [doc.to_dict() | {"id": doc.id} for doc in sessions_ref.stream()]
-    return sessions
\ No newline at end of file
+def get_user_sessions(
+    request: Request,
+    response: Response,
+    user: str,
+    limit: Optional[int] = Query(None, ge=1, le=settings.sessions_max_page_size),
+    cursor: Optional[str] = None,
+    view: str = Query("full", pattern="^(full|summary)$"),
+):
+    db = get_db()
+    try:
+        if limit is None and cursor is None:
+            # 📚 No paging asked for: the whole history, as existing clients expect
+            sessions, next_cursor = fetch_all_sessions(db, user, view=view), None
+        else:
+            # 📄 One page per request; the next page's cursor comes back in X-Next-Cursor
+            sessions, next_cursor = fetch_sessions_page(
+                db, user, limit=limit or settings.sessions_page_size, cursor=cursor, view=view
+            )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+    # The ETag is built from what was read: a 304 saves the response body, not the Firestore reads
+    etag = page_etag(user, view, cursor, sessions)
+    headers = {"ETag": etag}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return sessions
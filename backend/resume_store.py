@@ -0,0 +1,160 @@
+# resume_store.py
+# Parsed-resume artifacts keyed by SHA-256 of the uploaded PDF bytes.
+#
+# A candidate typically sends the same PDF to /resume-review,
+# /generate-questions-from-resume and /start-resume-session within minutes.
+# The first request pays for PyMuPDF and the LLM; later ones reuse the
+# extracted text, sections, condensed prompt text, generated questions
+# and per-role reviews.
+# Memory is bounded by RESUME_STORE_MAX_BYTES with LRU eviction.
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from cachetools import LRUCache
+
+from metrics import span
+from pdf_extractor import PdfSource, extract_text
+from settings import settings
+
+SECTION_HEADINGS = {
+    "summary": ("summary", "profile", "objective", "about me"),
+    "experience": ("experience", "work experience", "professional experience", "employment", "work history"),
+    "projects": ("projects", "personal projects", "key projects"),
+    "skills": ("skills", "technical skills", "core skills", "tools", "technologies"),
+    "education": ("education", "academics", "qualifications"),
+    "certifications": ("certifications", "certificates", "licenses"),
+}
+_HEADING_LOOKUP = {alias: name for name, aliases in SECTION_HEADINGS.items() for alias in aliases}
+_HEADING_RE = re.compile(r"^\s*([A-Za-z][A-Za-z &/]{2,40}?)\s*:?\s*$")
+
+
+def resume_digest(data: PdfSource) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def split_sections(text: str) -> Dict[str, str]:
+    """Normalizes a resume into {section: body}; text before the first
+    known heading goes to "header"."""
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    for line in text.splitlines():
+        match = _HEADING_RE.match(line)
+        name = _HEADING_LOOKUP.get(match.group(1).strip().lower()) if match else None
+        if name:
+            current = name
+            sections.setdefault(current, [])
+            continue
+        if line.strip():
+            sections[current].append(line.strip())
+    return {name: "\n".join(lines) for name, lines in sections.items() if lines}
+
+
+@dataclass
+class ResumeArtifact:
+    digest: str
+    text: str = ""
+    text_complete: bool = False
+    sections: Dict[str, str] = field(default_factory=dict)
+    condensed: Dict[str, str] = field(default_factory=dict)
+    questions: Optional[List[str]] = None
+    reviews: Dict[str, str] = field(default_factory=dict)
+
+    def size(self) -> int:
+        return (
+            len(self.text)
+            + sum(len(v) for v in self.sections.values())
+            + sum(len(k) + len(v) for k, v in self.condensed.items())
+            + sum(len(q) for q in self.questions or [])
+            + sum(len(k) + len(v) for k, v in self.reviews.items())
+            + 256
+        )
+
+
+def _role_key(role: str) -> str:
+    return " ".join(role.lower().split())
+
+
+class ResumeStore:
+    def __init__(self, max_bytes: int = settings.resume_store_max_bytes):
+        self._cache = LRUCache(maxsize=max_bytes, getsizeof=ResumeArtifact.size)
+        self.hits = 0
+        self.misses = 0
+
+    def artifact_for(self, data: PdfSource) -> ResumeArtifact:
+        digest = resume_digest(data)
+        artifact = self._cache.get(digest)
+        if artifact is None:
+            artifact = ResumeArtifact(digest=digest)
+        return artifact
+
+    def save(self, artifact: ResumeArtifact):
+        # Re-inserting recomputes the artifact's size for the LRU budget
+        try:
+            self._cache[artifact.digest] = artifact
+        except ValueError:
+            pass  # larger than the whole store; don't cache
+
+    async def text(self, artifact: ResumeArtifact, data: PdfSource, max_chars: Optional[int] = None) -> str:
+        if artifact.text and (artifact.text_complete or (max_chars is not None and len(artifact.text) >= max_chars)):
+            self.hits += 1
+            return artifact.text if max_chars is None else artifact.text[:max_chars]
+
+        self.misses += 1
+        text = await extract_text(data, max_chars=max_chars)
+        if len(text) >= len(artifact.text):
+            artifact.text = text
+            artifact.text_complete = max_chars is None or len(text) < max_chars
+            artifact.sections = split_sections(text)
+        self.save(artifact)
+        return text
+
+    async def condensed_text(
+        self, artifact: ResumeArtifact, data: PdfSource, role: str = "", budget: Optional[int] = None
+    ) -> str:
+        """Resume text fitted to `budget` prompt tokens, ranked for `role`."""
+        from resume_condenser import condense  # it imports split_sections from here
+
+        budget = budget or settings.resume_prompt_tokens
+        key = f"{_role_key(role)}|{budget}"
+        if key in artifact.condensed:
+            self.hits += 1
+            return artifact.condensed[key]
+        text = await self.text(artifact, data, max_chars=settings.resume_text_budget)
+        with span("prompt_build"):
+            artifact.condensed[key] = condense(text, role, budget).text
+        self.save(artifact)
+        return artifact.condensed[key]
+
+    def review(self, artifact: ResumeArtifact, role: str) -> Optional[str]:
+        review = artifact.reviews.get(_role_key(role))
+        if review is not None:
+            self.hits += 1
+        return review
+
+    def save_review(self, artifact: ResumeArtifact, role: str, review: str):
+        artifact.reviews[_role_key(role)] = review
+        self.save(artifact)
+
+    def questions(self, artifact: ResumeArtifact) -> Optional[List[str]]:
+        if artifact.questions is not None:
+            self.hits += 1
+            return list(artifact.questions)
+        return None
+
+    def save_questions(self, artifact: ResumeArtifact, questions: List[str]):
+        artifact.questions = list(questions)
+        self.save(artifact)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "resumes": len(self._cache),
+            "bytes": self._cache.currsize,
+        }
+
+
+store = ResumeStore()
@@ -1,30 +1,17 @@
 # backend/routes/resume_question_generator.py
-from fastapi import APIRouter, UploadFile, File
-from resume_parser import extract_text_from_pdf
-import os
-import uuid
-import requests
-import tempfile
+from fastapi import APIRouter, UploadFile, File, HTTPException
+from resume_store import store
+from llm_client import chat_completion
+from uploads import read_pdf_upload
 
 router = APIRouter()
 
-# 🔑 Replace this with your real key or load from environment
-TOGETHER_API_KEY = os.getenv("TOGETHER_API_KEY")
-TOGETHER_URL = "https://api.together.xyz/v1/chat/completions"
-MODEL = "mistralai/Mixtral-8x7B-Instruct-v0.1"
-
 @router.post("/generate-questions-from-resume")
 async def generate_questions(file: UploadFile = File(...)):
     try:
-        # Save uploaded file temporarily
-        suffix = os.path.splitext(file.filename)[1]
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            tmp.write(await file.read())
-            tmp_path = tmp.name
-
-        # Extract text
-        resume_text = extract_text_from_pdf(tmp_path)
-        os.unlink(tmp_path)
+        # Read the upload into memory and extract text
+        contents = await read_pdf_upload(file)
+        resume_text = await store.condensed_text(store.artifact_for(contents), contents, role="DevOps")
 
         # Construct prompt
         prompt = f"""
@@ -36,21 +23,11 @@ Generate 5 technical DevOps interview questions based on the following resume:
 Only output the questions in a numbered list.
 """
 
-        headers = {
-            "Authorization": f"Bearer {TOGETHER_API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        payload = {
-            "model": MODEL,
-            "messages": [{"role": "user", "content": prompt}]
-        }
-
-        response = requests.post(TOGETHER_URL, headers=headers, json=payload)
-        response.raise_for_status()
-        content = response.json()["choices"][0]["message"]["content"].strip()
+        content = (await chat_completion([{"role": "user", "content": prompt}])).strip()
 
         return {"questions": content}
 
+    except HTTPException:
+        raise
     except Exception as e:
         return {"error": str(e)}
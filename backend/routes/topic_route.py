@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, HTTPException, Request
 from topic_question_generator import generate_questions_by_topic
+from question_bank import questions_for
+from metrics import span
 
 router = APIRouter()
 
 @router.post("/generate-topic-questions")
 async def generate_topic_questions(request: Request):
-    body = await request.json()
+    with span("body_parse"):
+        body = await request.json()
     topic = body.get("topic")
     difficulty = body.get("difficulty")
 
@@ -13,7 +16,9 @@ async def generate_topic_questions(request: Request):
         return {"error": "Topic and difficulty are required."}
 
     try:
-        questions = generate_questions_by_topic(topic, difficulty)
+        questions = await questions_for(topic, difficulty, lambda: generate_questions_by_topic(topic, difficulty))
         return {"questions": questions}
+    except HTTPException:
+        raise
     except Exception as e:
         return {"error": f"Failed to generate questions: {str(e)}"}
@@ -0,0 +1,103 @@
+# session_history.py
+# Paginated, projected reads of a user's stored interview sessions.
+#
+# Pages are ordered by (timestamp, document id) descending and continued
+# with an opaque cursor (start_after on both fields), so each request reads
+# at most `limit` documents no matter how long the history is. Without a
+# limit or cursor the whole history is returned, as it was before paging.
+# The "summary" view only fetches what list views show; documents written
+# before scores were stored get their score parsed from `feedback`, which
+# is fetched for just those documents in one extra get_all per page.
+
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from llm_parsing import find_score
+from settings import settings
+
+SUMMARY_FIELDS = ["question", "score", "timestamp"]
+DESCENDING = "DESCENDING"  # == firestore.Query.DESCENDING
+
+
+def encode_cursor(timestamp: datetime, doc_id: str) -> str:
+    raw = json.dumps([timestamp.isoformat() if timestamp else None, doc_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], str]:
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    timestamp, doc_id = json.loads(raw)
+    return (datetime.fromisoformat(timestamp) if timestamp else None), doc_id
+
+
+def _backfill_scores(db, docs, items: List[dict]):
+    """Parses the score out of `feedback` for summary items stored without one."""
+    legacy = {doc.id: item for doc, item in zip(docs, items) if "score" not in item}
+    if not legacy:
+        return
+    refs = [doc.reference for doc in docs if doc.id in legacy]
+    for snapshot in db.get_all(refs, field_paths=["feedback"]):
+        legacy[snapshot.id]["score"] = find_score((snapshot.to_dict() or {}).get("feedback") or "")
+    for item in legacy.values():
+        item.setdefault("score", None)
+
+
+def fetch_sessions_page(
+    db,
+    user: str,
+    limit: int = settings.sessions_page_size,
+    cursor: Optional[str] = None,
+    view: str = "full",
+    collection: str = "interview_sessions",
+) -> Tuple[List[dict], Optional[str]]:
+    """Returns (items, next_cursor); next_cursor is None on the last page."""
+    limit = max(1, min(limit, settings.sessions_max_page_size))
+    query = (
+        db.collection(collection)
+        .where("user", "==", user)
+        .order_by("timestamp", direction=DESCENDING)
+        .order_by("__name__", direction=DESCENDING)
+    )
+    if view == "summary":
+        query = query.select(SUMMARY_FIELDS)
+    if cursor:
+        timestamp, doc_id = decode_cursor(cursor)
+        query = query.start_after({"timestamp": timestamp, "__name__": doc_id})
+
+    # One extra document tells us whether another page exists
+    docs = list(query.limit(limit + 1).stream())
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+
+    items = [doc.to_dict() | {"id": doc.id} for doc in docs]
+    if view == "summary":
+        _backfill_scores(db, docs, items)
+
+    next_cursor = None
+    if has_more and docs:
+        last = docs[-1]
+        next_cursor = encode_cursor(last.get("timestamp"), last.id)
+    return items, next_cursor
+
+
+def fetch_all_sessions(db, user: str, view: str = "full", collection: str = "interview_sessions") -> List[dict]:
+    """The user's whole history, newest first (unpaged /get-sessions)."""
+    items, cursor = [], None
+    while True:
+        page, cursor = fetch_sessions_page(
+            db, user, limit=settings.sessions_max_page_size, cursor=cursor, view=view, collection=collection
+        )
+        items.extend(page)
+        if cursor is None:
+            return items
+
+
+def page_etag(user: str, view: str, cursor: Optional[str], items: List[dict]) -> str:
+    # Session documents are write-once, so ids + timestamps identify a page
+    digest = hashlib.sha1(f"{user}|{view}|{cursor}".encode())
+    for item in items:
+        digest.update(f"|{item['id']}:{item.get('timestamp')}".encode())
+    return f'W/"{digest.hexdigest()}"'
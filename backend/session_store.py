@@ -0,0 +1,165 @@
+# session_store.py
+# Storage for in-progress resume interview sessions.
+#
+# SESSION_STORE=memory (default) keeps sessions in this process, which is
+# fine for a single uvicorn worker. SESSION_STORE=sqlite keeps them in a
+# SQLite file (SESSION_DB; put it on /dev/shm for a shared-memory setup)
+# that every worker process on the host can use, so /submit-resume-answer
+# no longer has to land on the worker that served /start-resume-session.
+#
+# Both backends expire sessions after SESSION_TTL seconds of inactivity and
+# advance the question index with a compare-and-set, so an answer can only
+# be recorded once per question. The WebSocket interview advances first and
+# fills in the evaluation later with update_answer().
+
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from cachetools import TTLCache
+
+from settings import settings
+
+Session = Dict[str, Any]
+
+
+class SessionStore(ABC):
+    @abstractmethod
+    def create(self, user: str, questions: List[str]) -> Session:
+        ...
+
+    @abstractmethod
+    def get(self, user: str) -> Optional[Session]:
+        ...
+
+    @abstractmethod
+    def advance(self, user: str, expected_index: int, answer: dict) -> Optional[Session]:
+        """Appends `answer` and moves to the next question, but only if the
+        session is still at `expected_index`. Returns the updated session, or
+        None if it expired or the question was already answered."""
+
+    @abstractmethod
+    def update_answer(self, user: str, index: int, fields: dict) -> bool:
+        """Merges `fields` into the recorded answer to question `index`."""
+
+    @abstractmethod
+    def delete(self, user: str):
+        ...
+
+
+class InMemorySessionStore(SessionStore):
+    def __init__(self, ttl: int = settings.session_ttl, max_sessions: int = settings.session_max):
+        self._sessions = TTLCache(maxsize=max_sessions, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def create(self, user, questions):
+        session = {"questions": list(questions), "index": 0, "answers": []}
+        with self._lock:
+            self._sessions[user] = session
+        return session
+
+    def get(self, user):
+        with self._lock:
+            return self._sessions.get(user)
+
+    def advance(self, user, expected_index, answer):
+        with self._lock:
+            session = self._sessions.get(user)
+            if session is None or session["index"] != expected_index:
+                return None
+            session["answers"].append(answer)
+            session["index"] += 1
+            # Re-insert to refresh the TTL on activity
+            self._sessions[user] = session
+            return session
+
+    def update_answer(self, user, index, fields):
+        with self._lock:
+            session = self._sessions.get(user)
+            if session is None or index >= len(session["answers"]):
+                return False
+            session["answers"][index].update(fields)
+            return True
+
+    def delete(self, user):
+        with self._lock:
+            self._sessions.pop(user, None)
+
+
+class SQLiteSessionStore(SessionStore):
+    def __init__(self, path: str = settings.session_db, ttl: int = settings.session_ttl):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS resume_sessions ("
+            " user TEXT PRIMARY KEY, questions TEXT NOT NULL, idx INTEGER NOT NULL,"
+            " answers TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS resume_sessions_expiry ON resume_sessions(expires_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; SQLite handles cross-process locking
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout=10000")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def create(self, user, questions):
+        now = time.time()
+        conn = self._conn()
+        conn.execute("DELETE FROM resume_sessions WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "INSERT OR REPLACE INTO resume_sessions (user, questions, idx, answers, expires_at)"
+            " VALUES (?, ?, 0, '[]', ?)",
+            (user, json.dumps(list(questions)), now + self.ttl),
+        )
+        return {"questions": list(questions), "index": 0, "answers": []}
+
+    def get(self, user):
+        row = self._conn().execute(
+            "SELECT questions, idx, answers FROM resume_sessions WHERE user = ? AND expires_at > ?",
+            (user, time.time()),
+        ).fetchone()
+        if row is None:
+            return None
+        return {"questions": json.loads(row[0]), "index": row[1], "answers": json.loads(row[2])}
+
+    def advance(self, user, expected_index, answer):
+        now = time.time()
+        conn = self._conn()
+        # Single UPDATE = atomic compare-and-set across processes
+        updated = conn.execute(
+            "UPDATE resume_sessions"
+            " SET idx = idx + 1, answers = json_insert(answers, '$[#]', json(?)), expires_at = ?"
+            " WHERE user = ? AND idx = ? AND expires_at > ?",
+            (json.dumps(answer), now + self.ttl, user, expected_index, now),
+        ).rowcount
+        if not updated:
+            return None
+        return self.get(user)
+
+    def update_answer(self, user, index, fields):
+        path = f"$[{int(index)}]"
+        return bool(self._conn().execute(
+            "UPDATE resume_sessions SET answers = json_replace(answers, ?, json_patch(json_extract(answers, ?), json(?)))"
+            " WHERE user = ? AND json_array_length(answers) > ? AND expires_at > ?",
+            (path, path, json.dumps(fields), user, index, time.time()),
+        ).rowcount)
+
+    def delete(self, user):
+        self._conn().execute("DELETE FROM resume_sessions WHERE user = ?", (user,))
+
+
+def get_session_store() -> SessionStore:
+    if settings.session_store.lower() == "sqlite":
+        return SQLiteSessionStore()
+    return InMemorySessionStore()
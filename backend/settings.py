@@ -0,0 +1,154 @@
+# settings.py
+# App-wide configuration, read from the environment (and .env) exactly once.
+# Modules use `from settings import settings`; benchmarks and fakes may
+# override attributes before the first request.
+
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _str(name: str, default: Optional[str] = None):
+    return field(default_factory=lambda: os.getenv(name, default))
+
+
+def _int(name: str, default: int):
+    return field(default_factory=lambda: int(os.getenv(name, str(default))))
+
+
+def _float(name: str, default: float):
+    return field(default_factory=lambda: float(os.getenv(name, str(default))))
+
+
+def _bool(name: str, default: bool):
+    return field(default_factory=lambda: os.getenv(name, "1" if default else "0").lower() in ("1", "true", "yes"))
+
+
+@dataclass
+class Settings:
+    # 🔥 Firebase
+    firebase_credentials: str = _str("FIREBASE_CREDENTIALS", "credentials/serviceAccountKey.json")
+    firebase_api_key: Optional[str] = _str("FIREBASE_API_KEY")
+
+    # 🤖 Together / LLM client
+    together_api_key: Optional[str] = _str("TOGETHER_API_KEY")
+    together_url: str = _str("TOGETHER_URL", "https://api.together.xyz/v1/chat/completions")
+    llm_model: str = _str("LLM_MODEL", "mistralai/Mixtral-8x7B-Instruct-v0.1")
+    llm_pool_size: int = _int("LLM_POOL_SIZE", 100)
+    llm_keepalive: int = _int("LLM_KEEPALIVE", 20)
+    llm_connect_timeout: float = _float("LLM_CONNECT_TIMEOUT", 5)
+    llm_read_timeout: float = _float("LLM_READ_TIMEOUT", 60)
+    llm_http2: bool = _bool("LLM_HTTP2", True)
+
+    # 🚦 Upstream admission control (0 = no RPM/TPM limit)
+    llm_rpm: int = _int("LLM_RPM", 0)
+    llm_tpm: int = _int("LLM_TPM", 0)
+    llm_concurrency: int = _int("LLM_CONCURRENCY", 32)  # starting limit, adapted with AIMD
+    llm_min_concurrency: int = _int("LLM_MIN_CONCURRENCY", 2)
+    llm_max_concurrency: int = _int("LLM_MAX_CONCURRENCY", 128)
+    llm_queue_max: int = _int("LLM_QUEUE_MAX", 256)
+    llm_queue_timeout: float = _float("LLM_QUEUE_TIMEOUT", 10)
+    llm_default_completion_tokens: int = _int("LLM_DEFAULT_COMPLETION_TOKENS", 512)
+
+    # 🔀 Endpoint routing, hedging and failover (see llm_router.py)
+    llm_endpoints: Optional[str] = _str("LLM_ENDPOINTS")  # JSON list; default: TOGETHER_URL + LLM_MODEL
+    llm_request_deadline: float = _float("LLM_REQUEST_DEADLINE", 90)
+    llm_endpoint_timeout: float = _float("LLM_ENDPOINT_TIMEOUT", 45)
+    llm_hedge_enabled: bool = _bool("LLM_HEDGE_ENABLED", True)
+    llm_hedge_min_ms: int = _int("LLM_HEDGE_MIN_MS", 250)
+    llm_hedge_default_ms: int = _int("LLM_HEDGE_DEFAULT_MS", 3000)  # until an endpoint has a p95
+    llm_hedge_min_samples: int = _int("LLM_HEDGE_MIN_SAMPLES", 20)
+    llm_hedge_max_ratio: float = _float("LLM_HEDGE_MAX_RATIO", 0.1)
+    llm_breaker_failures: int = _int("LLM_BREAKER_FAILURES", 5)
+    llm_breaker_cooldown: float = _float("LLM_BREAKER_COOLDOWN", 30)
+
+    # ♻️ Completion cache
+    llm_cache_enabled: bool = _bool("LLM_CACHE_ENABLED", True)
+    llm_cache_ttl: int = _int("LLM_CACHE_TTL", 6 * 3600)
+    llm_cache_max_keys: int = _int("LLM_CACHE_MAX_KEYS", 1024)
+    llm_cache_variants: int = _int("LLM_CACHE_VARIANTS", 3)
+    llm_cache_db: Optional[str] = _str("LLM_CACHE_DB")  # e.g. "cache/llm_cache.sqlite3"
+    llm_cache_db_max_rows: int = _int("LLM_CACHE_DB_MAX_ROWS", 20000)
+
+    # 📄 Resume uploads / PDF extraction
+    max_resume_bytes: int = _int("MAX_RESUME_BYTES", 5 * 1024 * 1024)
+    pdf_workers: int = _int("PDF_WORKERS", min(4, os.cpu_count() or 1))
+    pdf_parallel_min_pages: int = _int("PDF_PARALLEL_MIN_PAGES", 8)
+    pdf_min_pages_per_task: int = _int("PDF_MIN_PAGES_PER_TASK", 4)
+    resume_text_budget: int = _int("RESUME_TEXT_BUDGET", 40000)  # chars extracted; the condenser picks what is sent
+    resume_prompt_tokens: int = _int("RESUME_PROMPT_TOKENS", 750)
+    resume_review_prompt_tokens: int = _int("RESUME_REVIEW_PROMPT_TOKENS", 1500)
+    resume_store_max_bytes: int = _int("RESUME_STORE_MAX_BYTES", 64 * 1024 * 1024)
+
+    # 🏦 Pre-generated topic question bank
+    question_bank_enabled: bool = _bool("QUESTION_BANK_ENABLED", True)
+    question_bank_db: str = _str("QUESTION_BANK_DB", "question_bank.sqlite3")
+    question_bank_low_water: int = _int("QUESTION_BANK_LOW_WATER", 20)
+    question_bank_refill_batch: int = _int("QUESTION_BANK_REFILL_BATCH", 10)
+    question_bank_hot_keys: int = _int("QUESTION_BANK_HOT_KEYS", 50)
+    question_bank_max_serves: int = _int("QUESTION_BANK_MAX_SERVES", 50)
+    question_bank_refill_interval: float = _float("QUESTION_BANK_REFILL_INTERVAL", 30)
+
+    # 📝 Batch evaluation
+    evaluate_batch_mode: str = _str("EVALUATE_BATCH_MODE", "single_prompt")  # or "fanout"
+    evaluate_batch_max_items: int = _int("EVALUATE_BATCH_MAX_ITEMS", 20)
+
+    # ♻️ Reuse evaluations of near-identical answers to the same question
+    answer_reuse_enabled: bool = _bool("ANSWER_REUSE_ENABLED", True)
+    answer_reuse_threshold: float = _float("ANSWER_REUSE_THRESHOLD", 0.9)  # cosine similarity
+    answer_reuse_min_words: int = _int("ANSWER_REUSE_MIN_WORDS", 3)
+    answer_index_dims: int = _int("ANSWER_INDEX_DIMS", 512)
+    answer_index_max_entries: int = _int("ANSWER_INDEX_MAX_ENTRIES", 10000)
+    answer_index_per_question: int = _int("ANSWER_INDEX_PER_QUESTION", 200)
+    answer_index_load_limit: int = _int("ANSWER_INDEX_LOAD_LIMIT", 5000)  # per collection, on first lookup
+
+    # 📊 Per-user progress summaries
+    user_stats_flush_ms: int = _int("USER_STATS_FLUSH_MS", 1000)
+    user_stats_recent: int = _int("USER_STATS_RECENT", 20)
+
+    # 🔌 WebSocket resume interview (/ws/resume-interview)
+    ws_idle_timeout: float = _float("WS_IDLE_TIMEOUT", 900)
+    ws_eval_retries: int = _int("WS_EVAL_RETRIES", 3)  # upstream-busy retries per evaluation
+
+    # 🧾 Background jobs (?job=true on /resume-review and /start-resume-session)
+    job_db: str = _str("JOB_DB", "jobs.sqlite3")
+    job_workers: int = _int("JOB_WORKERS", 4)
+    job_max_queued: int = _int("JOB_MAX_QUEUED", 200)
+    job_timeout: float = _float("JOB_TIMEOUT", 300)
+    job_max_attempts: int = _int("JOB_MAX_ATTEMPTS", 3)
+    job_retention: int = _int("JOB_RETENTION", 3600)  # finished jobs stay readable this long
+    job_max_wait: float = _float("JOB_MAX_WAIT", 30)  # long-poll cap
+    job_poll_interval: float = _float("JOB_POLL_INTERVAL", 1.0)  # for jobs queued by other processes
+
+    # 🧠 Resume interview sessions
+    session_store: str = _str("SESSION_STORE", "memory")
+    session_db: str = _str("SESSION_DB", "sessions.sqlite3")
+    session_ttl: int = _int("SESSION_TTL", 2 * 3600)
+    session_max: int = _int("SESSION_MAX", 10000)
+    sessions_page_size: int = _int("SESSIONS_PAGE_SIZE", 50)
+    sessions_max_page_size: int = _int("SESSIONS_MAX_PAGE_SIZE", 200)
+
+    # ✍️ Firestore write-behind
+    firestore_batch_size: int = _int("FIRESTORE_BATCH_SIZE", 500)  # Firestore's per-batch limit
+    firestore_flush_ms: int = _int("FIRESTORE_FLUSH_MS", 200)
+    firestore_max_retries: int = _int("FIRESTORE_MAX_RETRIES", 5)
+    firestore_queue_max: int = _int("FIRESTORE_QUEUE_MAX", 10000)
+
+    # 📈 Metrics, logging and profiling
+    log_level: str = _str("LOG_LEVEL", "INFO")
+    log_sample_rate: float = _float("LOG_SAMPLE_RATE", 0.01)  # share of requests whose info events are logged
+    profiling_enabled: bool = _bool("PROFILING_ENABLED", False)  # then send `X-Profile: 1` to profile a request
+    profile_dir: str = _str("PROFILE_DIR", "profiles")
+
+    # 🔐 Admin auth cache
+    token_cache_size: int = _int("TOKEN_CACHE_SIZE", 10000)
+    token_expiry_skew: int = _int("TOKEN_EXPIRY_SKEW", 30)
+    admin_role_ttl: int = _int("ADMIN_ROLE_TTL", 30)
+    admin_role_cache_size: int = _int("ADMIN_ROLE_CACHE_SIZE", 10000)
+
+
+settings = Settings()
@@ -0,0 +1,134 @@
+# singleflight.py
+# Coalesces concurrent identical async calls into one.
+#
+# The first caller for a key starts the work as a task; callers that arrive
+# while it is in flight await the same task and get the same result (or the
+# same exception). A caller that is cancelled only stops waiting; the shared
+# task is cancelled when its last waiter goes away. Nothing is remembered
+# once the task finishes, so this is not a cache.
+#
+# StreamFlight does the same for async iterators: one task consumes the
+# stream, every caller gets all of its chunks from the first one on.
+
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+            del self._waiters[key]
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda t: self._forget(key, t))
+            self.leaders += 1
+        else:
+            self.shared += 1
+
+        self._waiters[key] += 1
+        try:
+            # shield(): cancelling one waiter must not cancel the others' call
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._calls.get(key) is task and not task.done():
+                self._waiters[key] -= 1
+                if self._waiters[key] == 0:
+                    # Forget it now so a new caller doesn't join a dying task
+                    self._forget(key, task)
+                    task.cancel()
+            raise
+
+    def stats(self) -> dict:
+        return {"leaders": self.leaders, "shared": self.shared, "in_flight": self.in_flight()}
+
+
+class _Stream:
+    def __init__(self):
+        self.chunks: List = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Event()
+        self.waiters = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def notify(self):
+        # A fresh event per change, so no waiter can clear it under another
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+
+class StreamFlight:
+    def __init__(self):
+        self._calls: Dict[Hashable, _Stream] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def _forget(self, key: Hashable, call: _Stream):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    async def _pump(self, key: Hashable, call: _Stream, fn: Callable[[], AsyncIterator[T]]):
+        try:
+            async for chunk in fn():
+                call.chunks.append(chunk)
+                call.notify()
+        except asyncio.CancelledError:
+            call.error = asyncio.CancelledError()
+            raise
+        except Exception as e:
+            call.error = e
+        finally:
+            call.done = True
+            self._forget(key, call)
+            call.notify()
+
+    async def stream(self, key: Hashable, fn: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _Stream()
+            call.task = asyncio.ensure_future(self._pump(key, call, fn))
+            self.leaders += 1
+        else:
+            self.shared += 1
+
+        call.waiters += 1
+        sent = 0
+        try:
+            while True:
+                while sent < len(call.chunks):
+                    sent += 1
+                    yield call.chunks[sent - 1]
+                if call.done:
+                    if call.error is not None:
+                        raise call.error
+                    return
+                await call.changed.wait()
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.done:
+                # Last reader gone: stop the upstream stream too
+                self._forget(key, call)
+                call.task.cancel()
+
+    def stats(self) -> dict:
+        return {"leaders": self.leaders, "shared": self.shared, "in_flight": self.in_flight()}
@@ -0,0 +1,32 @@
+# sse.py
+# Server-Sent Events and NDJSON helpers shared by the streaming endpoints.
+
+import json
+from typing import AsyncIterator
+
+from fastapi.responses import StreamingResponse
+
+
+def sse_event(data, event: str = None) -> str:
+    msg = f"event: {event}\n" if event else ""
+    return msg + f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def ndjson_line(data) -> str:
+    return json.dumps(data, ensure_ascii=False) + "\n"
+
+
+def ndjson_response(lines: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        lines,
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
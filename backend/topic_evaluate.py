@@ -1,21 +1,17 @@
-from fastapi import APIRouter, Request
-import os
-import requests
-import re
-from dotenv import load_dotenv
-
-load_dotenv()
+import logging
+from fastapi import APIRouter, HTTPException, Request
+from llm_client import chat_completion, stream_chat_completion
+from llm_parsing import EvaluationStreamParser, parse_evaluation
+from metrics import log_event, span
+from sse import sse_event, sse_response
 
 router = APIRouter()  # <-- ✅ This must be defined before any decorators
 
-TOGETHER_API_KEY = os.getenv("TOGETHER_API_KEY")
-TOGETHER_URL = "https://api.together.xyz/v1/chat/completions"
-MODEL = "mistralai/Mixtral-8x7B-Instruct-v0.1"
-
 @router.post("/topic-evaluate")
-async def topic_evaluate(request: Request):
+async def topic_evaluate(request: Request, stream: bool = False):
     try:
-        body = await request.json()
+        with span("body_parse"):
+            body = await request.json()
         question = body.get("question")
         answer = body.get("answer")
 
@@ -31,38 +27,44 @@ Provide:
 2. Give feedback
 3. The correct answer
 """
+        messages = [{"role": "user", "content": prompt}]
+
+        # 📡 Stream tokens and emit score / feedback / correct answer as soon as each is parsed
+        if stream:
+            return sse_response(_stream_topic_evaluation(messages))
+
+        content = (await chat_completion(messages, temperature=0.7)).strip()
 
-        headers = {
-            "Authorization": f"Bearer {TOGETHER_API_KEY}",
-            "Content-Type": "application/json",
-        }
+        log_event("llm_output", kind="topic_evaluation", content=content)  # sampled
 
-        payload = {
-            "model": MODEL,
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.7
-        }
+        # ✅ Tolerant label-by-label extraction (bold, numbering, multi-line answers)
+        return format_topic_evaluation(parse_evaluation(content))
 
-        res = requests.post(TOGETHER_URL, headers=headers, json=payload)
-        res.raise_for_status()
-        content = res.json()["choices"][0]["message"]["content"].strip()
+    except HTTPException:
+        raise
+    except Exception as e:
+        log_event("evaluation_failed", logging.ERROR, error=str(e))
+        return {"error": "Evaluation failed. Check backend logs."}
 
-        print("🔍 Raw GPT Output:\n", content)  # helpful for debugging
 
-        # ✅ Use regex for safe extraction
-        score_match = re.search(r"Score\s*[:\-]?\s*(\d(?:\.\d)?)/?5?", content, re.IGNORECASE)
-        feedback_match = re.search(r"feedback\s*[:\-]?\s*(.+)", content, re.IGNORECASE)
-        correct_answer_match = re.search(r"Correct Answer\s*[:\-]?\s*(.+)", content, re.IGNORECASE)
+def format_topic_evaluation(evaluation):
+    return {
+        "feedback": f"1. Score: {evaluation.score_text()}/5\nFeedback: {evaluation.feedback or 'N/A'}",
+        "correct_answer": evaluation.correct_answer or "N/A"
+    }
 
-        score = score_match.group(1) if score_match else "N/A"
-        feedback = feedback_match.group(1).strip() if feedback_match else "N/A"
-        correct_answer = correct_answer_match.group(1).strip() if correct_answer_match else "N/A"
 
-        return {
-            "feedback": f"1. Score: {score}/5\nFeedback: {feedback}",
-            "correct_answer": correct_answer
-        }
+async def _stream_topic_evaluation(messages):
+    parser = EvaluationStreamParser()
+    try:
+        async for delta in stream_chat_completion(messages, temperature=0.7):
+            yield sse_event({"text": delta}, event="token")
+            for field, value in parser.feed(delta):
+                yield sse_event({field: value}, event=field)
+        for field, value in parser.close():
+            yield sse_event({field: value}, event=field)
 
+        yield sse_event(format_topic_evaluation(parser.evaluation), event="done")
     except Exception as e:
-        print("❌ Evaluation Error:", str(e))
-        return {"error": "Evaluation failed. Check backend logs."}
+        log_event("evaluation_failed", logging.ERROR, error=str(e))
+        yield sse_event({"error": "Evaluation failed. Check backend logs."}, event="error")
@@ -1,21 +1,19 @@
 # topic_question.py
 
-from fastapi import APIRouter, Request
-import os
-import requests
-from dotenv import load_dotenv
+import logging
+from fastapi import APIRouter, HTTPException, Request
+from llm_cache import cached_chat_completion
+from question_bank import questions_for
+from llm_parsing import parse_question_list
+from metrics import log_event, span
 
-load_dotenv()
 router = APIRouter()
 
-TOGETHER_API_KEY = os.getenv("TOGETHER_API_KEY")
-TOGETHER_URL = "https://api.together.xyz/v1/chat/completions"
-MODEL = "mistralai/Mixtral-8x7B-Instruct-v0.1"
-
 @router.post("/topic-question")
 async def generate_topic_questions(request: Request):
     try:
-        body = await request.json()
+        with span("body_parse"):
+            body = await request.json()
         topic = body.get("topic")
         difficulty = body.get("difficulty", "Easy")
 
@@ -27,26 +25,18 @@ Generate 5 {difficulty}-level interview questions on the topic: {topic}.
 Format as a numbered list.
 """
 
-        headers = {
-            "Authorization": f"Bearer {TOGETHER_API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        payload = {
-            "model": MODEL,
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.7
-        }
-
-        res = requests.post(TOGETHER_URL, headers=headers, json=payload)
-        res.raise_for_status()
-
-        content = res.json()["choices"][0]["message"]["content"]
-        lines = [line.strip() for line in content.split("\n") if line.strip()]
-        questions = [line.split(". ", 1)[-1].strip() for line in lines if line[0].isdigit()]
+        # 🏦 Pre-generated questions when banked, live generation otherwise
+        questions = await questions_for(topic, difficulty, lambda: cached_chat_completion(
+            [{"role": "user", "content": prompt}],
+            temperature=0.7,
+            parse=parse_question_list,
+        ))
 
         return {"questions": questions}
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print("❌ Error in topic-question:", str(e))
+        log_event("topic_question_failed", logging.ERROR, error=str(e))
         return {"error": str(e)}
+
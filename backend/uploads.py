@@ -0,0 +1,84 @@
+# uploads.py
+# In-memory, size-capped handling of resume uploads.
+#
+# Uploads never touch the disk: multipart file parts up to the cap stay in
+# Starlette's in-memory spool, the handler copies them once into a
+# pre-sized buffer and that buffer goes straight to PyMuPDF
+# (`fitz.open(stream=...)`). Oversized bodies are rejected from the
+# Content-Length header before anything is read, or as soon as the
+# streamed body crosses the cap.
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from starlette.formparsers import MultiPartParser
+
+from metrics import timed
+from settings import settings
+
+MAX_RESUME_BYTES = settings.max_resume_bytes
+# Multipart framing + form fields on top of the file itself
+UPLOAD_BODY_OVERHEAD = 64 * 1024
+RESUME_UPLOAD_PATHS = ("/resume-review", "/generate-questions-from-resume", "/start-resume-session")
+
+# ✅ Keep whole resume uploads in memory instead of rolling over to a temp file at 1 MB
+MultiPartParser.spool_max_size = max(MultiPartParser.spool_max_size, MAX_RESUME_BYTES + UPLOAD_BODY_OVERHEAD)
+
+TOO_LARGE_DETAIL = f"Resume exceeds the {MAX_RESUME_BYTES // 1024} KB upload limit."
+
+
+def too_large():
+    return HTTPException(status_code=413, detail=TOO_LARGE_DETAIL)
+
+
+@timed("body_parse")
+async def read_pdf_upload(file: UploadFile, max_bytes: int = MAX_RESUME_BYTES) -> bytearray:
+    if not (file.filename or "").lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+    if file.size is not None and file.size > max_bytes:
+        raise too_large()
+
+    if file.size is not None:
+        # One copy out of the in-memory spool into a buffer of the exact size
+        buf = bytearray(file.size)
+        await file.seek(0)
+        read = file.file.readinto(buf)
+        return buf if read == file.size else buf[:read]
+
+    buf = bytearray()
+    while chunk := await file.read(64 * 1024):
+        buf += chunk
+        if len(buf) > max_bytes:
+            raise too_large()
+    return buf
+
+
+class UploadLimitMiddleware:
+    """Rejects oversized bodies on the resume upload routes before they are parsed."""
+
+    def __init__(self, app, max_bytes: int = MAX_RESUME_BYTES + UPLOAD_BODY_OVERHEAD, paths=RESUME_UPLOAD_PATHS):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        length = headers.get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > self.max_bytes:
+            response = JSONResponse({"detail": TOO_LARGE_DETAIL}, status_code=413, headers={"Connection": "close"})
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
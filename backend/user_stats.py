@@ -0,0 +1,228 @@
+# user_stats.py
+# Per-user progress summaries, maintained at write time.
+#
+# Every stored evaluation calls `user_stats.record()` with the score it
+# parsed; unscored ones (failed grades) are skipped. Deltas are coalesced in memory per user and flushed every
+# USER_STATS_FLUSH_MS as one merge-write per user into user_stats/{user}.
+# Counters and score sums use Increment transforms and the recent items
+# ArrayUnion, so several workers can update the same user without a read
+# or a transaction on the write path. ArrayUnion only grows the list, so
+# the flusher trims it back to USER_STATS_RECENT once it has appended that
+# many items for a user (one read + ArrayRemove); each worker adds at most
+# that many between trims, which keeps the document far below Firestore's
+# 1 MiB limit. /user-stats reads that single document instead of the
+# user's whole history, and never writes.
+
+import asyncio
+import logging
+import random
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException
+
+from clients import get_db
+from metrics import log_event, span
+from settings import settings
+
+COLLECTION = "user_stats"
+BATCH_LIMIT = 500  # Firestore's per-batch limit
+
+router = APIRouter()
+
+
+def topic_key(topic: Optional[str]) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", (topic or "").lower()).strip("_")[:60] or "general"
+
+
+def _mean(total: float, count: int) -> Optional[float]:
+    return round(total / count, 2) if count else None
+
+
+@dataclass
+class _Delta:
+    count: int = 0
+    score_sum: float = 0.0
+    topics: Dict[str, dict] = field(default_factory=dict)
+    sources: Counter = field(default_factory=Counter)
+    recent: List[dict] = field(default_factory=list)
+    last_at: Optional[datetime] = None
+
+    def add(self, score, topic, source, question, at):
+        self.count += 1
+        self.sources[source] += 1
+        self.last_at = at
+        self.score_sum += score
+        stats = self.topics.setdefault(topic_key(topic), {"label": topic or "general", "count": 0, "score_sum": 0.0})
+        stats["count"] += 1
+        stats["score_sum"] += score
+        self.recent.append({"question": (question or "")[:200], "score": score, "topic": topic or "general", "source": source, "at": at})
+        del self.recent[: -settings.user_stats_recent]
+
+    def update(self) -> dict:
+        """Merge-write body: Increment / ArrayUnion transforms only."""
+        from firebase_admin import firestore
+
+        return {
+            "count": firestore.Increment(self.count),
+            "score_sum": firestore.Increment(self.score_sum),
+            "sources": {name: firestore.Increment(n) for name, n in self.sources.items()},
+            "topics": {
+                key: {
+                    "label": t["label"],
+                    "count": firestore.Increment(t["count"]),
+                    "score_sum": firestore.Increment(t["score_sum"]),
+                    "last_at": self.last_at,
+                }
+                for key, t in self.topics.items()
+            },
+            "recent": firestore.ArrayUnion(self.recent),
+            "updated_at": self.last_at,
+        }
+
+
+class UserStats:
+    def __init__(
+        self,
+        client_factory: Callable = get_db,
+        flush_ms: int = settings.user_stats_flush_ms,
+        max_retries: int = settings.firestore_max_retries,
+    ):
+        self.client_factory = client_factory
+        self.flush_interval = flush_ms / 1000
+        self.max_retries = max_retries
+        self._pending: Dict[str, _Delta] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._appended: Counter = Counter()  # recent items ArrayUnion'ed per user since its last trim
+        self.recorded = 0
+        self.flushed_users = 0
+        self.commits = 0
+        self.dropped = 0
+        self.trims = 0
+
+    def record(self, user: str, score: Optional[float], topic: Optional[str] = None, source: str = "interview",
+               question: str = "", at: Optional[datetime] = None):
+        if not user or score is None:
+            return  # failed or unparseable grades don't count towards progress
+        self._pending.setdefault(user, _Delta()).add(score, topic, source, question, at or datetime.utcnow())
+        self.recorded += 1
+        self._ensure_started()
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._run())
+            except RuntimeError:
+                pass  # no loop (sync caller); flushed by the next async record or stop()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self):
+        pending, self._pending = self._pending, {}
+        if pending:
+            await asyncio.to_thread(self._commit_with_retry, pending)
+
+    def _commit(self, pending: Dict[str, _Delta]):
+        with span("firestore_write"):
+            db = self.client_factory()
+            users = list(pending)
+            for start in range(0, len(users), BATCH_LIMIT):
+                batch = db.batch()
+                for user in users[start:start + BATCH_LIMIT]:
+                    batch.set(db.collection(COLLECTION).document(user), pending[user].update(), merge=True)
+                batch.commit()
+                self.commits += 1
+
+    def _commit_with_retry(self, pending: Dict[str, _Delta]):
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._commit(pending)
+                self.flushed_users += len(pending)
+                break
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.dropped += sum(d.count for d in pending.values())
+                    log_event("user_stats_dropped", logging.ERROR, users=len(pending), attempts=attempt + 1, error=str(e))
+                    return
+                time.sleep(min(5.0, 0.1 * 2 ** attempt) * (0.5 + random.random()))
+        keep = settings.user_stats_recent
+        for user, delta in pending.items():
+            self._appended[user] += len(delta.recent)
+            if self._appended[user] >= keep:
+                del self._appended[user]
+                self._trim(user, keep)
+
+    def _trim(self, user: str, keep: int):
+        """Drop all but the newest `keep` recent items (ArrayRemove is safe under concurrent writers)."""
+        from firebase_admin import firestore
+
+        try:
+            ref = self.client_factory().collection(COLLECTION).document(user)
+            recent = (ref.get().to_dict() or {}).get("recent") or []
+            if len(recent) > keep:
+                recent.sort(key=lambda item: item.get("at") or datetime.min, reverse=True)
+                ref.update({"recent": firestore.ArrayRemove(recent[keep:])})
+                self.trims += 1
+        except Exception as e:
+            log_event("user_stats_trim_failed", logging.WARNING, error=str(e))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending_users": len(self._pending),
+            "recorded": self.recorded,
+            "flushed_users": self.flushed_users,
+            "commits": self.commits,
+            "dropped": self.dropped,
+            "trims": self.trims,
+        }
+
+    def read(self, user: str) -> dict:
+        doc = self.client_factory().collection(COLLECTION).document(user).get().to_dict() or {}
+        recent = sorted(doc.get("recent") or [], key=lambda item: item.get("at") or datetime.min, reverse=True)
+        topics = [
+            {
+                "topic": t.get("label", key),
+                "count": t.get("count", 0),
+                "mean_score": _mean(t.get("score_sum", 0), t.get("count", 0)),
+                "last_at": t.get("last_at"),
+            }
+            for key, t in (doc.get("topics") or {}).items()
+        ]
+        return {
+            "user": user,
+            "count": doc.get("count", 0),
+            "mean_score": _mean(doc.get("score_sum", 0), doc.get("count", 0)),
+            "sources": doc.get("sources") or {},
+            "topics": sorted(topics, key=lambda t: t["count"], reverse=True),
+            "recent": recent[:settings.user_stats_recent],
+            "updated_at": doc.get("updated_at"),
+        }
+
+
+user_stats = UserStats()
+
+
+# 📊 One document read per dashboard load, however long the history
+@router.get("/user-stats")
+def get_user_stats(user: str):
+    try:
+        return user_stats.read(user)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))